@@ -0,0 +1,79 @@
+import os
+import shutil
+
+from core.Trace import span
+
+
+def is_file_different(src, dst):
+    """检查两个文件是否不同（通过大小和修改时间）"""
+    try:
+        src_stat = os.stat(src)
+        dst_stat = os.stat(dst)
+
+        # 比较文件大小和修改时间
+        return (src_stat.st_size != dst_stat.st_size or
+                src_stat.st_mtime > dst_stat.st_mtime)
+    except OSError:
+        # 如果无法获取文件信息，默认需要复制
+        return True
+
+
+def backup_folders(source_paths, backup_dir, progress_callback=None, error_callback=None, is_canceled=None):
+    """把每个文件夹增量复制到 backup_dir/<文件夹名>，只复制新增或变化的文件
+
+    progress_callback(消息)、error_callback(消息) 报告进度和单个文件的复制失败；
+    返回 (复制数, 跳过数)，取消时返回 None。
+    """
+    def report(message):
+        if progress_callback:
+            progress_callback(message)
+
+    if not os.path.exists(backup_dir):
+        os.makedirs(backup_dir)
+        report(f"创建备份文件夹: {os.path.basename(backup_dir)}")
+
+    copied_files = 0
+    skipped_files = 0
+    for source_path in source_paths:
+        if is_canceled and is_canceled():
+            return None
+
+        # 在备份目录中创建对应的子文件夹
+        folder_name = os.path.basename(source_path.rstrip(os.sep))
+        target_folder = os.path.join(backup_dir, folder_name)
+
+        if not os.path.exists(target_folder):
+            os.makedirs(target_folder)
+            report(f"创建目标文件夹: {folder_name}")
+
+        # 递归复制文件
+        for root, dirs, files in os.walk(source_path):
+            if is_canceled and is_canceled():
+                return None
+
+            # 计算相对路径，创建目标子目录
+            target_path = os.path.join(target_folder, os.path.relpath(root, source_path))
+            os.makedirs(target_path, exist_ok=True)
+
+            for file in files:
+                if is_canceled and is_canceled():
+                    return None
+
+                src_file = os.path.join(root, file)
+                dst_file = os.path.join(target_path, file)
+
+                # 检查文件是否需要复制（不存在或不同）
+                if not os.path.exists(dst_file) or is_file_different(src_file, dst_file):
+                    try:
+                        with span('backup.copy', file=src_file):
+                            shutil.copy2(src_file, dst_file)
+                        copied_files += 1
+                        if copied_files % 10 == 0:  # 每10个文件更新一次进度
+                            report(f"已备份 {copied_files} 个文件...")
+                    except Exception as e:
+                        if error_callback:
+                            error_callback(f"复制文件失败: {os.path.basename(src_file)} -> {e}")
+                else:
+                    skipped_files += 1
+
+    return copied_files, skipped_files
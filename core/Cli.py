@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import sys
+from datetime import date
+
+from core.Search import has_any_condition, make_filters, search
+from core.Trace import enable as enable_trace
+
+
+def parse_date(text):
+    """解析 YYYY-MM-DD"""
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式应为 YYYY-MM-DD: {text}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='pdfsearch',
+        description="按文件名、属性和修改日期搜索文件，结果以 NDJSON（每行一个 JSON 对象）边搜索边输出")
+    parser.add_argument('roots', nargs='+', help="要搜索的文件夹")
+    parser.add_argument('-k', '--keyword', default='', help="文件名关键字（开启 --content 时匹配PDF正文）")
+    parser.add_argument('--category', action='append', metavar='VALUE',
+                        help="Material Category，可重复，多个值时匹配任意一个")
+    parser.add_argument('--model', action='append', metavar='VALUE',
+                        help="Material Model，可重复，多个值时匹配任意一个")
+    parser.add_argument('--apn', action='append', metavar='VALUE', help="APN，可重复，多个值时匹配任意一个")
+    parser.add_argument('--custom', metavar='VALUE', help="自定义属性（文件名子串）")
+    parser.add_argument('--excel', action='append', metavar='PATH',
+                        help="属性表 Excel 文件，可重复；配合 --any-category/--any-model/--any-apn 使用")
+    parser.add_argument('--any-category', action='store_true', help="匹配 Excel 中任意一个 Material Category")
+    parser.add_argument('--any-model', action='store_true', help="匹配 Excel 中任意一个 Material Model")
+    parser.add_argument('--any-apn', action='store_true', help="匹配 Excel 中任意一个 APN")
+    parser.add_argument('--start-date', type=parse_date, metavar='YYYY-MM-DD', help="修改日期不早于")
+    parser.add_argument('--end-date', type=parse_date, metavar='YYYY-MM-DD', help="修改日期不晚于")
+    parser.add_argument('--index', metavar='PATH',
+                        help="使用已建立的文件名索引数据库（缺失或过期的部分会先更新）")
+    parser.add_argument('--refresh', action='store_true', help="使用 --index 时强制检查索引是否过期")
+    parser.add_argument('--content', metavar='CONTENT_INDEX',
+                        help="在此PDF内容索引数据库中搜索关键字，结果带页码")
+    parser.add_argument('--limit', type=int, default=0, help="最多输出的结果数（0 表示不限）")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="记录耗时追踪，结束时写入此 JSON 文件（Chrome trace 格式，也可用环境变量 PDFSEARCH_TRACE）")
+    return parser
+
+
+def attribute_filter(values, any_flag, tags, key):
+    """把命令行的属性参数转成 (单值, 值集合)"""
+    if any_flag:
+        return None, tags.matcher.column_values(key)
+    if not values:
+        return None, None
+    if len(values) == 1:
+        return values[0], None
+    return None, values
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.trace:
+        enable_trace(args.trace)
+
+    tags = None
+    if args.excel:
+        from core.ExcelTags import load_excel_tags
+        tags, _, failed_files = load_excel_tags(args.excel)
+        for filename, reason in failed_files:
+            print(f"{filename}: {reason}", file=sys.stderr)
+        if tags is None:
+            return 2
+    if (args.any_category or args.any_model or args.any_apn) and tags is None:
+        parser.error("--any-category/--any-model/--any-apn 需要 --excel")
+
+    category, category_any = attribute_filter(args.category, args.any_category, tags, 'category')
+    model, model_any = attribute_filter(args.model, args.any_model, tags, 'model')
+    apn, apn_any = attribute_filter(args.apn, args.any_apn, tags, 'apn')
+    filters = make_filters(keyword=args.keyword, category=category, model=model, apn=apn, custom=args.custom,
+                           start_date=args.start_date, end_date=args.end_date, content=bool(args.content),
+                           category_any=category_any, model_any=model_any, apn_any=apn_any,
+                           tag_matcher=tags.matcher if tags else None)
+    if not has_any_condition(filters):
+        parser.error("请设置搜索条件")
+
+    out = sys.stdout
+    count = 0
+    try:
+        for file_info in search(args.roots, filters, index_path=args.index, content_index_path=args.content,
+                                force_refresh=args.refresh):
+            out.write(json.dumps(file_info, ensure_ascii=False) + '\n')
+            out.flush()  # 逐条输出，下游可以边搜索边处理
+            count += 1
+            if args.limit and count >= args.limit:
+                break
+    except BrokenPipeError:
+        # 下游提前关闭（例如 | head）：把 stdout 指向 devnull，避免退出时刷新缓冲区再次报错
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
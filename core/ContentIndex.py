@@ -0,0 +1,293 @@
+import hashlib
+import os
+import re
+import sqlite3
+import unicodedata
+
+from core.FileIndex import subtree_pattern
+
+# 料号、参数等通常带有 - . / 连接符，整体和拆开的部分都作为词条
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./]\w+)*")
+TOKEN_SPLIT_PATTERN = re.compile(r"[-./_]")
+
+
+def normalize_text(text):
+    """统一全角/半角和大小写"""
+    return unicodedata.normalize('NFKC', text).lower()
+
+
+def tokenize(text, split_parts=True):
+    """把文本切分为规范化的词条列表（按出现顺序，不去重）"""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(normalize_text(text)):
+        token = match.group()
+        tokens.append(token)
+        if split_parts:
+            parts = [part for part in TOKEN_SPLIT_PATTERN.split(token) if part]
+            if len(parts) > 1:
+                tokens.extend(parts)
+    return tokens
+
+
+def fast_hash(path, chunk_size=65536):
+    """快速内容哈希：只读取文件头尾各 64KB 并结合文件大小，用于识别仅修改时间变化的文件"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        digest.update(str(size).encode())
+        f.seek(0)
+        digest.update(f.read(chunk_size))
+        if size > chunk_size:
+            f.seek(max(chunk_size, size - chunk_size))
+            digest.update(f.read(chunk_size))
+    return digest.hexdigest()
+
+
+def file_fingerprint(path, with_hash=True):
+    """文件指纹 (大小, 修改时间（纳秒）, 内容哈希)，无法访问时返回 None"""
+    try:
+        stat_info = os.stat(path)
+        content_hash = fast_hash(path) if with_hash else None
+    except OSError:
+        return None
+    return stat_info.st_size, stat_info.st_mtime_ns, content_hash
+
+
+def extract_pages(path):
+    """用 PyMuPDF 逐页提取文本"""
+    import pymupdf as fitz
+
+    pages = []
+    with fitz.open(path) as doc:
+        for page in doc:
+            pages.append(page.get_text("text"))
+    return pages
+
+
+class ContentIndex:
+    """PDF 全文倒排索引（SQLite 存储）
+
+    词条 -> (文档, 页码) 的倒排表，查询时对所有词条求交集，返回命中的页。
+    """
+
+    SCHEMA_VERSION = 3
+
+    def __init__(self, db_path, in_memory=False):
+        """in_memory 为 True 时把索引文件整体复制到内存中，只用于查询
+
+        内存中的副本可以在多个线程间共享（由调用方保证串行访问），查询不再读磁盘。
+        """
+        self.db_path = db_path
+        if in_memory:
+            self.conn = sqlite3.connect(':memory:', check_same_thread=False)
+            source = sqlite3.connect(db_path, timeout=30)
+            try:
+                source.backup(self.conn)
+            finally:
+                source.close()
+        else:
+            db_dir = os.path.dirname(db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            self.conn = sqlite3.connect(db_path, timeout=30)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.token_cache = {}  # 词条 -> 编号
+        self.create_tables()
+
+    def create_tables(self):
+        """创建索引表（版本不一致时重建）"""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == 2:
+            # 版本 2 只记录浮点修改时间：补上纳秒列，之后第一次更新时按内容哈希核对，不必重新提取
+            self.conn.execute("ALTER TABLE docs ADD COLUMN mtime_ns INTEGER NOT NULL DEFAULT 0")
+        elif version != self.SCHEMA_VERSION:
+            self.conn.executescript("""
+                DROP TABLE IF EXISTS postings;
+                DROP TABLE IF EXISTS tokens;
+                DROP TABLE IF EXISTS docs;
+            """)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                name TEXT NOT NULL,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                content_hash TEXT,
+                page_count INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS tokens (
+                id INTEGER PRIMARY KEY,
+                token TEXT UNIQUE NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                token_id INTEGER NOT NULL REFERENCES tokens(id),
+                doc_id INTEGER NOT NULL REFERENCES docs(id) ON DELETE CASCADE,
+                page INTEGER NOT NULL,
+                PRIMARY KEY (token_id, doc_id, page)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings(doc_id);
+        """)
+        self.conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    # ----------- 索引维护 Start -----------
+
+    def add_document(self, path, pages):
+        """写入一个文档的逐页文本（已存在时替换）"""
+        self.add_document_tokens(path, [set(tokenize(text)) for text in pages])
+
+    def add_document_tokens(self, path, page_tokens, fingerprint=None):
+        """写入一个文档已切分好的逐页词条（已存在时替换）
+
+        fingerprint 为提取前记录的 (大小, 修改时间（纳秒）, 内容哈希)，为空时在此处获取。
+        """
+        if fingerprint is None:
+            fingerprint = file_fingerprint(path, with_hash=False)
+        size, mtime_ns, content_hash = fingerprint or (0, 0, None)
+
+        self.conn.execute("DELETE FROM docs WHERE path=?", (path,))
+        cursor = self.conn.execute(
+            "INSERT INTO docs(path, name, mtime, mtime_ns, size, content_hash, page_count) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, os.path.basename(path), mtime_ns / 1e9, mtime_ns, size, content_hash, len(page_tokens)))
+        doc_id = cursor.lastrowid
+
+        postings = []
+        for page_num, tokens in enumerate(page_tokens):
+            for token in tokens:
+                postings.append((self.token_id(token), doc_id, page_num))
+        self.conn.executemany("INSERT OR IGNORE INTO postings(token_id, doc_id, page) VALUES (?, ?, ?)",
+                              postings)
+
+    def token_id(self, token):
+        """获取词条编号，不存在时新建"""
+        token_id = self.token_cache.get(token)
+        if token_id is not None:
+            return token_id
+        row = self.conn.execute("SELECT id FROM tokens WHERE token=?", (token,)).fetchone()
+        if row:
+            token_id = row[0]
+        else:
+            token_id = self.conn.execute("INSERT INTO tokens(token) VALUES (?)", (token,)).lastrowid
+        self.token_cache[token] = token_id
+        return token_id
+
+    def update_fingerprint(self, path, fingerprint):
+        """内容未变化时只更新记录的指纹"""
+        size, mtime_ns, content_hash = fingerprint
+        self.conn.execute("UPDATE docs SET size=?, mtime=?, mtime_ns=?, content_hash=? WHERE path=?",
+                          (size, mtime_ns / 1e9, mtime_ns, content_hash, path))
+
+    def stored_fingerprints(self, roots):
+        """读取根目录下已索引文档的指纹 {路径: (大小, 修改时间（纳秒）, 内容哈希)}"""
+        fingerprints = {}
+        for root in roots:
+            for path, size, mtime_ns, content_hash in self.conn.execute(
+                    "SELECT path, size, mtime_ns, content_hash FROM docs WHERE path LIKE ? ESCAPE '\\'",
+                    (subtree_pattern(root),)):
+                fingerprints[path] = (size, mtime_ns, content_hash)
+        return fingerprints
+
+    def plan_update(self, roots, files, force=False):
+        """对比指纹决定哪些文档需要重新提取
+
+        files 为 {路径: (大小, 修改时间（纳秒）)}（通常来自遍历时的 stat 结果）。
+        修改时间按整数纳秒比较，浮点秒数会丢失精度，漏掉同一秒内的修改。
+        已删除的文档直接从索引中移除；大小和修改时间都未变的跳过；
+        只有修改时间变化但内容哈希相同的只更新指纹。返回需要提取的路径列表。
+        """
+        stored = self.stored_fingerprints(roots)
+        for path in stored.keys() - files.keys():
+            self.remove_document(path)
+
+        todo = []
+        for path, (size, mtime_ns) in files.items():
+            old = stored.get(path)
+            if force or old is None or old[0] != size:
+                todo.append(path)
+            elif old[1] == mtime_ns:
+                continue
+            elif old[2]:
+                fingerprint = file_fingerprint(path)
+                if fingerprint is not None and fingerprint[2] == old[2]:
+                    self.update_fingerprint(path, fingerprint)
+                else:
+                    todo.append(path)
+            else:
+                todo.append(path)
+        self.commit()
+        return todo
+
+    def remove_document(self, path):
+        """删除一个文档的索引"""
+        self.conn.execute("DELETE FROM docs WHERE path=?", (path,))
+
+    def commit(self):
+        """提交事务"""
+        self.conn.commit()
+
+    # ----------- 索引维护 End -----------
+
+    # ----------- 索引查询 Start -----------
+
+    def search(self, query, roots=None):
+        """查询包含所有词条的页，返回 (文档信息, 页码) 列表
+
+        每个查询词条按前缀匹配（如 "1.25" 可命中 "1.25v"），便于边输入边搜索。
+        """
+        tokens = list(dict.fromkeys(tokenize(query, split_parts=False)))
+        if not tokens:
+            return []
+
+        # 对各词条命中的 (文档, 页) 求交集，长词条通常更有区分度，先处理
+        hits = None
+        for token in sorted(tokens, key=len, reverse=True):
+            pages = set(self.conn.execute(
+                "SELECT doc_id, page FROM postings WHERE token_id IN "
+                "(SELECT id FROM tokens WHERE token >= ? AND token < ?)",
+                (token, token + "\U0010ffff")))
+            hits = pages if hits is None else hits & pages
+            if not hits:
+                return []
+
+        doc_ids = sorted({doc_id for doc_id, _ in hits})
+        docs = {}
+        for start in range(0, len(doc_ids), 500):
+            chunk = doc_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for doc_id, path, name, mtime, size in self.conn.execute(
+                    f"SELECT id, path, name, mtime, size FROM docs WHERE id IN ({placeholders})", chunk):
+                if roots and not any(self.in_root(path, root) for root in roots):
+                    continue
+                docs[doc_id] = {
+                    'path': path,
+                    'name': name,
+                    'is_dir': False,
+                    'mtime': mtime,
+                    'size': size
+                }
+
+        results = [(docs[doc_id], page) for doc_id, page in hits if doc_id in docs]
+        results.sort(key=lambda hit: (hit[0]['path'], hit[1]))
+        return results
+
+    @staticmethod
+    def in_root(path, root):
+        """路径是否位于根目录下"""
+        return path.startswith(root.rstrip(os.sep) + os.sep)
+
+    def document_paths(self, root):
+        """列出根目录下已建立索引的文档"""
+        return [row[0] for row in self.conn.execute(
+            "SELECT path FROM docs WHERE path LIKE ? ESCAPE '\\'", (subtree_pattern(root),))]
+
+    # ----------- 索引查询 End -----------
@@ -0,0 +1,95 @@
+import os
+import shutil
+
+from core.FileWalker import TreeWalker
+from core.Trace import span
+
+
+def list_visible_files(folder_path):
+    """列出文件夹下的所有文件（与文件树一样跳过隐藏项）"""
+    files = []
+    for dir_path, infos in TreeWalker([folder_path]).walk():
+        rel_parts = os.path.relpath(dir_path, folder_path).split(os.sep)
+        if any(part.startswith('.') for part in rel_parts if part != os.curdir):
+            continue
+        for info in infos:
+            if not info['is_dir'] and not info['name'].startswith('.'):
+                files.append(info['path'])
+    return files
+
+
+def count_visible(folder_path, is_canceled=None):
+    """统计文件夹下的子文件夹数和文件数（与 list_visible_files 一样跳过隐藏项），返回 (文件夹数, 文件数)"""
+    folder_count = 0
+    file_count = 0
+    for dir_path, infos in TreeWalker([folder_path], is_canceled).walk():
+        rel_parts = os.path.relpath(dir_path, folder_path).split(os.sep)
+        if any(part.startswith('.') for part in rel_parts if part != os.curdir):
+            continue
+        for info in infos:
+            if info['name'].startswith('.'):
+                continue
+            if info['is_dir']:
+                folder_count += 1
+            else:
+                file_count += 1
+    return folder_count, file_count
+
+
+def plan_copy(files, folders, save_dir):
+    """计算每个文件的目标路径，返回 [(源路径, 目标路径), ...]
+
+    属于某个选中文件夹的文件保留相对该文件夹的目录结构（嵌套选中时按最外层文件夹），
+    其余单独选中的文件直接放在 save_dir 下。
+    """
+    folder_by_key = {os.path.normcase(os.path.normpath(folder)): folder for folder in folders}
+    plan = []
+    for file_path in files:
+        # 沿父目录向上查找，最后一个命中的是最外层的选中文件夹
+        outer_folder = None
+        path = os.path.normcase(os.path.normpath(file_path))
+        parent = os.path.dirname(path)
+        while parent and parent != path:
+            if parent in folder_by_key:
+                outer_folder = folder_by_key[parent]
+            path, parent = parent, os.path.dirname(parent)
+
+        if outer_folder is None:
+            dest_path = os.path.join(save_dir, os.path.basename(file_path))
+        else:
+            rel_path = os.path.relpath(file_path, outer_folder)
+            dest_path = os.path.join(save_dir, os.path.basename(outer_folder.rstrip(os.sep)), rel_path)
+        plan.append((file_path, dest_path))
+    return plan
+
+
+def existing_targets(plan):
+    """目标位置已存在的文件"""
+    return [dest_path for _, dest_path in plan if os.path.exists(dest_path)]
+
+
+def copy_selection(plan, overwrite=False, progress_callback=None, is_canceled=None):
+    """按 plan_copy 的结果复制文件
+
+    overwrite 为 False 时跳过已存在的目标；progress_callback(已处理数, 总数)。
+    返回 (成功数, 跳过数, ["文件名: 错误", ...])。
+    """
+    success_count = 0
+    skipped_count = 0
+    error_files = []
+    for done, (file_path, dest_path) in enumerate(plan, 1):
+        if is_canceled and is_canceled():
+            break
+        if not overwrite and os.path.exists(dest_path):
+            skipped_count += 1
+            continue
+        try:
+            with span('save.copy', file=file_path):
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                shutil.copy2(file_path, dest_path)
+            success_count += 1
+        except Exception as e:
+            error_files.append(f"{os.path.basename(file_path)}: {str(e)}")
+        if progress_callback:
+            progress_callback(done, len(plan))
+    return success_count, skipped_count, error_files
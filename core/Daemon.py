@@ -0,0 +1,481 @@
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from core.ContentIndex import ContentIndex
+from core.FileIndex import FileIndex
+from core.Search import content_hits, filter_content_hits, has_any_condition, make_filters
+from core.SearchFilters import compile_filters, tag_sets
+from core.TagMatcher import TagMatcher
+from core.Trace import enable as enable_trace, span
+
+DEFAULT_PORT = 8765
+BUILDING_RETRY_SECONDS = 1  # 索引建立期间建议客户端重试的间隔
+
+
+def daemon_address():
+    """环境变量 PDFSEARCH_DAEMON 指定的搜索服务地址（如 http://127.0.0.1:8765），未设置时返回 None"""
+    return os.environ.get('PDFSEARCH_DAEMON') or None
+
+
+# ----------- 条件序列化 Start -----------
+
+def filters_to_json(filters):
+    """把搜索条件转成可 JSON 序列化的字典（值集合转为列表，去掉匹配器对象）"""
+    data = {}
+    for key, value in filters.items():
+        if key == 'tag_matcher':
+            continue
+        data[key] = sorted(value) if isinstance(value, (set, frozenset)) else value
+    return data
+
+
+def filters_from_json(data):
+    """filters_to_json 的逆操作
+
+    缺少的键取 make_filters() 的默认值；未知的键或类型不对时抛出 ValueError。
+    """
+    if not isinstance(data, dict):
+        raise ValueError("filters 应为对象")
+    filters = make_filters()
+    for key, value in data.items():
+        if key not in filters or key == 'tag_matcher':
+            raise ValueError(f"未知的条件: {key}")
+        default = filters[key]
+        if key.endswith('_any'):
+            if value is not None and not (isinstance(value, list) and all(isinstance(v, str) for v in value)):
+                raise ValueError(f"{key} 应为字符串列表")
+            value = frozenset(v.strip().lower() for v in value) - {''} if value else None
+        elif isinstance(default, bool):
+            if not isinstance(value, bool):
+                raise ValueError(f"{key} 应为 true/false")
+        elif isinstance(default, str):
+            if not isinstance(value, str):
+                raise ValueError(f"{key} 应为字符串")
+            value = value.strip().lower()
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{key} 应为数字")
+        filters[key] = value
+    return filters
+
+
+def roots_from_json(roots):
+    """检查根目录参数：必须是绝对路径字符串的非空列表，否则抛出 ValueError"""
+    if not isinstance(roots, list) or not roots:
+        raise ValueError("roots 应为非空的路径列表")
+    for root in roots:
+        if not isinstance(root, str) or not os.path.isabs(root):
+            raise ValueError(f"根目录应为绝对路径: {root!r}")
+    return roots
+
+# ----------- 条件序列化 End -----------
+
+
+def file_signature(path):
+    """文件的 (修改时间, 大小)，文件不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class IndexBuilding(Exception):
+    """根目录的索引正在后台建立，暂时无法查询"""
+
+    def __init__(self, roots):
+        super().__init__(f"正在建立索引: {', '.join(roots)}")
+        self.roots = roots
+
+
+class SearchService:
+    """常驻内存的搜索服务
+
+    每个根目录的文件名索引条目在第一次查询时从 SQLite 索引载入内存，之后的查询
+    直接在内存中按编译后的条件筛选；索引按 FileIndex 的间隔检查是否过期，
+    有变化时重新载入。同一条件的结果会缓存，分页请求不必重复筛选。
+    """
+
+    MAX_CACHED_QUERIES = 32
+    MAX_CACHED_MATCHERS = 8
+
+    def __init__(self, index_path, content_index_path=None):
+        self.index_path = index_path
+        self.content_index_path = content_index_path
+        self.lock = threading.Lock()  # 只保护下面的字典，建立索引期间不持有
+        self.root_locks = {}  # 根目录 -> 锁，同一根目录同时只有一个线程更新索引
+        self.entries = {}  # 根目录 -> 文件信息列表（整体替换，不原地修改）
+        self.versions = {}  # 根目录 -> 载入时的索引版本
+        self.query_cache = OrderedDict()  # (根目录, 条件) -> (版本, 结果列表)
+        self.matchers = OrderedDict()  # 值集合 -> TagMatcher
+        self.loading = set()  # 正在后台建立/载入索引的根目录
+        self.load_errors = {}  # 根目录 -> 后台载入失败的原因（报告一次后清除）
+        self.content_lock = threading.Lock()  # 内存中的内容索引同时只供一个线程查询
+        self.content_index = None  # 内容索引在内存中的副本
+        self.content_signature = None  # 载入副本时索引文件的 (修改时间, 大小)
+
+    def load_roots(self, roots, force_check=False):
+        """确保根目录已载入且未过期，返回各根目录的版本
+
+        索引的检查、建立和载入都在锁外进行，完成后才替换内存中的条目，
+        因此冷启动建立索引期间，其他根目录的查询和 /status 不会被阻塞。
+        """
+        index = FileIndex(self.index_path)
+        try:
+            for root in roots:
+                with self.lock:
+                    root_lock = self.root_locks.setdefault(root, threading.Lock())
+                with root_lock:
+                    touched = index.ensure_fresh(root, force_check=force_check)
+                    with self.lock:
+                        if root in self.entries and not touched:
+                            continue
+                        loaded_version = self.versions.get(root)
+                    version = index.root_version(root)
+                    if loaded_version != version:
+                        with span('index.load', root=root):
+                            entries = list(index.query(root, {}))
+                        with self.lock:
+                            self.entries[root] = entries
+                            self.versions[root] = version
+        finally:
+            index.close()
+        with self.lock:
+            return tuple(self.versions[root] for root in roots)
+
+    def start_loading(self, roots):
+        """在后台线程中载入尚未载入的根目录，返回仍在载入中的根目录列表
+
+        上一次后台载入失败时抛出 RuntimeError（下一次请求会重新尝试）。
+        """
+        with self.lock:
+            for root in roots:
+                if root in self.load_errors:
+                    raise RuntimeError(f"载入索引失败 {root}: {self.load_errors.pop(root)}")
+            pending = [root for root in roots if root not in self.entries]
+            started = [root for root in pending if root not in self.loading]
+            self.loading.update(started)
+        if started:
+            threading.Thread(target=self.load_in_background, args=(started,), daemon=True).start()
+        return pending
+
+    def load_in_background(self, roots):
+        try:
+            self.load_roots(roots)
+        except Exception as e:
+            print(f"载入索引失败: {e}")
+            with self.lock:
+                self.load_errors.update((root, str(e)) for root in roots if root not in self.entries)
+        finally:
+            with self.lock:
+                self.loading.difference_update(roots)
+
+    def tag_matcher(self, filters):
+        """按条件中的值集合取得（缓存的）匹配器，同一组 Excel 值只构建一次自动机"""
+        sets = tag_sets(filters)
+        if not sets:
+            return None
+        key = tuple(sorted((column, values) for column, values in sets.items()))
+        with self.lock:
+            matcher = self.matchers.pop(key, None)
+            if matcher is None:
+                matcher = TagMatcher(sets)
+            self.matchers[key] = matcher
+            while len(self.matchers) > self.MAX_CACHED_MATCHERS:
+                self.matchers.popitem(last=False)
+        return matcher
+
+    def load_content_index(self):
+        """返回内存中的内容索引副本，磁盘上的索引文件（含 WAL）有变化时重新复制（调用方持有 content_lock）"""
+        signature = tuple(file_signature(self.content_index_path + suffix) for suffix in ('', '-wal'))
+        if self.content_index is None or signature != self.content_signature:
+            if self.content_index is not None:
+                self.content_index.close()
+                self.content_index = None
+            with span('content.load'):
+                self.content_index = ContentIndex(self.content_index_path, in_memory=True)
+            self.content_signature = signature
+        return self.content_index
+
+    def query(self, roots, filters, force_check=False, wait=True):
+        """返回全部匹配结果（列表）
+
+        wait 为 False 时，尚未载入的根目录改为在后台载入，并抛出 IndexBuilding。
+        """
+        roots = list(roots)
+        if filters.get('content_enabled', False):
+            if not self.content_index_path:
+                raise ValueError("搜索服务没有配置PDF内容索引")
+            with self.content_lock:
+                hits = content_hits(self.load_content_index(), roots, filters)
+            return list(filter_content_hits(hits, filters))
+
+        if not wait:
+            pending = self.start_loading(roots)
+            if pending:
+                raise IndexBuilding(pending)
+        versions = self.load_roots(roots, force_check)
+        cache_key = (tuple(roots), json.dumps(filters_to_json(filters), sort_keys=True))
+        with self.lock:
+            cached = self.query_cache.get(cache_key)
+            if cached is not None and cached[0] == versions:
+                self.query_cache.move_to_end(cache_key)
+                return cached[1]
+
+        predicate = compile_filters(dict(filters, tag_matcher=self.tag_matcher(filters)))
+        with span('filter', roots=len(roots)) as filter_span:
+            results = [file_info for root in roots for file_info in self.entries[root] if predicate(file_info)]
+            filter_span.set(results=len(results))
+        with self.lock:
+            self.query_cache[cache_key] = (versions, results)
+            while len(self.query_cache) > self.MAX_CACHED_QUERIES:
+                self.query_cache.popitem(last=False)
+        return results
+
+    def status(self):
+        with self.lock:
+            return {'roots': {root: len(entries) for root, entries in self.entries.items()},
+                    'loading': sorted(self.loading),
+                    'cached_queries': len(self.query_cache)}
+
+
+# ----------- HTTP 接口 Start -----------
+
+def filters_from_query(params):
+    """从 GET 参数生成条件（参数名与命令行一致，属性参数可重复表示任意一个）"""
+    def single(name):
+        values = params.get(name)
+        return values[0] if values else None
+
+    def attribute(name):
+        values = params.get(name)
+        if not values:
+            return None, None
+        return (values[0], None) if len(values) == 1 else (None, values)
+
+    def parse_day(name):
+        text = single(name)
+        return date.fromisoformat(text) if text else None
+
+    category, category_any = attribute('category')
+    model, model_any = attribute('model')
+    apn, apn_any = attribute('apn')
+    return make_filters(keyword=single('keyword') or '', category=category, model=model, apn=apn,
+                        custom=single('custom'), start_date=parse_day('start_date'), end_date=parse_day('end_date'),
+                        content=single('content') in ('1', 'true'),
+                        category_any=category_any, model_any=model_any, apn_any=apn_any)
+
+
+def parse_count(value, name):
+    """解析分页参数（非负整数），格式错误时抛出 ValueError"""
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} 应为非负整数: {value!r}")
+    if count < 0:
+        raise ValueError(f"{name} 应为非负整数: {value!r}")
+    return count
+
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    """HTTP 接口
+
+    GET  /status
+    GET  /search?root=...&keyword=...&apn=...&offset=0&limit=100[&stream=1]
+    POST /search  {"roots": [...], "filters": {...}, "offset": 0, "limit": 0, "stream": false, "refresh": false}
+
+    分页时返回 {"total", "offset", "results"}；stream 为真时逐行输出 NDJSON。
+    """
+
+    server_version = 'PDFSearchDaemon/1.0'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/status':
+            self.send_json(200, self.server.service.status())
+            return
+        if url.path != '/search':
+            self.send_json(404, {'error': 'not found'})
+            return
+        params = parse_qs(url.query)
+        try:
+            roots = roots_from_json(params.get('root', []))
+            filters = filters_from_query(params)
+            offset = parse_count(params.get('offset', ['0'])[0], 'offset')
+            limit = parse_count(params.get('limit', ['0'])[0], 'limit')
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        self.handle_search(roots, filters, offset, limit,
+                           params.get('stream', ['0'])[0] in ('1', 'true'),
+                           params.get('refresh', ['0'])[0] in ('1', 'true'))
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/search':
+            self.send_json(404, {'error': 'not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(request, dict):
+                raise ValueError("请求应为 JSON 对象")
+            roots = roots_from_json(request.get('roots'))
+            filters = filters_from_json(request.get('filters', {}))
+            offset = parse_count(request.get('offset', 0), 'offset')
+            limit = parse_count(request.get('limit', 0), 'limit')
+        except ValueError as e:
+            self.send_json(400, {'error': f"请求格式错误: {e}"})
+            return
+        self.handle_search(roots, filters, offset, limit,
+                           bool(request.get('stream', False)), bool(request.get('refresh', False)))
+
+    def handle_search(self, roots, filters, offset, limit, stream, refresh):
+        if not has_any_condition(filters):
+            self.send_json(400, {'error': "请设置搜索条件"})
+            return
+        try:
+            # 冷启动建立索引可能需要很久，不阻塞请求，让客户端稍后重试
+            results = self.server.service.query(roots, filters, refresh, wait=False)
+        except IndexBuilding as e:
+            self.send_json(503, {'status': 'building', 'roots': e.roots},
+                           {'Retry-After': str(BUILDING_RETRY_SECONDS)})
+            return
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self.send_json(500, {'error': str(e)})
+            return
+
+        page = results[offset:offset + limit] if limit else results[offset:]
+        if not stream:
+            self.send_json(200, {'total': len(results), 'offset': offset, 'results': page})
+            return
+
+        # 流式输出：不给出长度，写完后关闭连接
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('X-Total-Count', str(len(results)))
+        self.end_headers()
+        try:
+            for file_info in page:
+                self.wfile.write((json.dumps(file_info, ensure_ascii=False) + '\n').encode('utf-8'))
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 客户端已取消
+        self.close_connection = True
+
+    def send_json(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 不逐条打印请求
+
+
+def make_server(service, host='127.0.0.1', port=DEFAULT_PORT):
+    """创建 HTTP 服务（port 为 0 时自动选择端口）"""
+    server = ThreadingHTTPServer((host, port), SearchRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def serve(service, host='127.0.0.1', port=DEFAULT_PORT):
+    """启动 HTTP 服务（阻塞）"""
+    server = make_server(service, host, port)
+    print(f"搜索服务已启动: http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+# ----------- HTTP 接口 End -----------
+
+
+# ----------- 客户端 Start -----------
+
+def remote_search(address, roots, filters, force_refresh=False, progress_callback=None, is_canceled=None,
+                  timeout=30, build_timeout=600):
+    """向搜索服务发起流式查询，返回逐条产生文件信息的迭代器
+
+    连接失败时立即抛出 OSError（调用方可以改为本地搜索），之后边接收边返回。
+    服务正在建立索引（冷启动）时按 Retry-After 重试，最多等待 build_timeout 秒，
+    等待期间取消则返回空的迭代器。
+    """
+    body = json.dumps({'roots': list(roots), 'filters': filters_to_json(filters),
+                       'stream': True, 'refresh': force_refresh}).encode('utf-8')
+    deadline = time.monotonic() + build_timeout
+    while True:
+        request = urllib.request.Request(address.rstrip('/') + '/search', data=body,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            response = urllib.request.urlopen(request, timeout=timeout)
+            break
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode('utf-8', 'replace')
+            if e.code != 503 or time.monotonic() >= deadline:
+                raise OSError(f"搜索服务返回错误 {e.code}: {detail}") from e
+            try:
+                retry_after = max(float(e.headers.get('Retry-After', BUILDING_RETRY_SECONDS)), 0.1)
+            except ValueError:
+                retry_after = BUILDING_RETRY_SECONDS
+        if progress_callback:
+            progress_callback(0, 0)
+        wait_until = time.monotonic() + retry_after
+        while time.monotonic() < wait_until:
+            if is_canceled and is_canceled():
+                return iter(())
+            time.sleep(0.1)
+
+    def results():
+        total = int(response.headers.get('X-Total-Count', 0))
+        with response:
+            for received, line in enumerate(response, 1):
+                if is_canceled and is_canceled():
+                    return
+                yield json.loads(line)
+                if progress_callback and received % 100 == 0:
+                    progress_callback(received, total)
+
+    return results()
+
+# ----------- 客户端 End -----------
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='pdfsearchd',
+        description="常驻的搜索服务：索引保存在内存中，多个客户端共用，通过 HTTP/JSON 查询")
+    parser.add_argument('--index', required=True, metavar='PATH', help="文件名索引数据库（不存在时自动建立）")
+    parser.add_argument('--content-index', metavar='PATH', help="PDF内容索引数据库")
+    parser.add_argument('--root', action='append', default=[], help="启动时预先载入的根目录，可重复")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址（默认只允许本机访问）")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="监听端口")
+    parser.add_argument('--trace', metavar='PATH', help="记录耗时追踪，退出时写入此 JSON 文件（Chrome trace 格式）")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        enable_trace(args.trace)
+
+    service = SearchService(args.index, args.content_index)
+    if args.root:
+        service.load_roots(args.root)
+        print(f"已载入 {sum(service.status()['roots'].values())} 个条目")
+    serve(service, args.host, args.port)
+    return 0
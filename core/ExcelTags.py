@@ -0,0 +1,71 @@
+import os
+
+from core.TagMatcher import TagMatcher
+from core.Trace import span
+
+# Excel中用于属性筛选的列: 属性 -> 列标题
+EXCEL_TAG_COLUMNS = {'category': 'Material Category', 'model': 'Material Model', 'apn': 'APN'}
+
+
+class ExcelTags:
+    """从 Excel 读取的分类/型号/APN 属性表
+
+    categories 为全部分类，models[i]/apns[i] 为第 i 个分类下的型号/APN，
+    matcher 用于按某一列的全部值筛选文件名。
+    """
+
+    def __init__(self, data):
+        columns = list(EXCEL_TAG_COLUMNS.values())
+        # 前向填充NaN（合并单元格只在第一行有值）
+        self.data = data[columns].ffill()
+
+        # 将数据分组存储（用于下拉框）；分类为空的行（表头之前的空白单元格）没有分组，不列出
+        self.categories = self.data[columns[0]].dropna().unique().tolist()
+        self.models = []
+        self.apns = []
+        grouped = self.data.groupby(columns[0], sort=False)
+        for category in self.categories:
+            group = grouped.get_group(category)
+            self.models.append(group[columns[1]].unique().tolist())
+            self.apns.append(group[columns[2]].unique().tolist())
+
+        self.matcher = TagMatcher.from_excel_data(self.data, EXCEL_TAG_COLUMNS)
+
+
+def load_excel_tags(excel_paths):
+    """读取一个或多个 Excel 文件并合并
+
+    返回 (ExcelTags 或 None, 成功的文件名列表, [(失败的文件名, 原因), ...])。
+    """
+    with span('excel.import'):
+        import pandas as pd  # 只在读取 Excel 时才需要
+
+    all_dfs = []
+    success_files = []  # 成功读取的文件
+    failed_files = []  # 读取失败的文件及其原因
+
+    for excel_path in excel_paths:
+        try:
+            with span('excel.read', file=os.path.basename(excel_path)):
+                df = pd.read_excel(excel_path)
+        except Exception as e:
+            failed_files.append((os.path.basename(excel_path), f"读取错误: {str(e)}"))
+            continue
+
+        # 检查是否包含必要的列
+        missing_columns = [col for col in EXCEL_TAG_COLUMNS.values() if col not in df.columns]
+        if missing_columns:
+            failed_files.append((os.path.basename(excel_path), f"缺少必要列: {', '.join(missing_columns)}"))
+            continue
+
+        all_dfs.append(df)
+        success_files.append(os.path.basename(excel_path))
+
+    if not all_dfs:
+        return None, success_files, failed_files
+
+    # 合并所有DataFrame
+    combined_df = pd.concat(all_dfs, ignore_index=True)
+    with span('excel.tags', rows=len(combined_df)):
+        tags = ExcelTags(combined_df)
+    return tags, success_files, failed_files
@@ -0,0 +1,326 @@
+import os
+import sqlite3
+import time
+
+from core.FileWalker import ParallelTreeWalker, scan_dir
+from core.SearchFilters import name_substrings, time_range
+
+
+def subtree_pattern(dir_path):
+    """构造匹配目录下所有路径的 LIKE 模式（配合 ESCAPE '\\' 使用）"""
+    prefix = dir_path.rstrip(os.sep) + os.sep
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def normalize_root(root):
+    """统一根目录的写法（去掉末尾的分隔符等），同一目录只建立一份索引"""
+    return os.path.normpath(root)
+
+
+def is_under(path, root):
+    """路径是否为根目录本身或其后代"""
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+class FileIndex:
+    """基于 SQLite 的持久化文件名索引
+
+    每个根目录只完整遍历一次，之后通过比较目录的 mtime 判断是否过期，
+    只重新扫描发生变化的目录。查询直接在索引上进行，不再访问文件系统。
+    各根目录的记录以 (根目录, 路径) 为键相互独立，嵌套的根目录（如 /r 和 /r/a）互不覆盖。
+    """
+
+    SCHEMA_VERSION = 2
+    # 两次过期检查之间的最小间隔（秒），避免每次按键都 stat 所有目录
+    STALE_CHECK_INTERVAL = 30
+    # 超过该时间强制完整重建（秒），用于兜底目录 mtime 不可靠的网络盘
+    MAX_AGE = 24 * 3600
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.create_tables()
+
+    def create_tables(self):
+        """创建索引表（版本不一致时重建）"""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            self.conn.executescript("""
+                DROP TABLE IF EXISTS roots;
+                DROP TABLE IF EXISTS dirs;
+                DROP TABLE IF EXISTS entries;
+            """)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS roots (
+                root TEXT PRIMARY KEY,
+                built_at REAL NOT NULL,
+                checked_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS dirs (
+                root TEXT NOT NULL,
+                path TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                PRIMARY KEY (root, path)
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                root TEXT NOT NULL,
+                path TEXT NOT NULL,
+                parent TEXT NOT NULL,
+                name TEXT NOT NULL,
+                name_lower TEXT NOT NULL,
+                is_dir INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                PRIMARY KEY (root, path)
+            );
+            CREATE INDEX IF NOT EXISTS idx_dirs_path ON dirs(path);
+            CREATE INDEX IF NOT EXISTS idx_entries_parent ON entries(root, parent);
+        """)
+        self.conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+        self.conn.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    # ----------- 索引维护 Start -----------
+
+    def has_root(self, root):
+        """根目录是否已经建立过索引"""
+        row = self.conn.execute("SELECT 1 FROM roots WHERE root=?", (normalize_root(root),)).fetchone()
+        return row is not None
+
+    def roots_containing(self, path):
+        """包含该路径的所有已索引根目录（根目录可以相互嵌套）"""
+        return [root for (root,) in self.conn.execute("SELECT root FROM roots") if is_under(path, root)]
+
+    def ensure_fresh(self, root, force_check=False, progress_callback=None, is_canceled=None):
+        """确保根目录的索引可用且未过期，返回本次是否访问了文件系统"""
+        root = normalize_root(root)
+        now = time.time()
+        row = self.conn.execute("SELECT built_at, checked_at FROM roots WHERE root=?", (root,)).fetchone()
+
+        if row is None or now - row[0] > self.MAX_AGE:
+            self.build(root, progress_callback, is_canceled)
+            return True
+
+        if not force_check and now - row[1] < self.STALE_CHECK_INTERVAL:
+            return False
+
+        stale_dirs = self.find_stale_dirs(root, is_canceled)
+        if stale_dirs:
+            self.rescan_dirs(root, stale_dirs, progress_callback, is_canceled)
+        if is_canceled and is_canceled():
+            return True
+        self.conn.execute("UPDATE roots SET checked_at=? WHERE root=?", (time.time(), root))
+        self.conn.commit()
+        return True
+
+    def build(self, root, progress_callback=None, is_canceled=None):
+        """完整重建一个根目录的索引"""
+        self.remove_root(root)
+        self.index_tree(root, root, progress_callback, is_canceled)
+        if is_canceled and is_canceled():
+            # 未完成的索引不能当作有效索引使用
+            self.conn.rollback()
+            self.remove_root(root)
+            return
+        now = time.time()
+        self.conn.execute("INSERT OR REPLACE INTO roots(root, built_at, checked_at) VALUES (?, ?, ?)",
+                          (root, now, now))
+        self.conn.commit()
+
+    def remove_root(self, root):
+        """删除根目录的全部索引数据"""
+        root = normalize_root(root)
+        self.conn.execute("DELETE FROM entries WHERE root=?", (root,))
+        self.conn.execute("DELETE FROM dirs WHERE root=?", (root,))
+        self.conn.execute("DELETE FROM roots WHERE root=?", (root,))
+        self.conn.commit()
+
+    def index_tree(self, root, top, progress_callback=None, is_canceled=None):
+        """遍历 top 目录并写入索引（不提交事务）"""
+        walker = ParallelTreeWalker([top], is_canceled)
+        for dir_path, infos in walker.walk():
+            self.write_dir(root, dir_path, infos)
+            if progress_callback:
+                progress_callback(walker.entries_seen)
+        return walker.entries_seen
+
+    def write_dir(self, root, dir_path, infos):
+        """写入一个目录的全部直接子项及目录本身的 mtime"""
+        rows = [(root, info['path'], dir_path, info['name'], info['name'].lower(),
+                 int(info['is_dir']), info['mtime'], info['size']) for info in infos]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO entries(root, path, parent, name, name_lower, is_dir, mtime, size) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.conn.execute("INSERT OR REPLACE INTO dirs(root, path, mtime_ns) VALUES (?, ?, ?)",
+                          (root, dir_path, self.dir_mtime_ns(dir_path)))
+
+    @staticmethod
+    def dir_mtime_ns(path):
+        """获取目录的修改时间（纳秒），无法访问时返回 -1"""
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return -1
+
+    def find_stale_dirs(self, root, is_canceled=None):
+        """找出 mtime 发生变化的目录（目录内有新增、删除或重命名）"""
+        stale = []
+        for path, mtime_ns in self.conn.execute("SELECT path, mtime_ns FROM dirs WHERE root=?", (root,)).fetchall():
+            if is_canceled and is_canceled():
+                break
+            if self.dir_mtime_ns(path) != mtime_ns:
+                stale.append(path)
+        return stale
+
+    def rescan_dirs(self, root, dir_paths, progress_callback=None, is_canceled=None):
+        """只重新扫描指定目录的直接子项，新增的子目录整体建立索引"""
+        for dir_path in dir_paths:
+            if is_canceled and is_canceled():
+                break
+            if not os.path.isdir(dir_path):
+                self.remove_subtree(root, dir_path)
+                continue
+
+            old_children = {
+                path: is_dir for path, is_dir in
+                self.conn.execute("SELECT path, is_dir FROM entries WHERE root=? AND parent=?", (root, dir_path))
+            }
+            infos, subdirs = scan_dir(dir_path)
+            subdirs = set(subdirs)
+
+            new_dirs = []
+            for info in infos:
+                old_is_dir = old_children.pop(info['path'], None)
+                if info['path'] in subdirs and not old_is_dir:
+                    new_dirs.append(info['path'])
+
+            # 已消失的子项（包括整个子目录）
+            for path, is_dir in old_children.items():
+                if is_dir:
+                    self.remove_subtree(root, path)
+                else:
+                    self.conn.execute("DELETE FROM entries WHERE root=? AND path=?", (root, path))
+
+            self.write_dir(root, dir_path, infos)
+
+            for new_dir in new_dirs:
+                self.index_tree(root, new_dir, progress_callback, is_canceled)
+
+        self.conn.commit()
+
+    def remove_subtree(self, root, dir_path):
+        """删除根目录索引中该目录本身及其下所有记录"""
+        pattern = subtree_pattern(dir_path)
+        for table in ('entries', 'dirs'):
+            self.conn.execute(f"DELETE FROM {table} WHERE root=? AND (path=? OR path LIKE ? ESCAPE '\\')",
+                              (root, dir_path, pattern))
+
+    def apply_changes(self, changes):
+        """把文件监视器报告的增量变化应用到索引，代价只与变化数量相关"""
+        touched_dirs = set()
+        for change in changes:
+            change_type = change['type']
+            path = change['path']
+            # 变化作用于包含该路径的每个已索引根目录；尚未建立索引的根目录，首次搜索时会完整构建
+            roots = self.roots_containing(path)
+            if change_type == 'rescan':
+                for root in roots:
+                    stale_dirs = self.find_stale_dirs(root)
+                    if stale_dirs:
+                        self.rescan_dirs(root, stale_dirs)
+                continue
+
+            moved_roots = []  # 目录在其索引内移动、可以直接改写路径的根目录
+            if change_type == 'moved':
+                old_path = change['old_path']
+                touched_dirs.add(os.path.dirname(old_path))
+                for root in self.roots_containing(old_path):
+                    if change['is_dir'] and root in roots:
+                        self.move_subtree(root, old_path, path)
+                        moved_roots.append(root)
+                    else:
+                        self.remove_subtree(root, old_path)
+            elif change_type == 'deleted':
+                for root in roots:
+                    self.remove_subtree(root, path)
+
+            if change_type in ('created', 'moved', 'modified'):
+                for root in roots:
+                    self.write_entry(root, path)
+                    if change['is_dir'] and change_type != 'modified' and root not in moved_roots:
+                        self.index_tree(root, path)
+            touched_dirs.add(os.path.dirname(path))
+
+        # 同步父目录的 mtime，避免之后的过期检查重复扫描这些目录
+        for dir_path in touched_dirs:
+            self.conn.execute("UPDATE dirs SET mtime_ns=? WHERE path=?", (self.dir_mtime_ns(dir_path), dir_path))
+        self.conn.commit()
+
+    def write_entry(self, root, path):
+        """写入（或更新）单个条目"""
+        try:
+            stat_info = os.stat(path)
+        except OSError:
+            return
+        name = os.path.basename(path)
+        is_dir = os.path.isdir(path)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries(root, path, parent, name, name_lower, is_dir, mtime, size) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (root, path, os.path.dirname(path), name, name.lower(), int(is_dir),
+             stat_info.st_mtime, stat_info.st_size))
+
+    def move_subtree(self, root, old_path, new_path):
+        """目录重命名：直接改写根目录索引中的路径，无需重新遍历"""
+        pattern = subtree_pattern(old_path)
+        start = len(old_path) + 1
+        self.conn.execute("DELETE FROM entries WHERE root=? AND path=?", (root, old_path))
+        for table, column in (('entries', 'path'), ('entries', 'parent'), ('dirs', 'path')):
+            self.conn.execute(
+                f"UPDATE {table} SET {column} = ? || substr({column}, ?) "
+                f"WHERE root=? AND ({column}=? OR {column} LIKE ? ESCAPE '\\')",
+                (new_path, start, root, old_path, pattern))
+
+    # ----------- 索引维护 End -----------
+
+    # ----------- 索引查询 Start -----------
+
+    def root_version(self, root):
+        """根目录索引内容的版本标记 (条目数, 最大 rowid)，内容有增删改时会变化"""
+        return tuple(self.conn.execute("SELECT count(*), max(rowid) FROM entries WHERE root=?",
+                                       (normalize_root(root),)).fetchone())
+
+    def query(self, root, filters):
+        """在索引中查询符合条件的项，逐条返回文件信息字典"""
+        sql = "SELECT path, name, is_dir, mtime, size FROM entries WHERE root=?"
+        params = [normalize_root(root)]
+
+        # 名称子串条件与 passes_filters 保持一致
+        for value in name_substrings(filters).values():
+            sql += " AND instr(name_lower, ?) > 0"
+            params.append(value)
+
+        mtime_range = time_range(filters)
+        if mtime_range is not None:
+            sql += " AND mtime BETWEEN ? AND ?"
+            params.extend(mtime_range)
+
+        sql += " ORDER BY rowid"
+        for path, name, is_dir, mtime, size in self.conn.execute(sql, params):
+            yield {
+                'path': path,
+                'name': name,
+                'is_dir': bool(is_dir),
+                'mtime': mtime,
+                'size': size
+            }
+
+    # ----------- 索引查询 End -----------
@@ -0,0 +1,215 @@
+import os
+import queue
+import threading
+
+from core.Trace import span
+
+
+def make_entry_info(entry):
+    """根据 os.DirEntry 构造文件信息字典（复用 DirEntry 自带的类型和 stat 缓存）"""
+    try:
+        is_dir = entry.is_dir()
+    except OSError:
+        is_dir = False
+    try:
+        stat_info = entry.stat()
+        mtime, size = stat_info.st_mtime, stat_info.st_size
+    except OSError:
+        mtime, size = 0, 0
+    return {
+        'path': entry.path,
+        'name': entry.name,
+        'is_dir': is_dir,
+        'mtime': mtime,
+        'size': size
+    }
+
+
+def make_entry_info_ns(entry):
+    """与 make_entry_info 相同，另外记录纳秒精度的修改时间 'mtime_ns'（用于判断文件是否变化）"""
+    info = make_entry_info(entry)
+    try:
+        info['mtime_ns'] = entry.stat().st_mtime_ns
+    except OSError:
+        info['mtime_ns'] = 0
+    return info
+
+
+def scan_dir(dir_path, name_filter=None, make_info=make_entry_info):
+    """列出单个目录，返回 (文件信息列表, 需要继续遍历的子目录列表)
+
+    与 os.walk 一样不跟随符号链接目录，但符号链接目录本身仍作为结果返回。
+    name_filter(文件名) 为 False 的项不返回，也不 stat（子目录仍继续遍历）。
+    make_info(DirEntry) 生成每一项的文件信息。
+    """
+    infos, subdirs, _ = scan_dir_counted(dir_path, name_filter, make_info)
+    return infos, subdirs
+
+
+def scan_dir_counted(dir_path, name_filter=None, make_info=make_entry_info):
+    """与 scan_dir 相同，另外返回目录中的条目总数（含被 name_filter 排除的项，用于计算进度）
+
+    先列出目录再逐项 stat，追踪时两步的耗时分开记录。
+    """
+    matched = []
+    entry_count = 0
+    subdirs = []
+    with span('walk.list', dir=dir_path):
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    entry_count += 1
+                    if name_filter is None or name_filter(entry.name):
+                        matched.append(entry)
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        try:
+                            if not entry.is_symlink():
+                                subdirs.append(entry.path)
+                        except OSError:
+                            pass
+        except OSError:
+            pass
+
+    with span('walk.stat', count=len(matched)):
+        infos = [make_info(entry) for entry in matched]
+
+    # 保持 os.walk 的顺序：先目录后文件
+    infos.sort(key=lambda info: not info['is_dir'])
+    return infos, subdirs, entry_count
+
+
+class TreeWalker:
+    """基于 os.scandir 的单次流式遍历器
+
+    每个目录只列出一次，边遍历边返回结果；由于总数未知，进度按
+    “已访问目录 / (已访问 + 待访问目录)” 估算。
+    """
+
+    def __init__(self, base_paths, is_canceled=None, name_filter=None, make_info=make_entry_info):
+        self.base_paths = list(base_paths)
+        self.is_canceled = is_canceled
+        self.name_filter = name_filter  # 只返回文件名符合条件的项（见 scan_dir）
+        self.make_info = make_info  # DirEntry -> 文件信息
+        self.dirs_visited = 0
+        self.entries_seen = 0  # 已列出的条目数（不论是否符合 name_filter），用于进度和估算总数
+        self.pending = []
+
+    def walk(self):
+        """逐个目录返回 (目录路径, 文件信息列表)"""
+        # 使用栈实现先序深度优先遍历
+        self.pending = list(reversed(self.base_paths))
+        while self.pending:
+            if self.is_canceled and self.is_canceled():
+                return
+            dir_path = self.pending.pop()
+            infos, subdirs, entry_count = scan_dir_counted(dir_path, self.name_filter, self.make_info)
+            self.pending.extend(reversed(subdirs))
+            self.dirs_visited += 1
+            self.entries_seen += entry_count
+            yield dir_path, infos
+
+    def pending_dirs(self):
+        """尚未列出的目录数"""
+        return len(self.pending)
+
+    def estimated_total(self):
+        """按目录访问比例估算条目总数"""
+        if not self.dirs_visited:
+            return 0
+        ratio = (self.dirs_visited + self.pending_dirs()) / self.dirs_visited
+        return int(self.entries_seen * ratio)
+
+
+class ParallelTreeWalker(TreeWalker):
+    """多线程工作队列遍历器
+
+    一组工作线程从共享队列中取出目录执行 scandir，再把子目录放回队列；
+    结果统一交回调用 walk() 的线程，因此信号的发送线程和取消语义都保持不变。
+    适合 SMB/NFS 等列目录延迟高的网络盘以及多根目录同时搜索。
+    """
+
+    DEFAULT_WORKERS = 8
+
+    def __init__(self, base_paths, is_canceled=None, max_workers=None, name_filter=None,
+                 make_info=make_entry_info):
+        super().__init__(base_paths, is_canceled, name_filter, make_info)
+        self.max_workers = max_workers or self.DEFAULT_WORKERS
+        self.outstanding = 0  # 已入队但结果尚未被取走的目录数
+        self.lock = threading.Lock()
+
+    def walk(self):
+        """逐个目录返回 (目录路径, 文件信息列表)，顺序不固定"""
+        if not self.base_paths:
+            return
+
+        dir_queue = queue.Queue()
+        result_queue = queue.Queue()
+        stop_event = threading.Event()
+
+        def worker():
+            while True:
+                dir_path = dir_queue.get()
+                if dir_path is None:
+                    return
+                if stop_event.is_set():
+                    continue  # 已停止，只清空队列
+                infos, entry_count, error = [], 0, None
+                try:
+                    try:
+                        infos, subdirs, entry_count = scan_dir_counted(dir_path, self.name_filter,
+                                                                       self.make_info)
+                    except Exception as e:
+                        # scan_dir 只处理 OSError，其他异常也要交回结果，否则计数永远不会归零
+                        infos, subdirs, error = [], [], e
+                    # 先登记子目录再交出结果，保证计数不会提前归零
+                    with self.lock:
+                        self.outstanding += len(subdirs)
+                    for subdir in subdirs:
+                        dir_queue.put(subdir)
+                finally:
+                    result_queue.put((dir_path, infos, entry_count, error))
+
+        self.outstanding = len(self.base_paths)
+        for base_path in self.base_paths:
+            dir_queue.put(base_path)
+
+        workers = []
+        for _ in range(self.max_workers):
+            # 守护线程：取消时不必等待卡在慢速网络盘上的 scandir 返回
+            thread = threading.Thread(target=worker, daemon=True)
+            thread.start()
+            workers.append(thread)
+
+        try:
+            while True:
+                if self.is_canceled and self.is_canceled():
+                    return
+                try:
+                    dir_path, infos, entry_count, error = result_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if error is not None:
+                    print(f"遍历目录失败: {dir_path} -> {error!r}")
+
+                with self.lock:
+                    self.outstanding -= 1
+                    done = self.outstanding == 0
+                self.dirs_visited += 1
+                self.entries_seen += entry_count
+                yield dir_path, infos
+
+                if done:
+                    return
+        finally:
+            stop_event.set()
+            for _ in workers:
+                dir_queue.put(None)
+
+    def pending_dirs(self):
+        """尚未处理完的目录数"""
+        with self.lock:
+            return self.outstanding
@@ -0,0 +1,313 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from core.FileWalker import TreeWalker, scan_dir
+
+# inotify 事件掩码（见 <sys/inotify.h>）
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+EVENT_HEADER = struct.Struct('iIII')
+
+# inotify 收不到其他客户端修改的网络文件系统
+NETWORK_FS_TYPES = {'cifs', 'smb3', 'smbfs', 'nfs', 'nfs4', 'fuse.sshfs', '9p', 'afs'}
+
+
+def make_change(change_type, path, is_dir, root, old_path=None):
+    """构造一条变化记录：created / deleted / moved / modified / rescan"""
+    return {
+        'type': change_type,
+        'path': path,
+        'old_path': old_path,
+        'is_dir': is_dir,
+        'root': root
+    }
+
+
+def is_network_path(path):
+    """判断路径是否位于网络文件系统（仅 Linux，通过 /proc/mounts 判断）"""
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        with open('/proc/mounts') as f:
+            mounts = f.read().splitlines()
+    except OSError:
+        return False
+
+    real_path = os.path.realpath(path)
+    best_mount, best_type = '', ''
+    for line in mounts:
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        mount_point = parts[1].replace('\\040', ' ')
+        if real_path == mount_point or real_path.startswith(mount_point.rstrip('/') + '/'):
+            if len(mount_point) > len(best_mount):
+                best_mount, best_type = mount_point, parts[2]
+    return best_type in NETWORK_FS_TYPES
+
+
+class WatcherBackend:
+    """监视后端基类"""
+
+    def __init__(self, roots, is_canceled=None):
+        self.roots = list(roots)
+        self.is_canceled = is_canceled  # 遍历目录树时检查，停止监视不必等遍历结束
+
+    def root_of(self, path):
+        """找出路径所属的根目录"""
+        for root in self.roots:
+            if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+                return root
+        return None
+
+    def poll(self, timeout):
+        """等待最多 timeout 秒，返回期间发生的变化列表"""
+        raise NotImplementedError
+
+    def request_poll(self):
+        """要求尽快检查一次变化（轮询后端使用）"""
+
+    def close(self):
+        """释放资源"""
+
+
+class InotifyBackend(WatcherBackend):
+    """基于 Linux inotify 的监视后端（通过 ctypes 调用，无需额外依赖）"""
+
+    MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_CLOSE_WRITE | IN_ONLYDIR
+
+    def __init__(self, roots, is_canceled=None):
+        super().__init__(roots, is_canceled)
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 失败: {os.strerror(errno)}")
+        self.wd_to_path = {}
+        self.path_to_wd = {}
+        try:
+            for root in self.roots:
+                self.watch_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def add_watch(self, dir_path):
+        """为单个目录添加监视，超过系统监视数上限时抛出 OSError"""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dir_path), self.MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch 失败: {os.strerror(errno)}", dir_path)
+        self.wd_to_path[wd] = dir_path
+        self.path_to_wd[dir_path] = wd
+
+    def watch_tree(self, top):
+        """递归监视 top 及其所有子目录"""
+        for dir_path, _ in TreeWalker([top], self.is_canceled).walk():
+            self.add_watch(dir_path)
+
+    def forget_tree(self, top):
+        """移除 top 及其子目录的监视"""
+        prefix = top.rstrip(os.sep) + os.sep
+        for path in [p for p in self.path_to_wd if p == top or p.startswith(prefix)]:
+            wd = self.path_to_wd.pop(path)
+            self.wd_to_path.pop(wd, None)
+            self.libc.inotify_rm_watch(self.fd, wd)
+
+    def rename_tree(self, old_top, new_top):
+        """目录在监视范围内移动后，更新监视路径映射（内核中的监视仍然有效）"""
+        prefix = old_top.rstrip(os.sep) + os.sep
+        for path in [p for p in self.path_to_wd if p == old_top or p.startswith(prefix)]:
+            wd = self.path_to_wd.pop(path)
+            new_path = new_top + path[len(old_top):]
+            self.path_to_wd[new_path] = wd
+            self.wd_to_path[wd] = new_path
+
+    def poll(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        data = b''
+        while True:
+            try:
+                chunk = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            data += chunk
+        return self.parse_events(data)
+
+    def parse_events(self, data):
+        """解析 inotify 事件，按 cookie 配对 MOVED_FROM/MOVED_TO 为重命名"""
+        changes = []
+        moved_from = {}
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].split(b'\0', 1)[0]
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                # 事件队列溢出，无法得知具体变化，只能整体重新检查
+                for root in self.roots:
+                    changes.append(make_change('rescan', root, True, root))
+                continue
+            if mask & IN_IGNORED:
+                path = self.wd_to_path.pop(wd, None)
+                if path is not None and self.path_to_wd.get(path) == wd:
+                    del self.path_to_wd[path]
+                continue
+
+            dir_path = self.wd_to_path.get(wd)
+            if dir_path is None or not name:
+                continue
+            path = os.path.join(dir_path, os.fsdecode(name))
+            is_dir = bool(mask & IN_ISDIR)
+            root = self.root_of(path)
+
+            try:
+                if mask & IN_CREATE:
+                    changes.append(make_change('created', path, is_dir, root))
+                    if is_dir:
+                        self.watch_tree(path)
+                elif mask & IN_DELETE:
+                    changes.append(make_change('deleted', path, is_dir, root))
+                elif mask & IN_CLOSE_WRITE:
+                    changes.append(make_change('modified', path, is_dir, root))
+                elif mask & IN_MOVED_FROM:
+                    change = make_change('deleted', path, is_dir, root)
+                    moved_from[cookie] = change
+                    changes.append(change)
+                elif mask & IN_MOVED_TO:
+                    source = moved_from.pop(cookie, None)
+                    if source is not None:
+                        source.update(type='moved', old_path=source['path'], path=path)
+                        if is_dir:
+                            self.rename_tree(source['old_path'], path)
+                    else:
+                        changes.append(make_change('created', path, is_dir, root))
+                        if is_dir:
+                            self.watch_tree(path)
+            except OSError as e:
+                # 新目录无法加入监视（通常是超过监视数上限），退化为对所属根目录的整体检查
+                print(f"无法监视新目录: {e}")
+                changes.append(make_change('rescan', root, True, root))
+
+        # 移出监视范围的目录不再监视
+        for change in moved_from.values():
+            if change['is_dir']:
+                self.forget_tree(change['path'])
+        return changes
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingBackend(WatcherBackend):
+    """轮询后端：定期比较各目录的 mtime，只重新列出发生变化的目录"""
+
+    DEFAULT_INTERVAL = 10
+
+    def __init__(self, roots, interval=None, is_canceled=None):
+        super().__init__(roots, is_canceled)
+        self.interval = interval or self.DEFAULT_INTERVAL
+        self.snapshots = None  # 目录 -> (mtime_ns, {名称: 是否目录})，第一次 poll 时在监视线程中建立
+        self.next_poll = 0
+        self.poll_requested = False
+
+    @staticmethod
+    def dir_mtime_ns(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return -1
+
+    def snapshot_tree(self, top):
+        """记录 top 及其所有子目录的当前状态"""
+        for dir_path, infos in TreeWalker([top], self.is_canceled).walk():
+            self.snapshots[dir_path] = (self.dir_mtime_ns(dir_path),
+                                        {info['name']: info['is_dir'] for info in infos})
+
+    def forget_tree(self, top):
+        """删除 top 及其子目录的状态记录"""
+        prefix = top.rstrip(os.sep) + os.sep
+        for path in [p for p in self.snapshots if p == top or p.startswith(prefix)]:
+            del self.snapshots[path]
+
+    def request_poll(self):
+        self.poll_requested = True
+
+    def poll(self, timeout):
+        if self.snapshots is None:
+            # 首次调用：记录初始状态（整棵树遍历一次，可被取消）
+            self.snapshots = {}
+            for root in self.roots:
+                self.snapshot_tree(root)
+            self.next_poll = time.time() + self.interval
+            return []
+
+        now = time.time()
+        if not self.poll_requested and now < self.next_poll:
+            time.sleep(min(timeout, self.next_poll - now))
+            return []
+        self.poll_requested = False
+
+        changes = []
+        for dir_path in list(self.snapshots):
+            if dir_path not in self.snapshots:
+                continue  # 已随父目录一起删除
+            old_mtime, old_children = self.snapshots[dir_path]
+            mtime = self.dir_mtime_ns(dir_path)
+            if mtime == old_mtime:
+                continue
+            if mtime < 0:
+                # 目录已不存在，删除事件由父目录报告
+                self.forget_tree(dir_path)
+                continue
+
+            infos, _ = scan_dir(dir_path)
+            new_children = {info['name']: info['is_dir'] for info in infos}
+            root = self.root_of(dir_path)
+
+            for name, is_dir in old_children.items():
+                if new_children.get(name) != is_dir:
+                    path = os.path.join(dir_path, name)
+                    changes.append(make_change('deleted', path, is_dir, root))
+                    if is_dir:
+                        self.forget_tree(path)
+            for name, is_dir in new_children.items():
+                if old_children.get(name) != is_dir:
+                    path = os.path.join(dir_path, name)
+                    changes.append(make_change('created', path, is_dir, root))
+                    if is_dir:
+                        self.snapshot_tree(path)
+            self.snapshots[dir_path] = (mtime, new_children)
+
+        self.next_poll = time.time() + self.interval
+        return changes
+
+
+def create_backend(roots, is_canceled=None):
+    """Linux 本地磁盘使用 inotify，网络盘或其他系统使用轮询"""
+    if sys.platform.startswith('linux') and not any(is_network_path(root) for root in roots):
+        try:
+            return InotifyBackend(roots, is_canceled)
+        except (OSError, AttributeError) as e:
+            print(f"inotify 不可用，改用轮询: {e}")
+    return PollingBackend(roots, is_canceled=is_canceled)
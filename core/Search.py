@@ -0,0 +1,262 @@
+import os
+import sqlite3
+from datetime import datetime
+
+from core.ContentIndex import ContentIndex
+from core.FileIndex import FileIndex
+from core.FileWalker import ParallelTreeWalker, make_entry_info_ns
+from core.SearchFilters import compile_filters, compile_name_match, compile_tag_match
+from core.Trace import counter, span
+
+
+def make_filters(keyword='', category=None, model=None, apn=None, custom=None,
+                 start_date=None, end_date=None, content=False,
+                 category_any=None, model_any=None, apn_any=None, tag_matcher=None):
+    """生成搜索条件字典
+
+    属性条件为 None 表示不启用；*_any 为值集合时匹配其中任意一个值；
+    start_date/end_date 为 datetime.date，任一给出即启用时间筛选（按整天计算）。
+    """
+    def normalize(value):
+        return '' if value is None else str(value).strip().lower()
+
+    def normalize_set(values):
+        return frozenset(normalize(value) for value in values) - {''} if values else None
+
+    filters = {
+        'keyword': normalize(keyword),
+        'category_enabled': category is not None or bool(category_any),
+        'category_value': normalize(category),
+        'model_enabled': model is not None or bool(model_any),
+        'model_value': normalize(model),
+        'apn_enabled': apn is not None or bool(apn_any),
+        'apn_value': normalize(apn),
+        'custom_enabled': custom is not None,
+        'custom_value': normalize(custom),
+        'time_enabled': start_date is not None or end_date is not None,
+        'content_enabled': content,
+        'category_any': normalize_set(category_any),
+        'model_any': normalize_set(model_any),
+        'apn_any': normalize_set(apn_any),
+        'tag_matcher': tag_matcher,
+    }
+
+    # 时间筛选处理
+    if filters['time_enabled']:
+        filters['start_timestamp'] = int(
+            datetime(start_date.year, start_date.month, start_date.day).timestamp()) if start_date else 0
+        filters['end_timestamp'] = int(
+            datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59).timestamp()) if end_date \
+            else int(datetime.now().timestamp())
+    else:
+        filters['start_timestamp'] = 0
+        filters['end_timestamp'] = 0
+    return filters
+
+
+def has_any_condition(filters):
+    """是否设置了任何筛选条件（没有条件时不搜索，避免列出全部文件）"""
+    return (bool(filters['keyword']) or
+            filters['category_enabled'] or
+            filters['model_enabled'] or
+            filters['apn_enabled'] or
+            filters['custom_enabled'] or
+            filters['time_enabled'])
+
+
+# ----------- 索引 Start -----------
+
+def index_roots(roots, index_path, force_check=False, progress_callback=None, is_canceled=None):
+    """建立或更新根目录的文件名索引（已有索引只重新扫描变化的目录）"""
+    index = FileIndex(index_path)
+    try:
+        for root in roots:
+            if is_canceled and is_canceled():
+                return
+            index.ensure_fresh(root, force_check=force_check, progress_callback=progress_callback,
+                               is_canceled=is_canceled)
+    finally:
+        index.close()
+
+
+def index_content(roots, index_path, force=False, max_workers=None, timeout=None,
+                  progress_callback=None, is_canceled=None):
+    """为根目录下的PDF建立内容索引，返回本次新建索引的文档数
+
+    progress_callback(已处理文档数, 文档总数)；force 为 True 时忽略指纹，重新提取全部文档。
+    """
+    from core.TextExtractor import ExtractionPool  # 多进程模块只在建立内容索引时才需要
+
+    try:
+        index = ContentIndex(index_path)
+    except sqlite3.Error as e:
+        print(f"内容索引不可用: {e}")
+        return 0
+
+    indexed = 0
+    try:
+        # 遍历时已拿到大小和纳秒精度的修改时间，用于判断文档是否变化
+        pdf_files = {}
+        for _, infos in ParallelTreeWalker(roots, is_canceled,
+                                           name_filter=lambda name: name.lower().endswith('.pdf'),
+                                           make_info=make_entry_info_ns).walk():
+            for info in infos:
+                if not info['is_dir']:
+                    pdf_files[info['path']] = (info['size'], info['mtime_ns'])
+        if is_canceled and is_canceled():
+            return 0
+
+        # 删除已不存在的文档，只提取新增或内容变化的文档
+        todo = index.plan_update(roots, pdf_files, force)
+        processed = len(pdf_files) - len(todo)
+        if progress_callback:
+            progress_callback(processed, len(pdf_files))
+
+        # 文本提取在多个进程中并行执行，结果按批写入索引
+        pool = ExtractionPool(max_workers, timeout, is_canceled)
+        for results in pool.extract(todo):
+            for path, fingerprint, page_tokens, error in results:
+                if error:
+                    # 损坏、加密或超时的文档也记录下来，避免每次重试
+                    print(f"提取文本失败: {os.path.basename(path)} -> {error}")
+                index.add_document_tokens(path, page_tokens, fingerprint)
+                indexed += 1
+            index.commit()
+            processed += len(results)
+            if progress_callback:
+                progress_callback(processed, len(pdf_files))
+        index.commit()
+    finally:
+        index.close()
+    return indexed
+
+# ----------- 索引 End -----------
+
+
+# ----------- 搜索 Start -----------
+
+def search(roots, filters, index_path=None, content_index_path=None, force_refresh=False,
+           progress_callback=None, is_canceled=None):
+    """按条件搜索，边搜索边逐条返回文件信息字典
+
+    开启内容搜索时在内容索引中查找，结果带 'page'；否则优先使用文件名索引，
+    索引不可用时直接遍历磁盘。progress_callback(已处理数, 总数)，总数未知时为 0。
+    """
+    roots = list(roots)
+    if filters.get('content_enabled', False) and content_index_path:
+        yield from search_content(roots, filters, content_index_path, progress_callback, is_canceled)
+        return
+
+    index = None
+    if index_path:
+        try:
+            index = FileIndex(index_path)
+        except sqlite3.Error as e:
+            # 索引不可用时退回到直接遍历
+            print(f"索引不可用，改为直接遍历: {e}")
+
+    if index is not None:
+        yield from search_index(index, roots, filters, force_refresh, progress_callback, is_canceled)
+    else:
+        yield from search_walk(roots, filters, progress_callback, is_canceled)
+
+
+def search_index(index, roots, filters, force_refresh=False, progress_callback=None, is_canceled=None):
+    """基于持久化索引搜索，仅在索引缺失或过期时重新遍历"""
+    def canceled():
+        return is_canceled is not None and is_canceled()
+
+    try:
+        for root in roots:
+            if canceled():
+                return
+            with span('index.refresh', root=root):
+                index.ensure_fresh(root, force_check=force_refresh,
+                                   progress_callback=(lambda count: progress_callback(count, 0))
+                                   if progress_callback else None,
+                                   is_canceled=is_canceled)
+
+        # 索引只能按单个子串查询，值集合条件在查询结果上再判断
+        tag_match = compile_tag_match(filters)
+        matched = 0
+        for root in roots:
+            if canceled():
+                return
+            for file_info in index.query(root, filters):
+                if canceled():
+                    return
+                if tag_match is not None and not tag_match(file_info['name']):
+                    continue
+                yield file_info
+                matched += 1
+                if progress_callback and matched % 100 == 0:
+                    progress_callback(matched, 0)
+    finally:
+        index.close()
+
+
+def search_content(roots, filters, content_index_path, progress_callback=None, is_canceled=None):
+    """在PDF内容索引中搜索关键字，按 (文件, 页) 返回结果，其余条件仍作用于文件名"""
+    try:
+        index = ContentIndex(content_index_path)
+    except sqlite3.Error as e:
+        print(f"内容索引不可用: {e}")
+        return
+
+    try:
+        hits = content_hits(index, roots, filters)
+    finally:
+        index.close()
+    yield from filter_content_hits(hits, filters, progress_callback, is_canceled)
+
+
+def content_hits(index, roots, filters):
+    """在已打开的内容索引中查找关键字，返回 (文档信息, 页码) 列表"""
+    with span('content.search', hits=0) as search_span:
+        hits = index.search(filters.get('keyword', ''), roots)
+        search_span.set(hits=len(hits))
+    return hits
+
+
+def filter_content_hits(hits, filters, progress_callback=None, is_canceled=None):
+    """对内容命中的文档应用其余条件，逐条返回带 'page' 的文件信息"""
+    # 关键字用于匹配内容，不再要求出现在文件名中
+    predicate = compile_filters(dict(filters, keyword=''))
+    for matched, (doc_info, page) in enumerate(hits, 1):
+        if is_canceled and is_canceled():
+            return
+        if not predicate(doc_info):
+            continue
+        yield dict(doc_info, page=page)
+        if progress_callback and matched % 100 == 0:
+            progress_callback(matched, len(hits))
+
+
+def search_walk(roots, filters, progress_callback=None, is_canceled=None):
+    """直接遍历磁盘搜索（多线程 scandir 遍历，边遍历边返回结果）"""
+    # 文件名条件在列目录时就先判断，不符合的项不 stat
+    walker = ParallelTreeWalker(roots, is_canceled, name_filter=compile_name_match(filters))
+    predicate = compile_filters(filters)
+    reported = 0
+
+    for _, infos in walker.walk():
+        if is_canceled and is_canceled():
+            return
+
+        # 应用过滤条件（按目录成批判断）
+        with span('filter', count=len(infos)):
+            matched = [file_info for file_info in infos if predicate(file_info)]
+        for file_info in matched:
+            if is_canceled and is_canceled():
+                return
+            yield file_info
+
+        # 进度按已列出的全部条目计算（与估算总数一致），而不是只算符合文件名条件的项
+        processed_files = walker.entries_seen
+        if processed_files // 100 != reported // 100:  # 每100个文件更新一次进度（总数为估算值）
+            reported = processed_files
+            if progress_callback:
+                progress_callback(processed_files, walker.estimated_total())
+            counter('walk', dirs=walker.dirs_visited, entries=walker.entries_seen)
+
+# ----------- 搜索 End -----------
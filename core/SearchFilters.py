@@ -0,0 +1,229 @@
+from core.TagMatcher import TagMatcher
+
+SUBSTRING_KEYS = ('category', 'model', 'apn', 'custom')
+TAG_KEYS = ('category', 'model', 'apn')  # 可以按 Excel 中的一组值筛选的属性
+
+
+def tag_sets(filters):
+    """“包含其中任意一个”条件 {属性: 值集合}
+
+    filters['{属性}_any'] 为值集合时，文件名包含其中任意一个值即可，
+    代替该属性的单值子串条件；匹配由 filters['tag_matcher']（TagMatcher）一次完成。
+    """
+    sets = {}
+    for key in TAG_KEYS:
+        values = filters.get(f'{key}_any')
+        if filters.get(f'{key}_enabled', False) and values:
+            sets[key] = frozenset(values)
+    return sets
+
+
+def name_substrings(filters):
+    """文件名必须包含的子串 {条件名: 子串}，未启用、为空或按值集合筛选的条件不计入"""
+    substrings = {}
+    if filters.get('keyword'):
+        substrings['keyword'] = filters['keyword']
+    for key in SUBSTRING_KEYS:
+        value = filters.get(f'{key}_value', '')
+        if filters.get(f'{key}_enabled', False) and value and not filters.get(f'{key}_any'):
+            substrings[key] = value
+    return substrings
+
+
+def time_range(filters):
+    """修改时间范围 (开始, 结束)，未启用时间筛选时返回 None"""
+    if not filters.get('time_enabled', False):
+        return None
+    return filters.get('start_timestamp', 0), filters.get('end_timestamp', 0)
+
+
+def passes_filters(file_info, filters):
+    """应用所有过滤条件（逐项读取条件的参考实现，搜索时使用 compile_filters 的结果）"""
+    keyword = filters.get('keyword', '')
+    category_enabled = filters.get('category_enabled', False)
+    category_value = filters.get('category_value', '')
+    model_enabled = filters.get('model_enabled', False)
+    model_value = filters.get('model_value', '')
+    apn_enabled = filters.get('apn_enabled', False)
+    apn_value = filters.get('apn_value', '')
+    custom_enabled = filters.get('custom_enabled', False)
+    custom_value = filters.get('custom_value', '')
+    time_enabled = filters.get('time_enabled', False)
+    start_timestamp = filters.get('start_timestamp', 0)
+    end_timestamp = filters.get('end_timestamp', 0)
+
+    name_lower = file_info['name'].lower()
+
+    # 0. 按值集合筛选的属性：包含任意一个值即可，单值条件不再适用
+    for key, values in tag_sets(filters).items():
+        if not any(value in name_lower for value in values):
+            return False
+        if key == 'category':
+            category_enabled = False
+        elif key == 'model':
+            model_enabled = False
+        else:
+            apn_enabled = False
+
+    # 1. 关键字匹配
+    keyword_match = not keyword or keyword in name_lower
+
+    # 2. 属性筛选
+    category_match = not (category_enabled and category_value) or category_value in name_lower
+    model_match = not (model_enabled and model_value) or model_value in name_lower
+    apn_match = not (apn_enabled and apn_value) or apn_value in name_lower
+
+    # 3. 自定义属性匹配
+    custom_match = not (custom_enabled and custom_value) or custom_value in name_lower
+
+    # 4. 时间匹配
+    time_match = True
+    if time_enabled:
+        try:
+            time_match = (start_timestamp <= file_info['mtime'] <= end_timestamp)
+        except Exception:
+            time_match = False
+
+    # 应用所有筛选条件（使用逻辑与）
+    return (keyword_match and category_match and model_match and
+            apn_match and custom_match and time_match)
+
+
+def narrows(old_filters, new_filters):
+    """新条件是否只是收窄了旧条件，即新结果一定是旧结果的子集
+
+    各条件之间是逻辑与，因此逐项比较即可：
+    - 子串条件（关键字、分类、型号、APN、自定义）：旧条件未启用，或新子串包含旧子串；
+    - 值集合条件：新条件是旧集合的子集，或是旧集合中某个值的单值条件；
+    - 时间范围：旧条件未启用，或新范围落在旧范围之内；
+    - 内容搜索的关键字匹配的是页面文本，要求两次都开启且关键字完全相同。
+    """
+    old_content = old_filters.get('content_enabled', False)
+    if new_filters.get('content_enabled', False) != old_content:
+        return False
+
+    old_substrings = name_substrings(old_filters)
+    new_substrings = name_substrings(new_filters)
+    if old_content and old_substrings.get('keyword') != new_substrings.get('keyword'):
+        return False
+    for key, old_value in old_substrings.items():
+        if old_value not in new_substrings.get(key, ''):
+            return False
+
+    new_sets = tag_sets(new_filters)
+    for key, old_values in tag_sets(old_filters).items():
+        if key in new_sets:
+            if not new_sets[key] <= old_values:
+                return False
+        elif new_substrings.get(key) not in old_values:
+            return False
+
+    old_range = time_range(old_filters)
+    if old_range is not None:
+        new_range = time_range(new_filters)
+        if new_range is None or new_range[0] < old_range[0] or new_range[1] > old_range[1]:
+            return False
+    return True
+
+
+def required_substrings(filters):
+    """按检查顺序排列的必需子串
+
+    被其他子串包含的子串是多余的，直接去掉；其余按长度从长到短排列，
+    越长的子串越少见，最先检查能让大多数文件在第一次比较时就被排除。
+    """
+    substrings = []
+    for value in sorted(set(name_substrings(filters).values()), key=len, reverse=True):
+        if not any(value in longer for longer in substrings):
+            substrings.append(value)
+    return substrings
+
+
+def compile_name_match(filters):
+    """把文件名条件编译成 name_match(文件名) -> bool，没有文件名条件时返回 None"""
+    substring_match = compile_substring_match(filters)
+    tag_match = compile_tag_match(filters)
+    if tag_match is None:
+        return substring_match
+    if substring_match is None:
+        return tag_match
+    # 值集合条件在子串条件之后判断：子串比较更便宜，先排除大多数文件
+    return lambda name: substring_match(name) and tag_match(name)
+
+
+def compile_substring_match(filters):
+    """把子串条件编译成 substring_match(文件名) -> bool，没有子串条件时返回 None"""
+    substrings = required_substrings(filters)
+    if not substrings:
+        return None
+    if len(substrings) == 1:
+        first, = substrings
+        return lambda name: first in name.lower()
+    if len(substrings) == 2:
+        first, second = substrings
+        return lambda name: first in (name := name.lower()) and second in name
+
+    def name_match(name):
+        name = name.lower()
+        for value in substrings:
+            if value not in name:
+                return False
+        return True
+    return name_match
+
+
+def compile_tag_match(filters):
+    """把值集合条件编译成 tag_match(文件名) -> bool，没有此类条件时返回 None
+
+    文件名只用 TagMatcher 扫描一遍，得到包含的全部 (属性, 值)，
+    再检查每个条件的集合是否与之相交，耗时与集合大小无关。
+    """
+    sets = tag_sets(filters)
+    if not sets:
+        return None
+    matcher = filters.get('tag_matcher')
+    if matcher is None or any(not values <= matcher.column_values(key) for key, values in sets.items()):
+        # 没有预先构建的匹配器，或集合中有匹配器不认识的值时，按集合临时构建
+        matcher = TagMatcher(sets)
+    wanted = [frozenset((key, value) for value in values) for key, values in sets.items()]
+
+    def tag_match(name):
+        found = matcher.matches(name)
+        for pairs in wanted:
+            if found.isdisjoint(pairs):
+                return False
+        return True
+    return tag_match
+
+
+def compile_filters(filters):
+    """把一次搜索的条件编译成 predicate(文件信息) -> bool
+
+    每次搜索只编译一次：未启用的条件不出现在判断中，
+    没有时间筛选时不读取修改时间。遍历时先用 compile_name_match 按文件名排除，
+    只有通过文件名条件的项才 stat（结果需要大小和修改时间），不符合的项不 stat。
+    """
+    name_match = compile_name_match(filters)
+    mtime_range = time_range(filters)
+
+    if mtime_range is None:
+        if name_match is None:
+            return lambda file_info: True
+        substrings = required_substrings(filters)
+        if len(substrings) == 1 and not tag_sets(filters):
+            # 最常见的情况（只有关键字）：省去一层函数调用
+            first, = substrings
+            return lambda file_info: first in file_info['name'].lower()
+        return lambda file_info: name_match(file_info['name'])
+
+    start_timestamp, end_timestamp = mtime_range
+
+    def time_match(file_info):
+        try:
+            return start_timestamp <= file_info['mtime'] <= end_timestamp
+        except Exception:
+            return False
+
+    if name_match is None:
+        return time_match
+    return lambda file_info: name_match(file_info['name']) and time_match(file_info)
@@ -0,0 +1,101 @@
+from collections import deque
+
+
+class AhoCorasick:
+    """Aho-Corasick 多模式匹配自动机
+
+    所有模式编译成一个带失败指针的字典树，对文本只扫描一遍，
+    就能找出其中出现的全部模式，耗时与模式数量无关。
+    """
+
+    def __init__(self):
+        self.goto = [{}]  # 节点 -> {字符: 子节点}
+        self.fail = [0]
+        self.outputs = [[]]  # 节点 -> 在此结束的模式所带的值
+        self.built = False
+
+    def add(self, pattern, value):
+        """添加一个模式，匹配时返回 value"""
+        node = 0
+        for char in pattern:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            node = next_node
+        self.outputs[node].append(value)
+        self.built = False
+
+    def build(self):
+        """按广度优先计算失败指针，并把失败链上的输出合并到每个节点"""
+        queue = deque(self.goto[0].values())  # 第一层节点的失败指针指向根
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+        self.built = True
+
+    def find_all(self, text):
+        """返回文本中出现的所有模式的值（集合）"""
+        if not self.built:
+            self.build()
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                found.update(outputs[node])
+        return found
+
+
+class TagMatcher:
+    """根据 Excel 的分类/型号/APN 列给文件名打标签
+
+    每个值都是一个模式（不区分大小写），一次扫描得到文件名包含的全部
+    (列名, 值)，用于“包含其中任意一个”的筛选，而不必对每个值单独做子串查找。
+    """
+
+    def __init__(self, columns):
+        """columns 为 {列名: 值列表}，例如 {'category': [...], 'model': [...], 'apn': [...]}"""
+        self.automaton = AhoCorasick()
+        self.values = {}  # 列名 -> 该列全部值（小写）
+        for key, values in columns.items():
+            normalized = {str(value).strip().lower() for value in values if value is not None}
+            normalized.discard('')
+            normalized.discard('nan')
+            self.values[key] = frozenset(normalized)
+            for value in normalized:
+                self.automaton.add(value, (key, value))
+        self.automaton.build()
+
+    def column_values(self, key):
+        """某一列的全部值"""
+        return self.values.get(key, frozenset())
+
+    def matches(self, name):
+        """文件名中出现的全部 (列名, 值)"""
+        return self.automaton.find_all(name.lower())
+
+    def tags(self, name):
+        """按列整理的标签 {列名: {值, ...}}"""
+        tags = {}
+        for key, value in self.matches(name):
+            tags.setdefault(key, set()).add(value)
+        return tags
+
+    @classmethod
+    def from_excel_data(cls, excel_data, columns):
+        """从 Excel 数据构建，columns 为 {列名: Excel 列标题}"""
+        return cls({key: excel_data[title].dropna().unique().tolist()
+                    for key, title in columns.items() if title in excel_data.columns})
@@ -0,0 +1,183 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+from core.ContentIndex import extract_pages, file_fingerprint, tokenize
+
+
+def default_worker_count():
+    """默认工作进程数：环境变量 PDFSEARCH_INDEX_WORKERS，否则为 CPU 核数减一"""
+    value = os.environ.get('PDFSEARCH_INDEX_WORKERS')
+    if value and value.isdigit() and int(value) > 0:
+        return int(value)
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def default_timeout():
+    """单个文件的默认提取超时（秒）：环境变量 PDFSEARCH_EXTRACT_TIMEOUT，否则 60 秒"""
+    try:
+        return float(os.environ.get('PDFSEARCH_EXTRACT_TIMEOUT', 60))
+    except ValueError:
+        return 60.0
+
+
+def extract_page_tokens(path):
+    """提取并切分每页文本，只返回每页的词条集合，减少进程间传输量"""
+    return [sorted(set(tokenize(text))) for text in extract_pages(path)]
+
+
+def worker_main(conn):
+    """工作进程入口：逐批接收文件路径，逐个返回提取结果"""
+    while True:
+        try:
+            batch = conn.recv()
+        except EOFError:
+            return
+        if batch is None:
+            return
+        for path in batch:
+            conn.send(('start', path))
+            # 指纹在提取之前获取，保证与提取到的内容一致
+            fingerprint = file_fingerprint(path)
+            try:
+                conn.send(('done', path, fingerprint, extract_page_tokens(path), None))
+            except Exception as e:
+                conn.send(('done', path, fingerprint, [], str(e)))
+
+
+class ExtractionWorker:
+    """主进程中对单个工作进程的记录"""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.batch = deque()  # 已分配但尚未完成的文件
+        self.current = None  # 正在处理的文件
+        self.started = 0  # 开始处理当前文件的时间
+
+    def assign(self, paths):
+        """分配一批文件"""
+        self.batch = deque(paths)
+        self.conn.send(list(paths))
+
+    def is_busy(self):
+        return bool(self.batch)
+
+    def kill(self):
+        """强制结束工作进程"""
+        try:
+            self.process.kill()
+        except Exception:
+            pass
+        self.process.join(1)
+        self.conn.close()
+
+    def shutdown(self):
+        """正常结束工作进程"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(0.5)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class ExtractionPool:
+    """多进程PDF文本提取流水线
+
+    PyMuPDF 提取文本是 CPU 密集型且持有 GIL，因此放到独立进程中并行执行。
+    主进程按小批量分派文件，工作进程逐个返回每页的词条集合；
+    单个文件超时时直接结束对应进程并重新启动一个，不影响其余文件。
+    """
+
+    BATCH_SIZE = 4
+    MAX_STARTUP_FAILURES = 3  # 工作进程连续多少次未处理任何文件就退出，视为无法启动
+
+    def __init__(self, max_workers=None, timeout=None, is_canceled=None):
+        self.max_workers = max_workers or default_worker_count()
+        self.timeout = timeout or default_timeout()
+        self.is_canceled = is_canceled
+        # 统一使用 spawn，避免在带有线程的 GUI 进程中 fork
+        self.context = multiprocessing.get_context('spawn')
+
+    def extract(self, paths):
+        """逐批返回提取结果列表 [(路径, 指纹, 每页词条列表, 错误信息), ...]"""
+        pending = deque(paths)
+        if not pending:
+            return
+
+        workers = [ExtractionWorker(self.context) for _ in range(min(self.max_workers, len(pending)))]
+        startup_failures = 0
+        try:
+            while pending or any(worker.is_busy() for worker in workers):
+                if self.is_canceled and self.is_canceled():
+                    return
+
+                # 给空闲的工作进程分派新的一批
+                for worker in workers:
+                    if not worker.is_busy() and pending:
+                        batch = [pending.popleft() for _ in range(min(self.BATCH_SIZE, len(pending)))]
+                        worker.assign(batch)
+
+                results = []
+                ready = wait([worker.conn for worker in workers if worker.is_busy()], timeout=0.2)
+                now = time.time()
+                for i, worker in enumerate(workers):
+                    error = None
+                    if worker.conn in ready and not self.receive(worker, results):
+                        # 工作进程意外退出（例如 PyMuPDF 崩溃）
+                        error = "工作进程异常退出"
+                    elif worker.current is not None and now - worker.started > self.timeout:
+                        error = f"提取超时（超过 {self.timeout:g} 秒）"
+                    if error is None:
+                        continue
+
+                    # 当前文件记为失败，其余未处理的文件放回队列，并换一个新进程
+                    if worker.current is not None:
+                        results.append((worker.current, file_fingerprint(worker.current, with_hash=False), [], error))
+                        worker.batch.remove(worker.current)
+                        startup_failures = 0
+                    else:
+                        startup_failures += 1
+                    pending.extendleft(reversed(worker.batch))
+                    worker.kill()
+                    workers[i] = ExtractionWorker(self.context)
+
+                if startup_failures >= self.MAX_STARTUP_FAILURES:
+                    # 工作进程无法正常启动，剩余文件全部记为失败，避免无限重启
+                    for worker in workers:
+                        pending.extend(worker.batch)
+                        worker.batch.clear()
+                    results.extend((path, None, [], "无法启动文本提取进程") for path in pending)
+                    pending.clear()
+
+                if results:
+                    yield results
+        finally:
+            for worker in workers:
+                worker.shutdown()
+
+    def receive(self, worker, results):
+        """读取一个工作进程当前可用的全部消息，进程已退出时返回 False"""
+        try:
+            while worker.conn.poll():
+                message = worker.conn.recv()
+                if message[0] == 'start':
+                    worker.current = message[1]
+                    worker.started = time.time()
+                elif message[0] == 'done':
+                    _, path, fingerprint, page_tokens, error = message
+                    results.append((path, fingerprint, page_tokens, error))
+                    if path in worker.batch:
+                        worker.batch.remove(path)
+                    worker.current = None
+        except (EOFError, OSError):
+            return False
+        return True
@@ -0,0 +1,182 @@
+"""耗时追踪：记录各环节的时间段和计数，导出为 Chrome trace / Perfetto 可以打开的 JSON
+
+    from core.Trace import span, counter
+
+    with span('walk.list', dir=path) as s:
+        ...
+        s.set(entries=len(entries))
+    counter('search', results=len(results))
+
+设置环境变量 PDFSEARCH_TRACE=trace.json（或命令行 --trace trace.json）后开启，
+程序退出时写入文件，用 chrome://tracing 或 https://ui.perfetto.dev 打开。
+未开启时 span() 直接返回一个空操作对象，开销只有一次函数调用。
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+TRACE_ENV = 'PDFSEARCH_TRACE'
+# 开启追踪的进程号：子进程继承环境变量后不会各自开启并覆盖同一个文件
+TRACE_PID_ENV = 'PDFSEARCH_TRACE_PID'
+
+MAX_EVENTS = 1000000  # 超出后丢弃新事件，避免常驻进程占用过多内存
+
+
+class NullSpan:
+    """未开启追踪时使用的空操作时间段"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    """一个时间段，退出 with 时记录为 Chrome trace 的完整事件（ph='X'）"""
+
+    __slots__ = ('tracer', 'name', 'args', 'start_ns')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.complete(self.name, self.start_ns, time.perf_counter_ns(), self.args)
+        return False
+
+    def set(self, **args):
+        """补充参数（例如处理完才知道的数量）"""
+        self.args.update(args)
+
+
+class Tracer:
+    """收集事件并写出 JSON（list.append 本身是线程安全的，只在登记线程名时加锁）"""
+
+    def __init__(self, path):
+        self.path = path
+        self.pid = os.getpid()
+        self.origin_ns = time.perf_counter_ns()
+        self.events = []
+        self.dropped = 0
+        self.thread_ids = set()
+        self.lock = threading.Lock()
+
+    def timestamp(self, ns):
+        """相对开启时刻的微秒数（Chrome trace 的时间单位）"""
+        return (ns - self.origin_ns) / 1000
+
+    def record(self, event):
+        if len(self.events) >= MAX_EVENTS:
+            self.dropped += 1
+            return
+        tid = threading.get_ident()
+        if tid not in self.thread_ids:
+            with self.lock:
+                if tid not in self.thread_ids:
+                    self.thread_ids.add(tid)
+                    self.events.append({'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid,
+                                        'args': {'name': threading.current_thread().name}})
+        event['pid'] = self.pid
+        event['tid'] = tid
+        self.events.append(event)
+
+    def complete(self, name, start_ns, end_ns, args):
+        self.record({'name': name, 'ph': 'X', 'ts': self.timestamp(start_ns),
+                     'dur': (end_ns - start_ns) / 1000, 'args': args})
+
+    def counter(self, name, values):
+        self.record({'name': name, 'ph': 'C', 'ts': self.timestamp(time.perf_counter_ns()), 'args': values})
+
+    def instant(self, name, args):
+        self.record({'name': name, 'ph': 'i', 's': 't', 'ts': self.timestamp(time.perf_counter_ns()),
+                     'args': args})
+
+    def write(self):
+        """写出 JSON 文件（先写临时文件再替换，避免留下不完整的文件）"""
+        data = {'traceEvents': list(self.events), 'displayTimeUnit': 'ms',
+                'otherData': {'argv': sys.argv, 'dropped_events': self.dropped}}
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        os.replace(temp_path, self.path)
+        return len(data['traceEvents'])
+
+
+_tracer = None
+
+
+def enable(path):
+    """开启追踪，程序退出时把事件写入 path"""
+    global _tracer
+    if _tracer is not None:
+        _tracer.path = path
+        return _tracer
+    _tracer = Tracer(os.path.abspath(path))
+    os.environ[TRACE_PID_ENV] = str(_tracer.pid)
+    atexit.register(flush)
+    return _tracer
+
+
+def is_enabled():
+    return _tracer is not None
+
+
+def flush():
+    """立即写出已记录的事件（退出时自动调用）"""
+    if _tracer is None:
+        return
+    try:
+        count = _tracer.write()
+        print(f"追踪已写入 {_tracer.path}（{count} 个事件）", file=sys.stderr)
+    except OSError as e:
+        print(f"写入追踪文件失败: {e}", file=sys.stderr)
+
+
+def span(name, **args):
+    """记录一个时间段：with span('名称', 参数=值): ..."""
+    if _tracer is None:
+        return NULL_SPAN
+    return Span(_tracer, name, args)
+
+
+def counter(name, **values):
+    """记录计数（在时间线上显示为曲线）"""
+    if _tracer is not None:
+        _tracer.counter(name, values)
+
+
+def instant(name, **args):
+    """记录一个时刻"""
+    if _tracer is not None:
+        _tracer.instant(name, args)
+
+
+def enable_from_env():
+    """按环境变量开启追踪（子进程继承的环境变量不会重复开启）"""
+    path = os.environ.get(TRACE_ENV)
+    owner = os.environ.get(TRACE_PID_ENV)
+    if path and (owner is None or owner == str(os.getpid())):
+        enable(path)
+
+
+enable_from_env()
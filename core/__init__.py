@@ -0,0 +1,25 @@
+"""TDS Search Tool 的核心功能：纯 Python，不依赖 Qt，可以在没有界面的环境中使用和测试
+
+    from core import make_filters, index_roots, search, plan_copy, copy_selection
+
+    # 建立/更新文件名索引（已有索引只重新扫描变化的目录）
+    index_roots(['/data/tds'], 'file_index.sqlite3')
+
+    # 按条件搜索，边搜索边逐条返回 {'path', 'name', 'is_dir', 'mtime', 'size'[, 'page']}
+    filters = make_filters(keyword='tds', apn='004211')
+    for file_info in search(['/data/tds'], filters, index_path='file_index.sqlite3'):
+        ...
+
+    # 复制选中的文件（选中文件夹下的文件保留目录结构）
+    plan = plan_copy(files, folders, '/tmp/out')
+    copied, skipped, errors = copy_selection(plan)
+
+各函数都接受 is_canceled() 用于取消，以及 progress_callback 报告进度，
+界面中的后台线程只是把这些回调转成 Qt 信号。
+"""
+from core.Backup import backup_folders
+from core.CopySelection import copy_selection, count_visible, existing_targets, list_visible_files, plan_copy
+from core.ExcelTags import EXCEL_TAG_COLUMNS, ExcelTags, load_excel_tags
+from core.Search import has_any_condition, index_content, index_roots, make_filters, search
+from core.SearchFilters import compile_filters, narrows, passes_filters
+from core.TagMatcher import TagMatcher
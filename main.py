@@ -1,12 +1,22 @@
+import multiprocessing
 import sys
 
-from PySide6.QtWidgets import QApplication
-from src.MainWindow import MainWindow
-
 if __name__ == '__main__':
+    # PDF 文本提取使用 spawn 方式的子进程：打包后的程序需要 freeze_support，
+    # 界面相关的导入也只在主进程中执行，避免每个子进程重复加载 Qt
+    multiprocessing.freeze_support()
+
+    # 设置 PDFSEARCH_TRACE=trace.json 时记录启动和各操作的耗时
+    from core.Trace import span
+
+    with span('startup.import'):
+        from PySide6.QtWidgets import QApplication
+        from src.MainWindow import MainWindow
+
     app = QApplication(sys.argv)  # 创建应用程序实例对象
-    main_window = MainWindow()  # 创建窗口实例对象
-    main_window.show()  # 显示窗口
+    with span('startup.window'):
+        main_window = MainWindow()  # 创建窗口实例对象
+        main_window.show()  # 显示窗口
     n = app.exec()  # 执行exec()方法，进入事件循环，若遇到窗口退出命令，返回整数n
     try:
         sys.exit(n)  # 通知python系统，结束程序运行。
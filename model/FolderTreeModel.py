@@ -0,0 +1,258 @@
+import os
+
+from PySide6.QtCore import Qt, QModelIndex, QPersistentModelIndex, Signal
+from PySide6.QtGui import QStandardItem, QStandardItemModel
+from PySide6.QtWidgets import QApplication, QStyle
+
+
+# ✅ 按需加载的文件树模型（文件夹展开时才列出其内容）
+class FolderTreeModel(QStandardItemModel):
+    PathRole = Qt.UserRole  # 完整路径
+    LoadedRole = Qt.UserRole + 2  # 文件夹的内容是否已列出（False 表示尚未列出）
+
+    check_states_changed = Signal(list, bool)  # 批量勾选变化: 路径列表, 是否勾选
+
+    def __init__(self, icon_provider=None, selection=None, parent=None):
+        """icon_provider(路径) 返回文件图标，selection 为共用的勾选状态存储"""
+        super().__init__(parent)
+        self.icon_provider = icon_provider
+        self.selection = selection
+        self.path_index = {}  # 路径 -> 已加载项的持久索引
+
+        # 随行的插入/删除维护路径索引（覆盖加载、刷新、监视到的增删和重命名）
+        self.rowsInserted.connect(self.on_rows_inserted)
+        self.rowsAboutToBeRemoved.connect(self.on_rows_about_to_be_removed)
+
+    def add_root(self, folder):
+        """添加一个根文件夹，并列出其第一层内容"""
+        root_item = QStandardItem(QApplication.style().standardIcon(QStyle.SP_DirIcon),
+                                  os.path.basename(folder))
+        root_item.setData(folder, self.PathRole)  # 存储完整路径
+        root_item.setData(False, self.LoadedRole)
+        root_item.setEditable(False)
+        self.invisibleRootItem().appendRow(root_item)
+        self.load_children(root_item)
+        return root_item
+
+    def create_item(self, name, full_path, is_dir, check_state=Qt.Unchecked):
+        """创建文件夹项或文件项，文件夹项的内容留到展开时再列出"""
+        if is_dir:
+            item = QStandardItem(QApplication.style().standardIcon(QStyle.SP_DirIcon), name)
+            item.setData(False, self.LoadedRole)
+        else:
+            item = QStandardItem(name)
+            if self.icon_provider:
+                item.setIcon(self.icon_provider(full_path))
+        item.setData(full_path, self.PathRole)
+        item.setEditable(False)
+        item.setCheckable(True)
+        item.setCheckState(check_state)
+        return item
+
+    # ----------- 按需加载 Start -----------
+
+    def is_dir_item(self, item):
+        """是否文件夹项（只有文件夹项带加载标记，无需访问文件系统）"""
+        return item.data(self.LoadedRole) is not None
+
+    def is_loaded(self, item):
+        """文件夹的内容是否已列出（文件和错误提示项视为已列出）"""
+        return item.data(self.LoadedRole) is not False
+
+    def hasChildren(self, parent=QModelIndex()):
+        item = self.itemFromIndex(parent) if parent.isValid() else None
+        if item is not None and not self.is_loaded(item):
+            return True  # 尚未列出的文件夹也显示展开箭头
+        return super().hasChildren(parent)
+
+    def canFetchMore(self, parent):
+        item = self.itemFromIndex(parent) if parent.isValid() else None
+        return item is not None and not self.is_loaded(item)
+
+    def fetchMore(self, parent):
+        item = self.itemFromIndex(parent) if parent.isValid() else None
+        if item is not None and not self.is_loaded(item):
+            self.load_children(item)
+
+    def mark_loaded(self, item, loaded):
+        """修改加载标记（不触发 itemChanged，避免被当作勾选变化处理）"""
+        blocked = self.blockSignals(True)
+        try:
+            item.setData(loaded, self.LoadedRole)
+        finally:
+            self.blockSignals(blocked)
+
+    def load_children(self, item):
+        """列出文件夹内容；勾选的文件夹意味着其所有子项都被勾选"""
+        folder_path = item.data(self.PathRole)
+        self.mark_loaded(item, True)
+        inherit_checked = item.isCheckable() and item.checkState() == Qt.Checked
+
+        try:
+            # 获取文件夹内容并排序（先文件夹后文件）
+            entries = []
+            with os.scandir(folder_path) as it:
+                for entry in it:
+                    if not entry.name.startswith('.'):  # 跳过隐藏文件
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        entries.append((entry.name, entry.path, is_dir))
+            entries.sort(key=lambda x: (not x[2], x[0].lower()))
+            rows = [self.create_item(name, full_path, is_dir, self.initial_check_state(full_path, is_dir, inherit_checked))
+                    for name, full_path, is_dir in entries]
+        except PermissionError:
+            # 创建无权限访问的提示项
+            rows = [self.create_error_item(QStyle.SP_MessageBoxWarning, "无权限访问", folder_path)]
+        except Exception as e:
+            # 创建错误提示项
+            rows = [self.create_error_item(QStyle.SP_MessageBoxCritical, f"错误: {str(e)}", folder_path)]
+
+        if rows:
+            item.appendRows(rows)
+
+    def initial_check_state(self, path, is_dir, inherit_checked):
+        """新列出项的勾选状态：已记录勾选的保持勾选，否则继承父文件夹"""
+        if self.selection is None:
+            return Qt.Checked if inherit_checked else Qt.Unchecked
+        if inherit_checked:
+            self.selection.set_checked(path, is_dir, True)
+        return Qt.Checked if self.selection.is_checked(path) else Qt.Unchecked
+
+    def create_error_item(self, icon, text, folder_path):
+        """创建不可用的错误提示项"""
+        error_item = QStandardItem(QApplication.style().standardIcon(icon), text)
+        error_item.setData(folder_path, self.PathRole)
+        error_item.setEditable(False)
+        error_item.setEnabled(False)
+        return error_item
+
+    def insert_path(self, path, is_dir):
+        """把监视到的新文件/文件夹插入已列出的父文件夹，返回新项
+
+        隐藏项、已存在的项，以及父文件夹尚未列出（展开时会一起列出）的情况不插入，返回 None。
+        """
+        name = os.path.basename(path)
+        if name.startswith('.') or self.item_for_path(path) is not None:
+            return None
+        parent_item = self.item_for_path(os.path.dirname(path))
+        if parent_item is None or not self.is_loaded(parent_item):
+            return None
+        # 新项继承父文件夹的勾选状态
+        inherit_checked = parent_item.isCheckable() and parent_item.checkState() == Qt.Checked
+        item = self.create_item(name, path, is_dir, self.initial_check_state(path, is_dir, inherit_checked))
+        # 使用列表形式的 insertRow：单项重载插入的 QStandardItem 会被销毁，留下空行
+        parent_item.insertRow(self.insert_position(parent_item, name, is_dir), [item])
+        return item
+
+    def insert_position(self, parent_item, name, is_dir):
+        """按“文件夹在前、名称不区分大小写”的顺序计算插入位置（与 load_children 的排序一致）"""
+        key = (not is_dir, name.lower())
+        for row in range(parent_item.rowCount()):
+            child_item = parent_item.child(row)
+            if child_item is None or not child_item.isEnabled():
+                continue  # 错误提示项
+            if key < (not self.is_dir_item(child_item), child_item.text().lower()):
+                return row
+        return parent_item.rowCount()
+
+    def reload(self, item):
+        """重新列出文件夹内容"""
+        item.removeRows(0, item.rowCount())
+        self.load_children(item)
+
+    # ----------- 按需加载 End -----------
+
+    # ----------- 批量勾选 Start -----------
+
+    def set_subtree_check_state(self, items, checked):
+        """批量设置若干项及其已加载后代的勾选状态，返回状态变化的路径列表
+
+        逐项设置期间屏蔽模型信号，避免每一项都触发 itemChanged；
+        完成后按父项合并发出 dataChanged 刷新视图，并只发出一次 check_states_changed。
+        尚未加载的后代在展开时继承文件夹的勾选状态。
+        """
+        state = Qt.Checked if checked else Qt.Unchecked
+        changed = []
+        dirty_rows = {}  # 父项路径 -> (父项, 最小行号, 最大行号)
+        stack = [item for item in items if item is not None]
+        blocked = self.blockSignals(True)
+        try:
+            while stack:
+                item = stack.pop()
+                stack.extend(item.child(row) for row in range(item.rowCount()))
+                if not item.isCheckable() or not item.isEnabled() or item.checkState() == state:
+                    continue
+                item.setCheckState(state)
+                path = item.data(self.PathRole)
+                if self.selection is not None:
+                    self.selection.set_checked(path, self.is_dir_item(item), checked)
+                changed.append(path)
+
+                parent_item = item.parent() or self.invisibleRootItem()
+                key = parent_item.data(self.PathRole)
+                _, first, last = dirty_rows.get(key, (parent_item, item.row(), item.row()))
+                dirty_rows[key] = (parent_item, min(first, item.row()), max(last, item.row()))
+        finally:
+            self.blockSignals(blocked)
+
+        for parent_item, first, last in dirty_rows.values():
+            self.dataChanged.emit(parent_item.child(first).index(), parent_item.child(last).index(),
+                                  [Qt.CheckStateRole])
+        if changed:
+            self.check_states_changed.emit(changed, checked)
+        return changed
+
+    # ----------- 批量勾选 End -----------
+
+    # ----------- 路径索引 Start -----------
+
+    def on_rows_inserted(self, parent, first, last):
+        """登记新插入的项（错误提示项与父文件夹路径相同，不登记）"""
+        parent_item = self.itemFromIndex(parent) if parent.isValid() else self.invisibleRootItem()
+        for row in range(first, last + 1):
+            item = parent_item.child(row)
+            path = item.data(self.PathRole) if item is not None else None
+            if path and item.isEnabled():
+                self.path_index[path] = QPersistentModelIndex(item.index())
+
+    def on_rows_about_to_be_removed(self, parent, first, last):
+        """移除被删除的项及其已加载子项的登记"""
+        parent_item = self.itemFromIndex(parent) if parent.isValid() else self.invisibleRootItem()
+        stack = [parent_item.child(row) for row in range(first, last + 1)]
+        while stack:
+            item = stack.pop()
+            if item is None:
+                continue
+            path = item.data(self.PathRole)
+            if path and item.isEnabled():
+                self.path_index.pop(path, None)
+            stack.extend(item.child(row) for row in range(item.rowCount()))
+
+    def item_for_path(self, path):
+        """通过路径索引直接取得已加载的项"""
+        persistent = self.path_index.get(path)
+        if persistent is None:
+            return None
+        if not persistent.isValid():
+            del self.path_index[path]
+            return None
+        return self.itemFromIndex(self.index(persistent.row(), persistent.column(), persistent.parent()))
+
+    def find_item(self, path, load=False):
+        """查找路径对应的项，load 为 True 时依次列出途经的文件夹"""
+        item = self.item_for_path(path)
+        if item is not None or not load:
+            return item
+
+        parent_path = os.path.dirname(path)
+        if not parent_path or parent_path == path:
+            return None
+        parent_item = self.find_item(parent_path, load=True)
+        if parent_item is None or self.is_loaded(parent_item):
+            return None
+        self.load_children(parent_item)
+        return self.item_for_path(path)
+
+    # ----------- 路径索引 End -----------
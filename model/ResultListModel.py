@@ -0,0 +1,225 @@
+import os
+from array import array
+
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, Signal
+
+from model.SelectionStore import SelectionStore
+
+
+# ✅ 搜索结果列表模型（按列存储，显示文本和图标在 data() 中按需生成）
+class ResultListModel(QAbstractListModel):
+    PathRole = Qt.UserRole  # 完整路径
+    PageRole = Qt.UserRole + 1  # 命中的页码（内容搜索）
+
+    FLAG_DIR = 0x1
+    FLAG_CHECKED = 0x2
+
+    check_state_changed = Signal(str, bool)  # 用户勾选/取消勾选: 路径, 是否勾选
+
+    def __init__(self, icon_provider=None, selection=None, parent=None):
+        """icon_provider(路径, 是否目录) 返回通用图标，selection 为共用的勾选状态存储"""
+        super().__init__(parent)
+        self.icon_provider = icon_provider
+        self.selection = selection
+        self.base_paths = []
+        self.clear()
+
+    def clear(self):
+        """清空所有结果"""
+        self.beginResetModel()
+        self._paths = []  # 路径表（同一路径只存一次）
+        self._path_ids = {}  # 路径 -> 路径表下标
+        self._path_rows = {}  # 路径表下标 -> 行号列表
+        self._thumbnails = {}  # 路径表下标 -> 缩略图
+        self._path_index = array('i')
+        self._flags = array('B')
+        self._mtimes = array('d')
+        self._sizes = array('q')
+        self._pages = array('i')  # -1 表示没有页码
+        self.endResetModel()
+
+    def set_base_paths(self, base_paths):
+        """设置显示相对路径所依据的根目录"""
+        self.base_paths = list(base_paths)
+
+    def append_results(self, file_infos):
+        """批量追加结果（一次 beginInsertRows）"""
+        if not file_infos:
+            return
+        first = len(self._path_index)
+        self.beginInsertRows(QModelIndex(), first, first + len(file_infos) - 1)
+        for row, file_info in enumerate(file_infos, first):
+            path = file_info['path']
+            path_id = self._path_ids.get(path)
+            if path_id is None:
+                path_id = len(self._paths)
+                self._path_ids[path] = path_id
+                self._paths.append(path)
+            self._path_rows.setdefault(path_id, []).append(row)
+            self._path_index.append(path_id)
+            flags = self.FLAG_DIR if file_info['is_dir'] else 0
+            if self.selection is not None and self.selection.is_included(path):
+                flags |= self.FLAG_CHECKED  # 已在文件树中勾选的项（或位于勾选的文件夹下）
+            self._flags.append(flags)
+            self._mtimes.append(file_info.get('mtime') or 0)
+            self._sizes.append(file_info.get('size') or 0)
+            page = file_info.get('page')
+            self._pages.append(-1 if page is None else page)
+        self.endInsertRows()
+
+    # ----------- 模型接口 Start -----------
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._path_index)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return self.display_text(row)
+        if role == Qt.DecorationRole:
+            thumbnail = self._thumbnails.get(self._path_index[row])
+            if thumbnail is not None:
+                return thumbnail
+            if self.icon_provider:
+                return self.icon_provider(self.path(row), self.is_dir(row))
+            return None
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self._flags[row] & self.FLAG_CHECKED else Qt.Unchecked
+        if role == self.PathRole:
+            return self.path(row)
+        if role == self.PageRole:
+            return self.page(row)
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        checked = Qt.CheckState(value) == Qt.Checked
+        path = self.path(index.row())
+        if self.set_checked(path, checked):
+            self.check_state_changed.emit(path, checked)
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+
+    # ----------- 模型接口 End -----------
+
+    def path(self, row):
+        return self._paths[self._path_index[row]]
+
+    def is_dir(self, row):
+        return bool(self._flags[row] & self.FLAG_DIR)
+
+    def is_checked(self, row):
+        return bool(self._flags[row] & self.FLAG_CHECKED)
+
+    def size(self, row):
+        return self._sizes[row]
+
+    def mtime(self, row):
+        return self._mtimes[row]
+
+    def has_thumbnail(self, row):
+        return self._path_index[row] in self._thumbnails
+
+    def page(self, row):
+        page = self._pages[row]
+        return None if page < 0 else page
+
+    def display_text(self, row):
+        """显示相对路径，使结果更清晰；内容搜索结果显示命中的页码"""
+        path = self.path(row)
+        display_text = os.path.basename(path)
+        for base_path in self.base_paths:
+            if path.startswith(base_path):
+                rel_path = os.path.relpath(path, base_path)
+                display_text = f"{os.path.basename(base_path)}/{rel_path}"
+                break
+        page = self.page(row)
+        if page is not None:
+            display_text += f" (第{page + 1}页)"
+        return display_text
+
+    def is_dir_path(self, path):
+        """某个路径是否目录（按结果中的记录）"""
+        rows = self.rows_for_path(path)
+        return bool(rows) and self.is_dir(rows[0])
+
+    def rows_for_path(self, path):
+        """某个路径对应的所有行"""
+        path_id = self._path_ids.get(path)
+        return self._path_rows.get(path_id, []) if path_id is not None else []
+
+    def set_checked(self, path, checked):
+        """设置某个路径所有行的勾选状态（不发出 check_state_changed），返回是否有变化"""
+        changed = False
+        for row in self.rows_for_path(path):
+            if self.is_checked(row) != checked:
+                self._flags[row] ^= self.FLAG_CHECKED
+                changed = True
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return changed
+
+    def set_checked_paths(self, paths, checked):
+        """批量设置多个路径的勾选状态，只发出一次 dataChanged"""
+        changed_rows = []
+        for path in paths:
+            for row in self.rows_for_path(path):
+                if self.is_checked(row) != checked:
+                    self._flags[row] ^= self.FLAG_CHECKED
+                    changed_rows.append(row)
+        if changed_rows:
+            self.dataChanged.emit(self.index(min(changed_rows)), self.index(max(changed_rows)),
+                                  [Qt.CheckStateRole])
+
+    def sync_checked_under(self, folders, is_checked):
+        """文件夹的勾选状态变化后，按 is_checked(路径) 重新设置这些文件夹下所有行，只发出一次 dataChanged"""
+        folders = set(folders)
+        changed_rows = []
+        for path_id, path in enumerate(self._paths):
+            if not any(parent in folders for parent in SelectionStore.ancestors(path)):
+                continue
+            checked = is_checked(path)
+            for row in self._path_rows.get(path_id, []):
+                if self.is_checked(row) != checked:
+                    self._flags[row] ^= self.FLAG_CHECKED
+                    changed_rows.append(row)
+        if changed_rows:
+            self.dataChanged.emit(self.index(min(changed_rows)), self.index(max(changed_rows)),
+                                  [Qt.CheckStateRole])
+
+    def set_all_checked(self, checked):
+        """设置全部行的勾选状态，只发出一次 dataChanged，返回状态变化的路径列表"""
+        changed = []
+        for row in range(len(self._flags)):
+            if self.is_checked(row) != checked:
+                self._flags[row] ^= self.FLAG_CHECKED
+                changed.append(self.path(row))
+        if changed:
+            self.dataChanged.emit(self.index(0), self.index(len(self._flags) - 1), [Qt.CheckStateRole])
+        return list(dict.fromkeys(changed))
+
+    def checked_paths(self):
+        """所有已勾选的路径"""
+        return list(dict.fromkeys(self.path(row) for row in range(len(self._flags)) if self.is_checked(row)))
+
+    def has_checked(self):
+        return any(flag & self.FLAG_CHECKED for flag in self._flags)
+
+    def set_thumbnail(self, path, icon):
+        """设置某个路径的缩略图"""
+        path_id = self._path_ids.get(path)
+        if path_id is None:
+            return
+        self._thumbnails[path_id] = icon
+        for row in self._path_rows.get(path_id, []):
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
@@ -0,0 +1,80 @@
+import os
+
+
+# ✅ 勾选状态存储（与 Qt 项分离，树视图和列表视图共用）
+class SelectionStore:
+    """记录已勾选的路径，并为每个文件夹维护已勾选后代的计数
+
+    每次勾选/取消只更新该路径及其各级父文件夹的计数，
+    因此数量统计和按钮状态是 O(1)，列出选中项是 O(选中数)，不访问文件系统。
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """清空所有勾选"""
+        self.checked = {}  # 路径 -> 是否文件夹
+        self.descendant_counts = {}  # 文件夹 -> 已勾选的后代数
+        self.folder_count = 0
+        self.file_count = 0
+
+    @staticmethod
+    def ancestors(path):
+        """依次返回各级父目录"""
+        parent = os.path.dirname(path)
+        while parent and parent != path:
+            yield parent
+            path, parent = parent, os.path.dirname(parent)
+
+    def is_checked(self, path):
+        return path in self.checked
+
+    def is_included(self, path):
+        """路径本身或任一父文件夹已勾选（勾选的文件夹包含其下尚未列出的文件）"""
+        return path in self.checked or any(parent in self.checked for parent in self.ancestors(path))
+
+    def set_checked(self, path, is_dir, checked):
+        """设置一个路径的勾选状态，返回是否有变化"""
+        if checked == (path in self.checked):
+            return False
+        if checked:
+            self.checked[path] = is_dir
+            delta = 1
+        else:
+            is_dir = self.checked.pop(path)
+            delta = -1
+
+        if is_dir:
+            self.folder_count += delta
+        else:
+            self.file_count += delta
+        for folder in self.ancestors(path):
+            count = self.descendant_counts.get(folder, 0) + delta
+            if count:
+                self.descendant_counts[folder] = count
+            else:
+                del self.descendant_counts[folder]
+        return True
+
+    def checked_descendants(self, folder):
+        """文件夹下已勾选的后代数"""
+        return self.descendant_counts.get(folder, 0)
+
+    def has_selection(self):
+        return bool(self.checked)
+
+    def checked_files(self):
+        return [path for path, is_dir in self.checked.items() if not is_dir]
+
+    def checked_dirs(self):
+        return [path for path, is_dir in self.checked.items() if is_dir]
+
+    def discard_subtree(self, path):
+        """移除某个路径及其所有后代的勾选（文件被删除或移走时）"""
+        self.set_checked(path, False, False)
+        if not self.checked_descendants(path):
+            return
+        prefix = path.rstrip(os.sep) + os.sep
+        for child_path in [p for p in self.checked if p.startswith(prefix)]:
+            self.set_checked(child_path, False, False)
@@ -0,0 +1,10 @@
+import multiprocessing
+import sys
+
+if __name__ == '__main__':
+    # 命令行搜索：只使用 core，不导入 PySide6，启动快，可在没有界面的构建服务器上运行
+    multiprocessing.freeze_support()
+
+    from core.Cli import main
+
+    sys.exit(main())
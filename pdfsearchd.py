@@ -0,0 +1,10 @@
+import multiprocessing
+import sys
+
+if __name__ == '__main__':
+    # 常驻搜索服务：只使用 core，不导入 PySide6
+    multiprocessing.freeze_support()
+
+    from core.Daemon import main
+
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""过滤条件基准测试：比较逐项读取条件的 passes_filters 与编译后的判断函数
+
+用法: python scripts/bench_filters.py [条目数，默认 1000000]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.SearchFilters import compile_filters, passes_filters
+
+CATEGORIES = ['TDS', 'MSDS', 'COA', 'SPEC', 'REPORT']
+MODELS = [f'M{n:03d}' for n in range(200)]
+APNS = [f'{n:06d}' for n in range(5000)]
+
+
+def make_file_infos(count, seed=0):
+    """生成模拟的文件信息（名称形如 TDS_M012_004211_v3.pdf）"""
+    rng = random.Random(seed)
+    now = time.time()
+    return [{
+        'path': f'/data/{i}',
+        'name': f'{rng.choice(CATEGORIES)}_{rng.choice(MODELS)}_{rng.choice(APNS)}_v{rng.randint(1, 9)}.pdf',
+        'is_dir': False,
+        'mtime': now - rng.randint(0, 365 * 86400),
+        'size': rng.randint(1000, 10 ** 7),
+    } for i in range(count)]
+
+
+def base_filters(**overrides):
+    filters = {
+        'keyword': '', 'category_enabled': False, 'category_value': '',
+        'model_enabled': False, 'model_value': '', 'apn_enabled': False, 'apn_value': '',
+        'custom_enabled': False, 'custom_value': '', 'time_enabled': False,
+        'content_enabled': False, 'start_timestamp': 0, 'end_timestamp': 0,
+    }
+    filters.update(overrides)
+    return filters
+
+
+def cases():
+    now = time.time()
+    return {
+        '关键字': base_filters(keyword='m01'),
+        '关键字+分类+型号': base_filters(keyword='_v3', category_enabled=True, category_value='tds',
+                                   model_enabled=True, model_value='m012'),
+        '关键字+时间': base_filters(keyword='tds', time_enabled=True,
+                                start_timestamp=now - 30 * 86400, end_timestamp=now),
+        '全部条件': base_filters(keyword='pdf', category_enabled=True, category_value='tds',
+                             model_enabled=True, model_value='m0', apn_enabled=True, apn_value='0042',
+                             custom_enabled=True, custom_value='_v', time_enabled=True,
+                             start_timestamp=now - 180 * 86400, end_timestamp=now),
+    }
+
+
+def measure(predicate, file_infos):
+    """返回 (匹配数, 耗时秒)"""
+    start = time.perf_counter()
+    matched = sum(1 for file_info in file_infos if predicate(file_info))
+    return matched, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    file_infos = make_file_infos(count)
+    print(f"{count} 个条目")
+    print(f"{'条件':<16}{'匹配数':>10}{'逐项(ns/条)':>14}{'编译(ns/条)':>14}{'加速':>8}")
+    for name, filters in cases().items():
+        baseline_matched, baseline = measure(lambda file_info: passes_filters(file_info, filters), file_infos)
+        compiled_matched, compiled = measure(compile_filters(filters), file_infos)
+        if baseline_matched != compiled_matched:
+            sys.exit(f"{name}: 结果不一致 {baseline_matched} != {compiled_matched}")
+        print(f"{name:<16}{compiled_matched:>10}{baseline / count * 1e9:>14.0f}"
+              f"{compiled / count * 1e9:>14.0f}{baseline / compiled:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
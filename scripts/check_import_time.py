@@ -0,0 +1,93 @@
+"""启动耗时检查：用 python -X importtime 测量各入口模块的导入耗时
+
+超过预算，或启动时就导入了只在特定操作中才需要的重型依赖（pandas 只在选择
+Excel 时、PyMuPDF 只在第一次预览时导入），返回非零退出码，可用于回归检查。
+
+模块无法导入（例如缺少 PySide6）也视为失败，除非指定 --allow-missing。
+
+用法: python scripts/check_import_time.py [--budget-scale 倍数] [--runs 次数] [--allow-missing] [模块 ...]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 入口模块 -> 导入耗时预算（毫秒，取多次测量的最小值）
+BUDGETS_MS = {
+    'src.MainWindow': 600,  # 图形界面（含 PySide6）
+    'core.Cli': 60,  # 命令行搜索
+    'core.Daemon': 120,  # 搜索服务
+}
+
+# 启动时不应导入的模块（按需在函数内导入）
+LAZY_MODULES = ('pandas', 'pymupdf', 'fitz', 'openpyxl')
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+
+def measure(module):
+    """在新进程中导入模块，返回 (总耗时毫秒, 导入的模块名列表)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else
+                           f"导入 {module} 失败")
+
+    total_us = 0
+    imported = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        imported.append(name)
+        if len(indent) == 1:  # 顶层导入的累计耗时已包含其子模块
+            total_us += cumulative
+    return total_us / 1000, imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查各入口模块的导入耗时和延迟导入的依赖")
+    parser.add_argument('modules', nargs='*', help="要检查的模块（默认检查全部入口）")
+    parser.add_argument('--runs', type=int, default=3, help="每个模块测量的次数，取最小值")
+    parser.add_argument('--budget-scale', type=float,
+                        default=float(os.environ.get('IMPORT_BUDGET_SCALE', 1.0)),
+                        help="预算倍数，用于较慢的机器（也可以用环境变量 IMPORT_BUDGET_SCALE）")
+    parser.add_argument('--allow-missing', action='store_true',
+                        help="跳过无法导入的模块（例如没有安装 PySide6 的环境中只检查命令行入口）")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules or BUDGETS_MS:
+        try:
+            runs = [measure(module) for _ in range(max(args.runs, 1))]
+        except RuntimeError as e:
+            if args.allow_missing:
+                print(f"{module}: 跳过（{e}）")
+            else:
+                print(f"{module}: 无法导入（{e}）")
+                failed = True
+            continue
+
+        elapsed_ms = min(elapsed for elapsed, _ in runs)
+        budget_ms = BUDGETS_MS.get(module, 0) * args.budget_scale
+        eager = sorted({name for name in runs[0][1] if name.split('.')[0] in LAZY_MODULES})
+
+        status = "OK"
+        if budget_ms and elapsed_ms > budget_ms:
+            status = "超出预算"
+            failed = True
+        if eager:
+            status = f"启动时导入了 {', '.join(eager)}"
+            failed = True
+        budget_text = f" / 预算 {budget_ms:.0f} ms" if budget_ms else ""
+        print(f"{module}: {elapsed_ms:.1f} ms{budget_text}  {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -19,6 +19,7 @@ opts = [
     '--add-data=ui;ui',
     '--add-data=img;img',
     '--add-data=src;src',
+    '--add-data=core;core',
     '--hidden-import=PySide6.QtXml',
     '--hidden-import=pymupdf',
     '--hidden-import=pandas',
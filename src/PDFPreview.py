@@ -0,0 +1,170 @@
+import os
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QTimer, Qt, QCoreApplication
+from PySide6.QtGui import QPixmap
+from PySide6.QtWidgets import QLabel
+
+from core.Trace import span
+from src.PixmapCache import shared_cache
+from src.RenderWorker import RenderWorker
+
+
+class LazyPageLoader(QObject):
+    """按需渲染PDF页面
+
+    打开文档时只根据每页的尺寸创建占位标签，真正的渲染只针对与滚动视口相交的页面
+    （上下各预取半屏），离开视口较远的页面会释放图像，恢复为占位。
+    渲染在后台线程中进行，视口内的页面优先，切换文档或滚动后过时的任务自动取消。
+    渲染结果放入共用的 LRU 缓存，再次打开同一文档时直接显示。
+    """
+
+    PREFETCH_RATIO = 0.5  # 视口上下预取的高度（相对视口高度）
+    KEEP_RATIO = 3.0  # 超出该距离（相对视口高度）的已渲染页面释放图像
+    RECT_CACHE_SIZE = 64  # 缓存页面尺寸的文档数
+
+    rect_cache = OrderedDict()  # (路径, 修改时间) -> 各页尺寸，所有实例共用
+
+    def __init__(self, scroll_area, layout, dpi=100, parent=None):
+        super().__init__(parent)
+        self.scroll_area = scroll_area
+        self.layout = layout
+        self.dpi = dpi
+        self.zoom = 1.0
+        self.path = None
+        self.mtime = None
+        self.cache = shared_cache()
+        self.labels = []
+        self.rendered = set()
+        self.pending_page = None  # 布局完成后需要滚动到的页
+
+        # 滚动或视口大小变化后重新计算可见页面（合并为一次更新）
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.setInterval(0)
+        self.update_timer.timeout.connect(self.update_visible_pages)
+        scroll_bar = self.scroll_area.verticalScrollBar()
+        scroll_bar.valueChanged.connect(self.schedule_update)
+        scroll_bar.rangeChanged.connect(self.schedule_update)
+
+        self.worker = RenderWorker(self)
+        self.worker.page_rendered.connect(self.on_page_rendered)
+        self.worker.start()
+        if QCoreApplication.instance():
+            QCoreApplication.instance().aboutToQuit.connect(self.close)
+
+    def load(self, path, zoom=1.0, page=0):
+        """打开文档并创建各页占位，只渲染首屏（page 为初始显示的页码）"""
+        self.clear()
+        self.mtime = os.path.getmtime(path)
+        rects = self.page_rects(path, self.mtime)
+        self.path = path
+        self.zoom = zoom
+
+        scale = self.zoom * self.dpi / 72
+        for page_num, rect in enumerate(rects):
+            label = QLabel(f"第 {page_num + 1} 页")
+            label.setAlignment(Qt.AlignCenter)
+            label.setScaledContents(True)
+            label.setFixedSize(int(rect.width * scale), int(rect.height * scale))
+            label.setStyleSheet("background-color: #f0f0f0; color: #909090;")
+            self.layout.addWidget(label, 0, Qt.AlignHCenter)
+            self.labels.append(label)
+
+        self.scroll_area.verticalScrollBar().setValue(0)
+        self.pending_page = page if page and 0 < page < len(self.labels) else None
+        self.schedule_update()
+
+    def page_rects(self, path, mtime):
+        """读取各页尺寸（界面线程只读尺寸，渲染由后台线程单独打开文档完成）"""
+        key = (path, mtime)
+        rects = self.rect_cache.get(key)
+        if rects is None:
+            import pymupdf as fitz  # 第一次预览时才载入 PyMuPDF
+
+            with span('preview.open', file=path), fitz.open(path) as doc:
+                rects = [page.rect for page in doc]
+            self.rect_cache[key] = rects
+            while len(self.rect_cache) > self.RECT_CACHE_SIZE:
+                self.rect_cache.popitem(last=False)
+        self.rect_cache.move_to_end(key)
+        return rects
+
+    def clear(self):
+        """移除所有页面，取消未完成的渲染"""
+        self.worker.set_jobs([])
+        while self.layout.count():
+            child = self.layout.takeAt(0)
+            if child.widget():
+                child.widget().deleteLater()
+        self.labels = []
+        self.rendered = set()
+        self.pending_page = None
+        self.path = None
+
+    def close(self):
+        """结束渲染线程"""
+        self.clear()
+        if self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait(2000)
+
+    def schedule_update(self, *args):
+        """在下一次事件循环中更新可见页面"""
+        if self.path is not None:
+            self.update_timer.start()
+
+    def update_visible_pages(self):
+        """渲染视口（含预取范围）内的页面，释放远离视口的页面"""
+        if self.path is None:
+            return
+
+        if self.pending_page is not None:
+            # 占位标签的位置在布局完成后才确定，之后再滚动到目标页
+            label = self.labels[self.pending_page]
+            if label.y() > 0:
+                self.pending_page = None
+                self.scroll_area.verticalScrollBar().setValue(label.y())
+            else:
+                self.schedule_update()
+                return
+
+        viewport_height = self.scroll_area.viewport().height()
+        top = self.scroll_area.verticalScrollBar().value()
+        bottom = top + viewport_height
+        prefetch = viewport_height * self.PREFETCH_RATIO
+        keep = viewport_height * self.KEEP_RATIO
+
+        # 视口内的页面按与视口顶部的距离排序，预取的页面排在其后
+        jobs = []
+        for page_num, label in enumerate(self.labels):
+            geometry = label.geometry()
+            if geometry.bottom() >= top - prefetch and geometry.top() <= bottom + prefetch:
+                if page_num not in self.rendered:
+                    pixmap = self.cache.get(self.cache_key(page_num))
+                    if pixmap is not None:
+                        label.setPixmap(pixmap)
+                        self.rendered.add(page_num)
+                        continue
+                    visible = geometry.bottom() >= top and geometry.top() <= bottom
+                    priority = (0 if visible else 1, abs(geometry.top() - top))
+                    jobs.append((priority, self.cache_key(page_num)))
+            elif page_num in self.rendered and (geometry.bottom() < top - keep or geometry.top() > bottom + keep):
+                label.clear()
+                label.setText(f"第 {page_num + 1} 页")
+                self.rendered.discard(page_num)
+        self.worker.set_jobs(jobs)
+
+    def cache_key(self, page_num):
+        """渲染任务和缓存共用的键：(路径, 修改时间, 页码, 缩放, dpi)"""
+        return self.path, self.mtime, page_num, self.zoom, self.dpi
+
+    def on_page_rendered(self, key, image):
+        """后台渲染完成，只接受当前文档和缩放下尚未显示的页面"""
+        pixmap = QPixmap.fromImage(image)
+        self.cache.put(key, pixmap)
+        page_num = key[2]
+        if key != self.cache_key(page_num) or page_num >= len(self.labels) or page_num in self.rendered:
+            return
+        self.labels[page_num].setPixmap(pixmap)
+        self.rendered.add(page_num)
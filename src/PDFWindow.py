@@ -1,10 +1,6 @@
-import sys
-import fitz  # PyMuPDF
-from PySide6.QtWidgets import (QMainWindow, QLabel, QVBoxLayout,
-                               QWidget, QScrollArea
-                               )
-from PySide6.QtGui import QPixmap, QImage
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QScrollArea
+
+from src.PDFPreview import LazyPageLoader
 
 
 # ===== 新窗口类：用于在独立窗口中显示 PDF =====
@@ -25,27 +21,20 @@ class PDFWindow(QMainWindow):
 
         self.setCentralWidget(scroll_area)
 
+        # 页面在后台线程中按滚动位置渲染
+        self.page_loader = LazyPageLoader(scroll_area, self.image_layout, dpi=150, parent=self)
+
         if filename:
             self.load_pdf(filename)
 
     def load_pdf(self, filename):
-        """加载并渲染 PDF 文件"""
+        """加载 PDF 文件（页面随滚动按需渲染）"""
         try:
-            doc = fitz.open(filename)
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                zoom = fitz.Matrix(1.0, 1.0)
-                pix = page.get_pixmap(matrix=zoom, dpi=150)
-
-                # 构造 QImage（注意格式）
-                image = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
-                pixmap = QPixmap.fromImage(image)
-
-                label = QLabel()
-                label.setPixmap(pixmap)
-                label.setAlignment(Qt.AlignCenter)
-                label.setScaledContents(True)
-
-                self.image_layout.addWidget(label)
+            self.page_loader.load(filename)
         except Exception as e:
             print("加载 PDF 失败：", e)
+
+    def closeEvent(self, event):
+        """关闭窗口时结束渲染线程"""
+        self.page_loader.close()
+        super().closeEvent(event)
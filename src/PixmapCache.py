@@ -0,0 +1,83 @@
+import os
+from collections import OrderedDict
+
+
+def default_budget():
+    """默认内存预算（字节）：环境变量 PDFSEARCH_PIXMAP_CACHE_MB，否则 256MB"""
+    try:
+        megabytes = float(os.environ.get('PDFSEARCH_PIXMAP_CACHE_MB', 256))
+    except ValueError:
+        megabytes = 256
+    return int(megabytes * 1024 * 1024)
+
+
+class PixmapCache:
+    """已渲染页面的 LRU 缓存（只在界面线程中使用）
+
+    键为 (路径, 修改时间, 页码, 缩放, dpi)，文件修改后键随之变化，
+    同一文件的旧版本在写入新版本时一并清除；总大小超过预算时淘汰最久未用的页面。
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes or default_budget()
+        self.total_bytes = 0
+        self.entries = OrderedDict()  # 键 -> (QPixmap, 字节数)
+        self.mtimes = {}  # 路径 -> 缓存中的修改时间
+
+    @staticmethod
+    def pixmap_bytes(pixmap):
+        """估算 QPixmap 占用的内存"""
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def get(self, key):
+        """取出缓存的页面，不存在时返回 None"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, pixmap):
+        """缓存一个页面，必要时淘汰旧页面"""
+        path, mtime = key[0], key[1]
+        if self.mtimes.get(path, mtime) != mtime:
+            self.invalidate(path)
+        self.mtimes[path] = mtime
+
+        size = self.pixmap_bytes(pixmap)
+        if size > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= old[1]
+        self.entries[key] = (pixmap, size)
+        self.total_bytes += size
+
+        while self.total_bytes > self.max_bytes:
+            old_key, (_, old_size) = self.entries.popitem(last=False)
+            self.total_bytes -= old_size
+            if not any(entry_key[0] == old_key[0] for entry_key in self.entries):
+                self.mtimes.pop(old_key[0], None)
+
+    def invalidate(self, path):
+        """清除某个文件的全部缓存页面"""
+        for key in [key for key in self.entries if key[0] == path]:
+            self.total_bytes -= self.entries.pop(key)[1]
+        self.mtimes.pop(path, None)
+
+    def clear(self):
+        """清空缓存"""
+        self.entries.clear()
+        self.mtimes.clear()
+        self.total_bytes = 0
+
+
+_shared_cache = None
+
+
+def shared_cache():
+    """预览区和 PDF 窗口共用的缓存"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = PixmapCache()
+    return _shared_cache
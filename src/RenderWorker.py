@@ -0,0 +1,149 @@
+import heapq
+import itertools
+from collections import OrderedDict
+
+from PySide6.QtCore import QThread, Signal, QMutex, QMutexLocker, QWaitCondition
+from PySide6.QtGui import QImage
+
+from core.Trace import span
+
+
+class RenderWorker(QThread):
+    """后台页面渲染线程
+
+    任务以 (路径, 修改时间, 页码, 缩放, dpi) 为键，按优先级（数值越小越先）依次渲染，
+    结果以 QImage 通过信号交回界面线程（QPixmap 只能在界面线程中创建）。
+    set_jobs 整体替换待渲染队列，切换文档或滚动后，过时的任务直接丢弃。
+    """
+
+    page_rendered = Signal(object, QImage)  # 任务键, 渲染结果
+
+    MAX_OPEN_DOCS = 2  # 线程内保持打开的文档数
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.mutex = QMutex()
+        self.condition = QWaitCondition()
+        self.jobs = []  # (优先级, 序号, 任务键) 小顶堆
+        self.counter = itertools.count()
+        self.stopped = False
+        self.docs = OrderedDict()  # (路径, 修改时间) -> 已打开的文档，只在渲染线程中访问
+
+    def set_jobs(self, jobs):
+        """替换全部待渲染任务，jobs 为 [(优先级, 任务键), ...]"""
+        with QMutexLocker(self.mutex):
+            self.jobs = [(priority, next(self.counter), key) for priority, key in jobs]
+            heapq.heapify(self.jobs)
+            self.condition.wakeOne()
+
+    def add_jobs(self, jobs):
+        """追加任务，jobs 为 [(优先级, 任务键), ...]"""
+        with QMutexLocker(self.mutex):
+            for priority, key in jobs:
+                heapq.heappush(self.jobs, (priority, next(self.counter), key))
+            self.condition.wakeOne()
+
+    def stop(self):
+        """丢弃剩余任务并结束线程"""
+        with QMutexLocker(self.mutex):
+            self.jobs = []
+            self.stopped = True
+            self.condition.wakeOne()
+
+    def next_job(self):
+        """阻塞直到取得下一个任务，线程结束时返回 None"""
+        with QMutexLocker(self.mutex):
+            while not self.jobs and not self.stopped:
+                self.condition.wait(self.mutex)
+            if self.stopped:
+                return None
+            return heapq.heappop(self.jobs)[2]
+
+    def run(self):
+        while True:
+            key = self.next_job()
+            if key is None:
+                break
+            image = self.render(key)
+            if image is not None:
+                self.page_rendered.emit(key, image)
+
+        for doc in self.docs.values():
+            doc.close()
+        self.docs.clear()
+
+    def open_doc(self, path, mtime):
+        """打开文档（复用最近打开的文档，文件修改后重新打开）"""
+        doc = self.docs.pop((path, mtime), None)
+        if doc is None:
+            import pymupdf as fitz  # 第一次渲染时才载入 PyMuPDF，不拖慢程序启动
+
+            doc = fitz.open(path)
+        self.docs[(path, mtime)] = doc
+        while len(self.docs) > self.MAX_OPEN_DOCS:
+            _, old_doc = self.docs.popitem(last=False)
+            old_doc.close()
+        return doc
+
+    def render(self, key):
+        """渲染单页，返回独立于 PyMuPDF 缓冲区的 QImage"""
+        import pymupdf as fitz
+
+        path, mtime, page_num, zoom, dpi = key
+        try:
+            with span('preview.render', page=page_num, zoom=zoom):
+                page = self.open_doc(path, mtime).load_page(page_num)
+                # 只用矩阵指定缩放（同时传 dpi 时 PyMuPDF 会忽略矩阵），与占位尺寸的计算一致
+                scale = zoom * dpi / 72
+                pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale))
+                image = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
+                return image.copy()
+        except Exception as e:
+            print(f"渲染第 {page_num + 1} 页失败: {e}")
+            return None
+
+
+class ThumbnailWorker(RenderWorker):
+    """后台缩略图线程：以低分辨率渲染 PDF 首页并写入磁盘缓存
+
+    任务键为 (路径, 大小, 修改时间)，完成后发出缩略图文件路径，失败时发出任务键。
+    """
+
+    thumbnail_ready = Signal(str, str)  # PDF路径, 缩略图文件路径
+    thumbnail_failed = Signal(object)  # 任务键
+
+    THUMBNAIL_SIZE = 96  # 缩略图长边的像素数
+
+    def __init__(self, cache, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+
+    def run(self):
+        while True:
+            key = self.next_job()
+            if key is None:
+                break
+            path, size, mtime = key
+            thumb_path = self.cache.lookup(path, size, mtime)
+            if thumb_path is None:
+                thumb_path = self.render_thumbnail(path, size, mtime)
+            if thumb_path is not None:
+                self.thumbnail_ready.emit(path, thumb_path)
+            else:
+                self.thumbnail_failed.emit(key)
+
+    def render_thumbnail(self, path, size, mtime):
+        """渲染首页并写入缓存，失败时返回 None"""
+        import pymupdf as fitz
+
+        try:
+            with span('preview.thumbnail', file=path), fitz.open(path) as doc:
+                if len(doc) == 0:
+                    return None
+                page = doc.load_page(0)
+                scale = self.THUMBNAIL_SIZE / max(page.rect.width, page.rect.height, 1)
+                data = page.get_pixmap(matrix=fitz.Matrix(scale, scale)).tobytes("png")
+            return self.cache.store(path, size, mtime, data)
+        except Exception as e:
+            print(f"生成缩略图失败 {path}: {e}")
+            return None
@@ -1,24 +1,36 @@
 import os
 import platform
+import sqlite3
 import sys
 import shutil
 import subprocess
-from datetime import datetime, time
-from pathlib import Path
+from datetime import datetime
 import time
 
-import pandas as pd
-from PySide6.QtGui import QImage, QPixmap, Qt, QAction, QStandardItem, QIcon, QStandardItemModel
-from PySide6.QtWidgets import QFileDialog, QLabel, QMessageBox, QMenu, QInputDialog, \
-    QFormLayout, QCheckBox, QDateEdit, QPushButton, QGroupBox, QListWidgetItem, QWidget, QTreeView, QAbstractItemView, \
+from PySide6.QtGui import Qt, QAction, QIcon
+from PySide6.QtWidgets import QFileDialog, QMessageBox, QMenu, QInputDialog, \
+    QFormLayout, QCheckBox, QDateEdit, QPushButton, QGroupBox, QWidget, QTreeView, QAbstractItemView, \
     QApplication, QStyle, QFileIconProvider, QHBoxLayout, QComboBox, QLineEdit, QVBoxLayout
-from PySide6.QtCore import QDir, QDate, QFileInfo, QStandardPaths, QTimer
+from PySide6.QtCore import QDir, QDate, QFileInfo, QStandardPaths, QTimer, QSize, QModelIndex, QPoint, QEvent
 from PySide6.QtWidgets import QFileSystemModel
 
 from PySide6.QtCore import QThread, Signal, QMutex, QMutexLocker
+from model.FolderTreeModel import FolderTreeModel
+from model.ResultListModel import ResultListModel
+from model.SelectionStore import SelectionStore
+from core.Backup import backup_folders
+from core.CopySelection import copy_selection, count_visible, existing_targets, list_visible_files, plan_copy
+from core.Daemon import daemon_address, remote_search
+from core.ExcelTags import load_excel_tags
+from core.FileIndex import FileIndex
+from core.FolderWatcher import create_backend
+from core.Search import has_any_condition, index_content, make_filters, search
+from core.SearchFilters import compile_filters, narrows
+from core.Trace import span
+from src.PDFPreview import LazyPageLoader
 from src.PDFWindow import PDFWindow
-# PyMuPDF
-import pymupdf as fitz
+from src.RenderWorker import ThumbnailWorker
+from src.ThumbnailCache import ThumbnailCache
 
 from ui.SearchWidgetUI import Ui_SearchWidget
 
@@ -30,6 +42,25 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+def app_data_dir():
+    """ 获取应用数据目录 """
+    data_dir = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation)
+    if not data_dir:
+        data_dir = os.path.join(os.path.expanduser("~"), ".tdssearch")
+    return data_dir
+
+def index_db_path():
+    """ 获取文件名索引数据库的路径（位于应用数据目录） """
+    return os.path.join(app_data_dir(), "file_index.sqlite3")
+
+def content_index_db_path():
+    """ 获取PDF内容索引数据库的路径（位于应用数据目录） """
+    return os.path.join(app_data_dir(), "content_index.sqlite3")
+
+def thumbnail_cache_dir():
+    """ 获取缩略图缓存目录（位于应用数据目录） """
+    return os.path.join(app_data_dir(), "thumbnails")
+
 # 添加后台搜索线程类
 class FileSearchThread(QThread):
     """后台文件搜索线程，避免阻塞UI"""
@@ -38,148 +69,43 @@ class FileSearchThread(QThread):
     finished = Signal()
     canceled = Signal()
 
-    def __init__(self, base_paths, filters, parent=None):
+    def __init__(self, base_paths, filters, index_path=None, force_refresh=False, parent=None,
+                 content_index_path=None):
         super().__init__(parent)
         self.base_paths = base_paths
         self.filters = filters
+        self.index_path = index_path  # 文件名索引数据库路径，为空时直接遍历磁盘
+        self.force_refresh = force_refresh  # 是否强制检查索引是否过期
+        self.content_index_path = content_index_path  # PDF内容索引数据库路径
         self.cancel_requested = False
         self.mutex = QMutex()
 
     def run(self):
-        """线程主执行函数"""
-        total_files = 0
-
-        # 先计算总文件数用于进度显示
-        for base_path in self.base_paths:
-            if self.is_canceled():
-                return
-            for root, dirs, files in os.walk(base_path):
-                total_files += len(dirs)  # 添加目录计数
-                total_files += len(files)
-
-        processed_files = 0
-
-        # 实际搜索过程
-        for base_path in self.base_paths:
-            if self.is_canceled():
-                return
-
-            for root, dirs, files in os.walk(base_path):
-                if self.is_canceled():
-                    return
-
-                # 处理目录
-                for name in dirs:
-                    if self.is_canceled():
-                        return
-
-                    full_path = os.path.join(root, name)
-                    dir_info = self.get_dir_info(full_path)
-
-                    # 应用过滤条件
-                    if self.passes_filters(dir_info):
-                        self.found_file.emit(dir_info)
-
-                    processed_files += 1
-                    if processed_files % 100 == 0:  # 每100个文件更新一次进度
-                        self.progress.emit(processed_files, total_files)
-
-                # 处理文件
-                for name in files:
-                    if self.is_canceled():
-                        return
-
-                    full_path = os.path.join(root, name)
-                    file_info = self.get_file_info(full_path)
-
-                    # 应用过滤条件
-                    if self.passes_filters(file_info):
-                        self.found_file.emit(file_info)
-
-                    processed_files += 1
-                    if processed_files % 100 == 0:  # 每100个文件更新一次进度
-                        self.progress.emit(processed_files, total_files)
-
-        self.finished.emit()
-    def get_dir_info(self, path):
-        """获取目录信息字典"""
-        try:
-            stat_info = os.stat(path)
-            return {
-                'path': path,
-                'name': os.path.basename(path),
-                'is_dir': True,  # 标记为目录
-                'mtime': stat_info.st_mtime,
-                'size': stat_info.st_size
-            }
-        except Exception:
-            return {
-                'path': path,
-                'name': os.path.basename(path),
-                'is_dir': True,  # 标记为目录
-                'mtime': 0,
-                'size': 0
-            }
-
-    def get_file_info(self, path):
-        """获取文件信息字典"""
-        try:
-            stat_info = os.stat(path)
-            return {
-                'path': path,
-                'name': os.path.basename(path),
-                'is_dir': False,  # 标记为文件
-                'mtime': stat_info.st_mtime,
-                'size': stat_info.st_size
-            }
-        except Exception:
-            return {
-                'path': path,
-                'name': os.path.basename(path),
-                'is_dir': False,  # 标记为文件
-                'mtime': 0,
-                'size': 0
-            }
-
-    def passes_filters(self, file_info):
-        """应用所有过滤条件"""
-        keyword = self.filters.get('keyword', '')
-        category_enabled = self.filters.get('category_enabled', False)
-        category_value = self.filters.get('category_value', '')
-        model_enabled = self.filters.get('model_enabled', False)
-        model_value = self.filters.get('model_value', '')
-        apn_enabled = self.filters.get('apn_enabled', False)
-        apn_value = self.filters.get('apn_value', '')
-        custom_enabled = self.filters.get('custom_enabled', False)
-        custom_value = self.filters.get('custom_value', '')
-        time_enabled = self.filters.get('time_enabled', False)
-        start_timestamp = self.filters.get('start_timestamp', 0)
-        end_timestamp = self.filters.get('end_timestamp', 0)
-
-        name_lower = file_info['name'].lower()
-
-        # 1. 关键字匹配
-        keyword_match = not keyword or keyword in name_lower
-
-        # 2. 属性筛选
-        category_match = not (category_enabled and category_value) or category_value in name_lower
-        model_match = not (model_enabled and model_value) or model_value in name_lower
-        apn_match = not (apn_enabled and apn_value) or apn_value in name_lower
-
-        # 3. 自定义属性匹配
-        custom_match = not (custom_enabled and custom_value) or custom_value in name_lower
-
-        # 4. 时间匹配
-        time_match = True
-        if time_enabled:
+        """线程主执行函数：逐条转发搜索结果（设置了 PDFSEARCH_DAEMON 时由搜索服务查询）"""
+        results = None
+        address = daemon_address()
+        if address:
             try:
-                time_match = (start_timestamp <= file_info['mtime'] <= end_timestamp)
-            except Exception:
-                time_match = False
-
-        # 应用所有筛选条件（使用逻辑与）
-        return (keyword_match and category_match and model_match and
-                apn_match and custom_match and time_match)
+                results = remote_search(address, self.base_paths, self.filters, self.force_refresh,
+                                        progress_callback=self.progress.emit, is_canceled=self.is_canceled)
+            except OSError as e:
+                print(f"搜索服务不可用，改为本地搜索: {e}")
+        if results is None:
+            results = search(self.base_paths, self.filters, self.index_path, self.content_index_path,
+                             self.force_refresh, progress_callback=self.progress.emit,
+                             is_canceled=self.is_canceled)
+
+        with span('search', remote=bool(address), results=0) as search_span:
+            found = 0
+            try:
+                for file_info in results:
+                    self.found_file.emit(file_info)
+                    found += 1
+            except OSError as e:
+                print(f"搜索中断: {e}")
+            search_span.set(results=found, canceled=self.is_canceled())
+        if not self.is_canceled():
+            self.finished.emit()
 
     def cancel(self):
         """请求取消搜索"""
@@ -218,70 +144,11 @@ class BackupThread(QThread):
             today = datetime.now().strftime("%Y-%m-%d")
             backup_dir = os.path.join(desktop_path, f"Backup_{today}")
 
-            if not os.path.exists(backup_dir):
-                os.makedirs(backup_dir)
-                self.progress.emit(f"创建备份文件夹: {os.path.basename(backup_dir)}")
-
-            # 备份每个选中的文件夹
-            total_files = 0
-            copied_files = 0
-            skipped_files = 0
-
-            for source_path in self.source_paths:
-                if self.is_canceled():
-                    return
-
-                # 计算源文件夹中的文件总数（用于进度显示）
-                for root, dirs, files in os.walk(source_path):
-                    total_files += len(files)
-
-            # 实际备份过程
-            for source_path in self.source_paths:
-                if self.is_canceled():
-                    return
-
-                # 在备份目录中创建对应的子文件夹
-                folder_name = os.path.basename(source_path.rstrip(os.sep))
-                target_folder = os.path.join(backup_dir, folder_name)
-
-                if not os.path.exists(target_folder):
-                    os.makedirs(target_folder)
-                    self.progress.emit(f"创建目标文件夹: {folder_name}")
-
-                # 递归复制文件
-                for root, dirs, files in os.walk(source_path):
-                    if self.is_canceled():
-                        return
-
-                    # 计算相对路径
-                    rel_path = os.path.relpath(root, source_path)
-                    target_path = os.path.join(target_folder, rel_path)
-
-                    # 创建目标子目录
-                    if not os.path.exists(target_path):
-                        os.makedirs(target_path)
-
-                    # 复制文件
-                    for file in files:
-                        if self.is_canceled():
-                            return
-
-                        src_file = os.path.join(root, file)
-                        dst_file = os.path.join(target_path, file)
-
-                        # 检查文件是否需要复制（不存在或不同）
-                        if not os.path.exists(dst_file) or \
-                                self.is_file_different(src_file, dst_file):
-                            try:
-                                shutil.copy2(src_file, dst_file)
-                                copied_files += 1
-                                if copied_files % 10 == 0:  # 每10个文件更新一次进度
-                                    self.progress.emit(f"已备份 {copied_files} 个文件...")
-                            except Exception as e:
-                                self.error.emit(f"复制文件失败: {os.path.basename(src_file)} -> {e}")
-                        else:
-                            skipped_files += 1
-
+            result = backup_folders(self.source_paths, backup_dir, self.progress.emit, self.error.emit,
+                                    self.is_canceled)
+            if result is None:
+                return
+            copied_files, skipped_files = result
             self.finished.emit(f"备份完成! 已备份 {copied_files} 个文件, 跳过 {skipped_files} 个未更改文件")
 
         except Exception as e:
@@ -308,22 +175,41 @@ class BackupThread(QThread):
             # 最终备用方案
             return os.path.expanduser("~")
 
-    def is_file_different(self, src, dst):
-        """检查两个文件是否不同（通过大小和修改时间）"""
-        
-        try:
-            src_stat = os.stat(src)
-            dst_stat = os.stat(dst)
+    def cancel(self):
+        """请求取消备份"""
+        with QMutexLocker(self.mutex):
+            self.cancel_requested = True
 
-            # 比较文件大小和修改时间
-            return (src_stat.st_size != dst_stat.st_size or
-                    src_stat.st_mtime > dst_stat.st_mtime)
-        except:
-            # 如果无法获取文件信息，默认需要复制
-            return True
+    def is_canceled(self):
+        """检查是否已请求取消"""
+        with QMutexLocker(self.mutex):
+            return self.cancel_requested
+
+
+# 添加后台PDF内容索引线程类
+class ContentIndexThread(QThread):
+    """后台PDF内容索引线程：提取每页文本写入倒排索引"""
+    progress = Signal(int, int)  # 已处理文档数，文档总数
+    finished = Signal(int)  # 本次新建索引的文档数
+
+    def __init__(self, base_paths, index_path, force=False, parent=None, max_workers=None, timeout=None):
+        super().__init__(parent)
+        self.base_paths = base_paths
+        self.index_path = index_path
+        self.force = force  # 是否忽略指纹，重新提取全部文档
+        self.max_workers = max_workers  # 文本提取进程数，为空时使用默认值
+        self.timeout = timeout  # 单个文件的提取超时（秒）
+        self.cancel_requested = False
+        self.mutex = QMutex()
+
+    def run(self):
+        """线程主执行函数"""
+        indexed = index_content(self.base_paths, self.index_path, self.force, self.max_workers, self.timeout,
+                                progress_callback=self.progress.emit, is_canceled=self.is_canceled)
+        self.finished.emit(indexed)
 
     def cancel(self):
-        """请求取消备份"""
+        """请求取消索引"""
         with QMutexLocker(self.mutex):
             self.cancel_requested = True
 
@@ -333,7 +219,115 @@ class BackupThread(QThread):
             return self.cancel_requested
 
 
+class SelectionCountThread(QThread):
+    """后台统计尚未展开的勾选文件夹下的文件夹和文件数（复制时这些文件都会被包含）"""
+    counted = Signal(int, dict)  # 缓存代数, 文件夹 -> (文件夹数, 文件数)
+
+    def __init__(self, folders, generation, parent=None):
+        super().__init__(parent)
+        self.folders = list(folders)
+        self.generation = generation
+        self.cancel_requested = False
+        self.mutex = QMutex()
+
+    def run(self):
+        """线程主执行函数"""
+        counts = {}
+        for folder in self.folders:
+            if self.is_canceled():
+                return
+            counts[folder] = count_visible(folder, self.is_canceled)
+        if not self.is_canceled():
+            self.counted.emit(self.generation, counts)
+
+    def cancel(self):
+        """请求取消统计"""
+        with QMutexLocker(self.mutex):
+            self.cancel_requested = True
+
+    def is_canceled(self):
+        """检查是否已请求取消"""
+        with QMutexLocker(self.mutex):
+            return self.cancel_requested
+
+
+# 添加后台文件夹监视线程类
+class FolderWatcherThread(QThread):
+    """后台文件夹监视线程：把文件变化增量应用到文件名索引，并通知界面更新文件树"""
+    changes = Signal(list)  # 传递一批变化记录
+
+    COALESCE_DELAY = 0.5  # 合并短时间内连续变化的等待时间（秒）
+
+    def __init__(self, roots, index_path=None, parent=None):
+        super().__init__(parent)
+        self.roots = roots
+        self.index_path = index_path
+        self.cancel_requested = False
+        self.poll_requested = False
+        self.mutex = QMutex()
+
+    def run(self):
+        """线程主执行函数"""
+        try:
+            backend = create_backend(self.roots, self.is_canceled)
+        except Exception as e:
+            print(f"无法启动文件夹监视: {e}")
+            return
+
+        index = None
+        if self.index_path:
+            try:
+                index = FileIndex(self.index_path)
+            except sqlite3.Error as e:
+                print(f"索引不可用，仅更新文件树: {e}")
+
+        pending = []
+        first_change_time = 0
+        try:
+            while not self.is_canceled():
+                with QMutexLocker(self.mutex):
+                    if self.poll_requested:
+                        self.poll_requested = False
+                        backend.request_poll()
+
+                new_changes = backend.poll(0.2)
+                if new_changes:
+                    if not pending:
+                        first_change_time = time.time()
+                    pending.extend(new_changes)
+
+                if pending and time.time() - first_change_time >= self.COALESCE_DELAY:
+                    if index is not None:
+                        try:
+                            index.apply_changes(pending)
+                        except sqlite3.Error as e:
+                            print(f"更新索引失败: {e}")
+                    self.changes.emit(pending)
+                    pending = []
+        finally:
+            backend.close()
+            if index is not None:
+                index.close()
+
+    def poll_now(self):
+        """要求立即检查一次变化"""
+        with QMutexLocker(self.mutex):
+            self.poll_requested = True
+
+    def cancel(self):
+        """请求停止监视"""
+        with QMutexLocker(self.mutex):
+            self.cancel_requested = True
+
+    def is_canceled(self):
+        """检查是否已请求停止"""
+        with QMutexLocker(self.mutex):
+            return self.cancel_requested
+
+
 class SearchWidget(QWidget, Ui_SearchWidget):
+    SEARCH_DELAY_MS = 250  # 条件停止变化多久后开始搜索
+    THUMBNAIL_PREFETCH_ROWS = 20  # 视口上下额外请求缩略图的行数
 
     def __init__(self):
         super().__init__()
@@ -348,8 +342,19 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         # 添加以下变量
         self.search_thread = None
         self.backup_thread = None  # 添加备份线程变量
+        self.folder_watcher = None  # 文件夹监视线程
+        self.content_index_thread = None  # PDF内容索引线程
+        self.thumbnail_requested = set()  # 已请求缩略图的PDF路径
+        self.thumbnail_failed = set()  # 生成缩略图失败的 (路径, 大小, 修改时间)，文件变化前不再重试
+        self.selection = SelectionStore()  # 树视图和列表视图共用的勾选状态
+        self.count_thread = None  # 统计未展开的勾选文件夹的线程
+        self.folder_counts = {}  # 未展开的勾选文件夹 -> (文件夹数, 文件数)
+        self.folder_counts_generation = 0  # 文件有变化时递增，丢弃过时的统计结果
         self.search_results = []
-        self.last_search_time = 0  # 防抖计时
+        self.retired_search_threads = []  # 已取消、尚未退出的搜索线程（保持引用直到结束）
+        self.last_search = None  # 上一次完成的搜索 {'paths', 'filters', 'results'}，缩小范围时复用
+        self.current_search_results = []  # 当前搜索已得到的全部结果
+        self.force_index_check = False  # 下次搜索时是否强制检查索引是否过期
         self.overwrite_all = False  # 保存时的覆盖选项
 
         # 添加取消搜索按钮
@@ -360,6 +365,7 @@ class SearchWidget(QWidget, Ui_SearchWidget):
 
         # 添加Excel数据存储变量
         self.excel_data = None
+        self.tag_matcher = None  # 由Excel各列的值构建，用于“任意值”筛选
         self.grouped_unique_first_col = []
         self.grouped_unique_second_col = []
         self.grouped_unique_third_col = []
@@ -368,6 +374,12 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         # 先创建基本UI元素，确保必要的控件存在
         self.create_basic_ui()
 
+        # 搜索调度：合并短时间内的多次条件变化
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.search_files)
+
         # 绑定基本事件
         self.bind_basic()
 
@@ -389,6 +401,33 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         # 添加自动备份复选框
         self.auto_backup_checkbox = QCheckBox("自动备份选中的文件夹")
 
+        # 搜索结果列表使用自定义模型，只为可见行生成显示内容
+        self.result_model = ResultListModel(self.get_result_icon, self.selection, self)
+        self.listView_results.setModel(self.result_model)
+        self.listView_results.setUniformItemSizes(True)
+
+        # PDF预览：按滚动位置按需渲染页面
+        self.pdf_loader = LazyPageLoader(self.scrollArea, self.verticalLayout, dpi=100, parent=self)
+
+        # 搜索结果的首页缩略图：后台生成并缓存到磁盘
+        self.thumbnail_worker = ThumbnailWorker(ThumbnailCache(thumbnail_cache_dir()), self)
+        self.thumbnail_worker.thumbnail_ready.connect(self.on_thumbnail_ready)
+        self.thumbnail_worker.thumbnail_failed.connect(self.on_thumbnail_failed)
+        self.thumbnail_worker.start()
+        QApplication.instance().aboutToQuit.connect(self.stop_thumbnail_worker)
+
+        # 只为列表视口内的PDF请求缩略图：滚动、视口大小变化或追加结果后重新计算（合并为一次更新）
+        self.thumbnail_timer = QTimer(self)
+        self.thumbnail_timer.setSingleShot(True)
+        self.thumbnail_timer.setInterval(50)
+        self.thumbnail_timer.timeout.connect(self.update_visible_thumbnails)
+        scroll_bar = self.listView_results.verticalScrollBar()
+        scroll_bar.valueChanged.connect(self.schedule_thumbnail_update)
+        scroll_bar.rangeChanged.connect(self.schedule_thumbnail_update)
+        self.result_model.rowsInserted.connect(self.schedule_thumbnail_update)
+        self.listView_results.viewport().installEventFilter(self)
+        QApplication.instance().aboutToQuit.connect(self.stop_background_threads)
+
     def bind_basic(self):
         """只绑定基本的事件，确保必要的功能可用"""
         self.btn_selectFolder.clicked.connect(self.select_folder)
@@ -396,16 +435,17 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         self.btn_open_excel_location.clicked.connect(self.open_excel_location)
 
         # 绑定列表项变化事件以更新按钮状态
-        self.listWidget.itemChanged.connect(self.on_list_selection_changed)
-        self.listWidget.customContextMenuRequested.connect(self.show_list_context_menu)
-        self.listWidget.itemClicked.connect(self.show_file_preview)
+        self.result_model.check_state_changed.connect(self.on_list_selection_changed)
+        self.listView_results.customContextMenuRequested.connect(self.show_list_context_menu)
+        self.listView_results.clicked.connect(self.show_file_preview)
 
     def delayed_init(self):
         """延迟初始化非关键UI组件"""
-        self.resetUi()
+        with span('startup.delayed_init'):
+            self.resetUi()
 
-        # 绑定剩余的事件
-        self.bind_remaining()
+            # 绑定剩余的事件
+            self.bind_remaining()
 
         # 初始化完成后触发一次搜索（如果有条件）
         if hasattr(self, 'current_paths') and self.current_paths:
@@ -416,15 +456,12 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         # 这里绑定所有其他事件
         self.category_combo.currentIndexChanged.connect(self.update_model_apn)
         self.treeView_folder.clicked.connect(self.treeView_folder_clicked)
-        self.lineEdit_search_input.textChanged.connect(self.search_files)
-        self.enable_time_filter_checkbox.toggled.connect(self.search_files)
-        self.start_date.dateChanged.connect(self.search_files)
-        self.end_date.dateChanged.connect(self.search_files)
         self.btn_select_all_list.clicked.connect(self.select_all_in_list)
         self.btn_deselect_all_list.clicked.connect(self.deselect_all_in_list)
         self.btn_refresh_folder.clicked.connect(self.refresh_selected_folders)
-        self.custom_filter_input.textChanged.connect(self.search_files)
+        self.enable_content_search_checkbox.toggled.connect(self.on_content_search_toggled)
 
+        # 筛选条件变化时只安排搜索，短时间内的连续变化合并为一次
         self.lineEdit_search_input.textChanged.connect(self.trigger_search)
         self.enable_time_filter_checkbox.toggled.connect(self.trigger_search)
         self.start_date.dateChanged.connect(self.trigger_search)
@@ -439,8 +476,8 @@ class SearchWidget(QWidget, Ui_SearchWidget):
 
         # 添加双击事件绑定
         self.treeView_folder.doubleClicked.connect(self.open_selected_file)
-        self.listWidget.itemDoubleClicked.connect(self.open_selected_file)
-        self.listWidget.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.listView_results.doubleClicked.connect(self.open_selected_file)
+        self.listView_results.setContextMenuPolicy(Qt.CustomContextMenu)
 
         # 绑定另存为按钮
         self.btn_save_as.clicked.connect(self.save_selected_files)
@@ -451,15 +488,13 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         self.enable_apn_checkbox.stateChanged.connect(self.trigger_search)
         self.enable_custom_filter_checkbox.stateChanged.connect(self.trigger_search)
 
-        # 下拉框和输入框变更时触发搜索
+        # 下拉框变更时触发搜索
         self.category_combo.currentIndexChanged.connect(self.trigger_search)
         self.model_combo.currentIndexChanged.connect(self.trigger_search)
         self.apn_combo.currentIndexChanged.connect(self.trigger_search)
-        self.custom_filter_input.textChanged.connect(self.trigger_search)
-
-        # 绑定全选和取消全选按钮
-        self.btn_select_all_list.clicked.connect(self.select_all_in_list)
-        self.btn_deselect_all_list.clicked.connect(self.deselect_all_in_list)
+        self.category_any_checkbox.toggled.connect(self.trigger_search)
+        self.model_any_checkbox.toggled.connect(self.trigger_search)
+        self.apn_any_checkbox.toggled.connect(self.trigger_search)
 
     def resetUi(self):
         self.treeView_folder.setEnabled(False)
@@ -482,11 +517,17 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         search_layout = QHBoxLayout()
         search_layout.addWidget(self.lineEdit_search_input)
 
+        # 搜索PDF内容（关键字匹配文档正文而不是文件名）
+        self.enable_content_search_checkbox = QCheckBox("搜索PDF内容")
+        self.enable_content_search_checkbox.setToolTip("在PDF正文中搜索关键字，结果按页显示")
+        search_layout.addWidget(self.enable_content_search_checkbox)
+
         # 创建取消搜索按钮
         self.btn_cancel_search = QPushButton("取消")
         self.btn_cancel_search.setEnabled(False)
         self.btn_cancel_search.setFixedSize(60, 30)
         search_layout.addWidget(self.btn_cancel_search)
+        self.btn_cancel_search.clicked.connect(self.cancel_search)
 
         # 将搜索布局添加到主布局
         main_layout.insertLayout(0, search_layout)
@@ -533,6 +574,13 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         self.enable_apn_checkbox = QCheckBox("APN")
         self.apn_combo = QComboBox()
 
+        # “任意值”：文件名包含Excel中该列的任意一个值即可
+        self.category_any_checkbox = QCheckBox("任意值")
+        self.model_any_checkbox = QCheckBox("任意值")
+        self.apn_any_checkbox = QCheckBox("任意值")
+        for any_checkbox in (self.category_any_checkbox, self.model_any_checkbox, self.apn_any_checkbox):
+            any_checkbox.setToolTip("匹配已加载Excel中该列的任意一个值")
+
         # 添加自定义属性筛选
         self.enable_custom_filter_checkbox = QCheckBox("自定义属性")
         self.custom_filter_input = QLineEdit()
@@ -577,16 +625,19 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         category_layout = QHBoxLayout()
         category_layout.addWidget(self.enable_category_checkbox)
         category_layout.addWidget(self.category_combo)
+        category_layout.addWidget(self.category_any_checkbox)
         property_layout.addLayout(category_layout)
 
         model_layout = QHBoxLayout()
         model_layout.addWidget(self.enable_model_checkbox)
         model_layout.addWidget(self.model_combo)
+        model_layout.addWidget(self.model_any_checkbox)
         property_layout.addLayout(model_layout)
 
         apn_layout = QHBoxLayout()
         apn_layout.addWidget(self.enable_apn_checkbox)
         apn_layout.addWidget(self.apn_combo)
+        apn_layout.addWidget(self.apn_any_checkbox)
         property_layout.addLayout(apn_layout)
 
         # 添加自定义筛选行
@@ -626,8 +677,8 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         main_layout.removeWidget(self.label_2)
         main_layout.insertWidget(6, self.label_2)
 
-        main_layout.removeWidget(self.listWidget)
-        main_layout.insertWidget(7, self.listWidget)
+        main_layout.removeWidget(self.listView_results)
+        main_layout.insertWidget(7, self.listView_results)
 
         # 7. 确保预览区域相关控件在底部
         # 获取 horizontalLayout_3 中的所有控件
@@ -662,7 +713,8 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         main_layout.insertLayout(8, preview_layout)
 
         # 设置列表支持复选框
-        self.listWidget.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.listView_results.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.listView_results.setIconSize(QSize(48, 48))  # 容纳PDF首页缩略图
 
         # 8. 添加预览区域
         main_layout.removeWidget(self.scrollArea)
@@ -685,26 +737,17 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         self.category_combo.currentIndexChanged.connect(self.update_model_apn)
         # self.btn_selectpdf.clicked.connect(self.select_pdf)
         self.treeView_folder.clicked.connect(self.treeView_folder_clicked)
-        self.lineEdit_search_input.textChanged.connect(self.search_files)
-        self.enable_time_filter_checkbox.toggled.connect(self.search_files)
-        self.start_date.dateChanged.connect(self.search_files)
-        self.end_date.dateChanged.connect(self.search_files)
         self.btn_select_all_list.clicked.connect(self.select_all_in_list)
         self.btn_deselect_all_list.clicked.connect(self.deselect_all_in_list)
         self.btn_refresh_folder.clicked.connect(self.refresh_selected_folders)
-        self.custom_filter_input.textChanged.connect(self.search_files)
 
+        # 筛选条件变化时只安排搜索，短时间内的连续变化合并为一次
         self.lineEdit_search_input.textChanged.connect(self.trigger_search)
         self.enable_time_filter_checkbox.toggled.connect(self.trigger_search)
         self.start_date.dateChanged.connect(self.trigger_search)
         self.end_date.dateChanged.connect(self.trigger_search)
         self.custom_filter_input.textChanged.connect(self.trigger_search)
 
-        # 绑定列表项变化事件以更新按钮状态
-        self.listWidget.itemChanged.connect(self.on_list_selection_changed)
-        self.listWidget.customContextMenuRequested.connect(self.show_list_context_menu)
-        self.listWidget.itemClicked.connect(self.show_file_preview)
-
         # treeView绑定右键点击事件
         self.treeView_folder.setContextMenuPolicy(Qt.CustomContextMenu)
         self.treeView_folder.customContextMenuRequested.connect(self.show_context_menu)
@@ -713,8 +756,8 @@ class SearchWidget(QWidget, Ui_SearchWidget):
 
         # 添加双击事件绑定
         self.treeView_folder.doubleClicked.connect(self.open_selected_file)
-        self.listWidget.itemDoubleClicked.connect(self.open_selected_file)
-        self.listWidget.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.listView_results.doubleClicked.connect(self.open_selected_file)
+        self.listView_results.setContextMenuPolicy(Qt.CustomContextMenu)
 
         # 绑定另存为按钮
         self.btn_save_as.clicked.connect(self.save_selected_files)
@@ -725,35 +768,30 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         self.enable_apn_checkbox.stateChanged.connect(self.trigger_search)
         self.enable_custom_filter_checkbox.stateChanged.connect(self.trigger_search)
 
-        # 下拉框和输入框变更时触发搜索
+        # 下拉框变更时触发搜索
         self.category_combo.currentIndexChanged.connect(self.trigger_search)
         self.model_combo.currentIndexChanged.connect(self.trigger_search)
         self.apn_combo.currentIndexChanged.connect(self.trigger_search)
-        self.custom_filter_input.textChanged.connect(self.trigger_search)
-
-        # 绑定全选和取消全选按钮
-        self.btn_select_all_list.clicked.connect(self.select_all_in_list)
-        self.btn_deselect_all_list.clicked.connect(self.deselect_all_in_list)
+        self.category_any_checkbox.toggled.connect(self.trigger_search)
+        self.model_any_checkbox.toggled.connect(self.trigger_search)
+        self.apn_any_checkbox.toggled.connect(self.trigger_search)
 
     def trigger_search(self):
-        """触发搜索的通用方法，确保所有条件变更都能正确触发搜索"""
-        # 添加防抖机制，避免快速连续触发
-        current_time = time.time()
-        if current_time - self.last_search_time < 0.1:
-            return
-        self.last_search_time = current_time
+        """安排一次搜索：条件停止变化 SEARCH_DELAY_MS 毫秒后才执行，期间的变化合并为一次"""
+        self.search_timer.start()
 
-        # 确保搜索在UI线程中执行
-        QApplication.processEvents()
-        self.search_files()
     # ----------- 菜单功能 Start -----------
 
     def cancel_search(self):
-        """取消当前搜索"""
+        """取消当前搜索（包括正在进行的PDF内容索引）"""
         if self.search_thread and self.search_thread.isRunning():
             self.search_thread.cancel()
             self.btn_cancel_search.setEnabled(False)
             self.label_status.setText("正在取消搜索...")
+        if self.content_index_thread and self.content_index_thread.isRunning():
+            self.content_index_thread.cancel()
+            self.btn_cancel_search.setEnabled(False)
+            self.label_status.setText("正在取消内容索引...")
 
     def show_context_menu(self, position):
         index = self.treeView_folder.indexAt(position)
@@ -824,98 +862,39 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         if not self.model:
             return
 
-        def find_and_set(parent_item):
-            for row in range(parent_item.rowCount()):
-                child_item = parent_item.child(row)
-                child_path = child_item.data(Qt.UserRole)
-                if child_path == path:
-                    child_item.setCheckState(Qt.Checked if selected else Qt.Unchecked)
-                    return True
-                if child_item.hasChildren():
-                    if find_and_set(child_item):
-                        return True
-            return False
-
-        for row in range(self.virtual_root.rowCount()):
-            root_item = self.virtual_root.child(row)
-            find_and_set(root_item)
+        item = self.model.find_item(path)
+        if item is not None:
+            item.setCheckState(Qt.Checked if selected else Qt.Unchecked)
     # 添加选择功能
     def select_all_in_tree(self):
         """全选树视图中的项"""
-        if not self.model:
-            return
-
-        def set_all_checked(parent_item, state):
-            for row in range(parent_item.rowCount()):
-                child_item = parent_item.child(row)
-                child_item.setCheckState(state)
-                if child_item.hasChildren():
-                    set_all_checked(child_item, state)
-
-        for row in range(self.virtual_root.rowCount()):
-            root_item = self.virtual_root.child(row)
-            set_all_checked(root_item, Qt.Checked)
+        self.set_all_checked_in_tree(True)
 
     def deselect_all_in_tree(self):
         """取消全选树视图中的项"""
+        self.set_all_checked_in_tree(False)
+
+    def set_all_checked_in_tree(self, checked):
+        """一次性设置树视图中所有已加载项的勾选状态，未加载的子项展开时继承"""
         if not self.model:
             return
 
-        def set_all_checked(parent_item, state):
-            for row in range(parent_item.rowCount()):
-                child_item = parent_item.child(row)
-                child_item.setCheckState(state)
-                if child_item.hasChildren():
-                    set_all_checked(child_item, state)
-
+        items = []
         for row in range(self.virtual_root.rowCount()):
             root_item = self.virtual_root.child(row)
-            set_all_checked(root_item, Qt.Unchecked)
-
-    def select_all_in_list(self):
-        """全选列表视图中的项"""
-        for i in range(self.listWidget.count()):
-            item = self.listWidget.item(i)
-            item.setCheckState(Qt.Checked)
-
-    def deselect_all_in_list(self):
-        """取消全选列表视图中的项"""
-        for i in range(self.listWidget.count()):
-            item = self.listWidget.item(i)
-            item.setCheckState(Qt.Unchecked)
+            items.extend(root_item.child(child_row) for child_row in range(root_item.rowCount()))
+        self.model.set_subtree_check_state(items, checked)
 
     # 添加新方法 update_save_button_state
     def update_save_button_state(self):
         """更新另存为按钮状态"""
-        has_selected = False
+        self.btn_save_as.setEnabled(self.selection.has_selection())
 
-        # 检查树视图是否有选中的项
-        if self.model:
-            # 使用栈进行非递归遍历
-            stack = []
-            for row in range(self.virtual_root.rowCount()):
-                stack.append(self.virtual_root.child(row))
-
-            while stack:
-                item = stack.pop()
-                if item.checkState() == Qt.Checked:
-                    has_selected = True
-                    break
-
-                # 添加子项到栈中
-                for row in range(item.rowCount()):
-                    stack.append(item.child(row))
-
-        # 检查列表视图是否有选中的项
-        if not has_selected:
-            for i in range(self.listWidget.count()):
-                item = self.listWidget.item(i)
-                if item.checkState() == Qt.Checked:
-                    has_selected = True
-                    break
+    def update_selection_status(self):
+        """勾选变化后更新另存为按钮和已选数量"""
+        self.update_save_button_state()
+        self.update_selected_count()
 
-        # 更新按钮状态
-        self.btn_save_as.setEnabled(has_selected)
     def copy_file_path(self, path):
         """复制文件路径到剪贴板"""
         clipboard = QApplication.clipboard()
@@ -1019,8 +998,8 @@ class SearchWidget(QWidget, Ui_SearchWidget):
     # 添加打开文件的方法
     def open_selected_file(self, item):
         """打开选中的文件"""
-        if isinstance(item, QListWidgetItem):  # 来自搜索结果列表
-            path = item.data(Qt.UserRole)
+        if isinstance(item, QModelIndex) and item.model() is self.result_model:  # 来自搜索结果列表
+            path = item.data(ResultListModel.PathRole)
         else:  # 来自树视图
             index = self.treeView_folder.currentIndex()
             if not index.isValid():
@@ -1039,19 +1018,11 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         if not self.model:
             return
 
-        # 找到对应的文件夹项
-        for row in range(self.virtual_root.rowCount()):
-            root_item = self.virtual_root.child(row)
-            if root_item.data(Qt.UserRole) == folder_path:
-                # 删除所有子项
-                root_item.removeRows(0, root_item.rowCount())
-                # 重新填充文件夹内容
-                self.populate_folder_tree(root_item, folder_path)
-                self.treeView_folder.expand(root_item.index())
-                break
-            else:
-                # 递归搜索子文件夹
-                self.refresh_folder_recursive(root_item, folder_path)
+        # 找到对应的文件夹项，重新列出其内容
+        item = self.model.find_item(folder_path)
+        if item is not None and os.path.isdir(folder_path):
+            self.model.reload(item)
+            self.treeView_folder.expand(item.index())
 
     def open_file(self, path):
         if not os.path.exists(path):
@@ -1075,27 +1046,6 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         except Exception as e:
             QMessageBox.critical(self, "打开失败", f"无法打开文件：\n{e}")
 
-    def refresh_folder_recursive(self, parent_item, folder_path):
-        """递归搜索并刷新文件夹"""
-        for row in range(parent_item.rowCount()):
-            child_item = parent_item.child(row)
-            child_path = child_item.data(Qt.UserRole)
-
-            if child_path == folder_path and os.path.isdir(child_path):
-                # 删除所有子项
-                child_item.removeRows(0, child_item.rowCount())
-                # 重新填充文件夹内容
-                self.populate_folder_tree(child_item, folder_path)
-                self.treeView_folder.expand(child_item.index())
-                return True
-
-            if os.path.isdir(child_path) and folder_path.startswith(child_path):
-                # 递归搜索子文件夹
-                if self.refresh_folder_recursive(child_item, folder_path):
-                    return True
-
-        return False
-
     # ----------- 菜单功能 End -----------
 
     # ----------- 拖拽上传功能 Start -----------
@@ -1166,39 +1116,19 @@ class SearchWidget(QWidget, Ui_SearchWidget):
             self.label_status.setText(f"已选择 {len(folders)} 个文件夹")
             self.lineEdit_path.setText(", ".join([os.path.basename(f) for f in folders]))
 
-            # 创建虚拟根模型来显示多个根节点
-            self.model = QStandardItemModel()
-            self.model.setHorizontalHeaderLabels(["文件夹"])
-
-            # 为每个选择的文件夹创建根节点
-            self.virtual_root = self.model.invisibleRootItem()
-            for folder in folders:
-                # 创建文件夹项 - 使用系统文件夹图标
-                root_item = QStandardItem(QApplication.style().standardIcon(QStyle.SP_DirIcon),
-                                          os.path.basename(folder))
-                root_item.setData(folder, Qt.UserRole)  # 存储完整路径
-                root_item.setEditable(False)
-                self.virtual_root.appendRow(root_item)
-
-                # 递归填充文件夹内容
-                self.populate_folder_tree(root_item, folder)
-
-            self.treeView_folder.setModel(self.model)
-            self.treeView_folder.setHeaderHidden(True)
-            self.treeView_folder.expandAll()
-            self.treeView_folder.setEnabled(True)
-
-            # 正确的信号连接方式 - 连接到模型而不是单个项
-            self.model.itemChanged.connect(self.on_tree_item_changed)  # 修改为新的处理方法
-            self.model.itemChanged.connect(self.update_save_button_state)
+            # 创建文件树（子文件夹展开时才列出内容），新文件夹从空的勾选状态开始
+            self.selection.clear()
+            self.build_folder_tree(folders)
 
             # 初始更新一次按钮状态
-            self.update_save_button_state()
-            self.update_selected_count()
+            self.update_selection_status()
 
-            # 初始更新一次按钮状态
-            self.update_save_button_state()
-            self.update_selected_count()
+            # 监视文件夹变化，之后的刷新只需处理变化部分
+            self.start_folder_watcher(folders)
+
+            # 开启了内容搜索时为新文件夹建立内容索引
+            if self.enable_content_search_checkbox.isChecked():
+                self.start_content_indexing()
 
             # 如果启用了自动备份，则启动备份
             if self.auto_backup_checkbox.isChecked():
@@ -1228,61 +1158,83 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         self.label_status.setText(error_message)
         QMessageBox.warning(self, "备份错误", error_message)
 
-    def populate_folder_tree(self, parent_item, folder_path):
-        """递归填充文件夹内容到树状视图"""
-        try:
-            # 获取文件夹内容并排序（先文件夹后文件）
-            entries = []
-            for entry in os.listdir(folder_path):
-                full_path = os.path.join(folder_path, entry)
-                if not entry.startswith('.'):  # 跳过隐藏文件
-                    entries.append((entry, full_path, os.path.isdir(full_path)))
-
-            # 排序：文件夹在前，文件在后
-            entries.sort(key=lambda x: (not x[2], x[0].lower()))
-
-            for entry, full_path, is_dir in entries:
-                if is_dir:
-                    # 添加文件夹项
-                    dir_item = QStandardItem(QApplication.style().standardIcon(QStyle.SP_DirIcon), entry)
-                    dir_item.setData(full_path, Qt.UserRole)
-                    dir_item.setEditable(False)
-                    dir_item.setCheckable(True)
-
-                    # 删除错误的连接方式
-                    # dir_item.dataChanged.connect(...)  # 这是错误的!
-
-                    parent_item.appendRow(dir_item)
-
-                    # 递归添加子文件夹（不立即展开）
-                    self.populate_folder_tree(dir_item, full_path)
-                else:
-                    # 添加文件项
-                    file_icon = self.get_file_icon(full_path)
-                    file_item = QStandardItem()
-                    file_item.setText(entry)
-                    file_item.setIcon(file_icon)
-                    file_item.setData(full_path, Qt.UserRole)
-                    file_item.setEditable(False)
-                    file_item.setCheckable(True)
-                    file_item.setCheckState(Qt.Unchecked)
-                    parent_item.appendRow(file_item)
-        except PermissionError:
-            # 创建无权限访问的提示项
-            error_item = QStandardItem(QApplication.style().standardIcon(QStyle.SP_MessageBoxWarning),
-                                       "无权限访问")
-            error_item.setData(folder_path, Qt.UserRole)
-            error_item.setEditable(False)
-            error_item.setEnabled(False)
-            parent_item.appendRow(error_item)
-        except Exception as e:
-            # 创建错误提示项
-            error_item = QStandardItem(QApplication.style().standardIcon(QStyle.SP_MessageBoxCritical),
-                                       f"错误: {str(e)}")
-            error_item.setData(folder_path, Qt.UserRole)
-            error_item.setEditable(False)
-            error_item.setEnabled(False)
-            parent_item.appendRow(error_item)
+    def build_folder_tree(self, folders):
+        """为选择的文件夹建立文件树，子文件夹在展开时才列出内容"""
+        self.reset_folder_counts()
+        # 创建虚拟根模型来显示多个根节点
+        self.model = FolderTreeModel(self.get_file_icon, self.selection, self)
+        self.model.setHorizontalHeaderLabels(["文件夹"])
+        self.virtual_root = self.model.invisibleRootItem()
+        for folder in folders:
+            self.model.add_root(folder)
+
+        self.treeView_folder.setModel(self.model)
+        self.treeView_folder.setHeaderHidden(True)
+        # 只展开根节点，其余文件夹由用户展开时加载
+        for row in range(self.virtual_root.rowCount()):
+            self.treeView_folder.expand(self.virtual_root.child(row).index())
+        self.treeView_folder.setEnabled(True)
+
+        # 正确的信号连接方式 - 连接到模型而不是单个项
+        self.model.itemChanged.connect(self.on_tree_item_changed)  # 修改为新的处理方法
+        self.model.itemChanged.connect(self.update_save_button_state)
+        self.model.check_states_changed.connect(self.on_tree_checks_changed)
+
+    # ----------- 文件夹监视功能 Start -----------
+
+    def start_folder_watcher(self, folders):
+        """启动文件夹监视线程，增量维护文件名索引和文件树"""
+        self.stop_folder_watcher()
+        self.folder_watcher = FolderWatcherThread(list(folders), index_db_path(), self)
+        self.folder_watcher.changes.connect(self.on_folder_changes)
+        self.folder_watcher.start()
+
+    def stop_folder_watcher(self):
+        """停止文件夹监视线程并等待其退出（线程每 0.2 秒检查一次取消请求）"""
+        if self.folder_watcher and self.folder_watcher.isRunning():
+            self.folder_watcher.changes.disconnect(self.on_folder_changes)
+            self.folder_watcher.cancel()
+            self.folder_watcher.wait(2000)
+        self.folder_watcher = None
+
+    def on_folder_changes(self, changes):
+        """把文件变化增量应用到文件树（只改动受影响的节点）"""
+        if not self.model:
+            return
+        self.last_search = None  # 文件有变化，上次的结果不能再直接复用
+        self.reset_folder_counts()
+
+        for change in changes:
+            change_type = change['type']
+            if change_type == 'rescan':
+                self.refresh_folder(change['path'])
+                continue
+
+            if change_type in ('deleted', 'moved'):
+                old_path = change['old_path'] if change_type == 'moved' else change['path']
+                self.selection.discard_subtree(old_path)
+                item = self.find_tree_item(old_path)
+                if item is not None and item.parent() is not None:
+                    item.parent().removeRow(item.row())
+
+            if change_type in ('created', 'moved'):
+                # 只插入已列出的文件夹；尚未展开的文件夹在展开时会列出新项
+                self.model.insert_path(change['path'], change['is_dir'])
+
+        self.label_status.setText(f"检测到 {len(changes)} 处文件变化")
+        self.update_selection_status()
+
+        # 重新搜索（防抖），让结果列表反映新增、删除和重命名的文件
+        if has_any_condition(self.current_filters()):
+            self.trigger_search()
+
+    def find_tree_item(self, path):
+        """通过路径索引查找文件树中已加载的项（未展开的文件夹不会被列出）"""
+        if not self.model:
+            return None
+        return self.model.find_item(path)
+
+    # ----------- 文件夹监视功能 End -----------
 
     def on_folder_checkstate_changed(self, state, path, item):
         """当文件夹勾选状态改变时，递归设置所有子项"""
@@ -1303,21 +1255,9 @@ class SearchWidget(QWidget, Ui_SearchWidget):
             self.recursive_operation = False
 
     def set_children_checkstate(self, parent_item, state):
-        """递归设置所有子项的勾选状态"""
-        for row in range(parent_item.rowCount()):
-            child_item = parent_item.child(row)
-            child_path = child_item.data(Qt.UserRole)
-
-            # 跳过无效项
-            if child_path is None:
-                continue
-
-            # 设置子项状态
-            child_item.setCheckState(state)
-
-            # 如果子项是文件夹，递归设置其子项
-            if child_item.hasChildren() and os.path.isdir(child_path):
-                self.set_children_checkstate(child_item, state)
+        """批量设置所有已加载子项的勾选状态（不逐项触发 itemChanged）"""
+        children = [parent_item.child(row) for row in range(parent_item.rowCount())]
+        self.model.set_subtree_check_state(children, state == Qt.Checked)
 
     def get_file_icon(self, file_path):
         """跨平台获取文件图标 - 优化缓存机制"""
@@ -1407,9 +1347,9 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         menu.addSeparator()
 
         # 添加"打开文件"选项
-        item = self.listWidget.itemAt(position)
-        if item:
-            path = item.data(Qt.UserRole)
+        index = self.listView_results.indexAt(position)
+        if index.isValid():
+            path = index.data(ResultListModel.PathRole)
             action_open = QAction("打开文件", self)
             action_open.triggered.connect(lambda: self.open_file(path))
             menu.addAction(action_open)
@@ -1419,13 +1359,13 @@ class SearchWidget(QWidget, Ui_SearchWidget):
             action_show_in_finder.triggered.connect(lambda: self.show_in_finder(path))
             menu.addAction(action_show_in_finder)
 
-        menu.exec(self.listWidget.viewport().mapToGlobal(position))
+        menu.exec(self.listView_results.viewport().mapToGlobal(position))
 
     def reset_time_filter(self):
         """重置为默认时间范围（过去7天）"""
         self.start_date.setDate(QDate.currentDate().addDays(-7))
         self.end_date.setDate(QDate.currentDate())
-        self.search_files()
+        self.trigger_search()
 
     # ----------- 搜索功能 Start -----------
 
@@ -1433,66 +1373,49 @@ class SearchWidget(QWidget, Ui_SearchWidget):
 
     def search_files(self):
         """使用后台线程进行文件搜索"""
-        # 如果已经有搜索在进行，取消它
+        self.search_timer.stop()  # 已在执行，取消尚未到时的调度
+
+        # 如果已经有搜索在进行，请求取消但不等待，线程退出前发出的信号会被忽略
         if self.search_thread and self.search_thread.isRunning():
             self.search_thread.cancel()
-            self.search_thread.wait(1000)  # 等待最多1秒
+            self.retired_search_threads.append(self.search_thread)
+        self.retired_search_threads = [thread for thread in self.retired_search_threads if thread.isRunning()]
+        self.search_thread = None
 
         # 清除当前结果
-        self.listWidget.clear()
+        self.result_model.clear()
         self.search_results = []
+        self.current_search_results = []
+        self.thumbnail_requested = set()
+        self.thumbnail_worker.set_jobs([])  # 上一次搜索的缩略图不再需要
 
         # 如果没有选择文件夹，则返回
         if not hasattr(self, 'current_paths') or not self.current_paths:
             self.btn_save_as.setEnabled(False)
+            self.btn_cancel_search.setEnabled(False)
             self.label_status.setText("请先选择文件夹")
             return
 
-        # 准备搜索条件
-        filters = {
-            'keyword': self.lineEdit_search_input.text().strip().lower(),
-            'category_enabled': self.enable_category_checkbox.isChecked(),
-            'category_value': self.category_combo.currentText().lower(),
-            'model_enabled': self.enable_model_checkbox.isChecked(),
-            'model_value': self.model_combo.currentText().lower(),
-            'apn_enabled': self.enable_apn_checkbox.isChecked(),
-            'apn_value': self.apn_combo.currentText().lower(),
-            'custom_enabled': self.enable_custom_filter_checkbox.isChecked(),
-            'custom_value': self.custom_filter_input.text().strip().lower(),
-            'time_enabled': self.enable_time_filter_checkbox.isChecked(),
-        }
-
-        # 时间筛选处理
-        if filters['time_enabled']:
-            start_date = self.start_date.date().toPython()
-            end_date = self.end_date.date().toPython()
-            filters['start_timestamp'] = int(
-                datetime(start_date.year, start_date.month, start_date.day).timestamp())
-            filters['end_timestamp'] = int(
-                datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59).timestamp())
-        else:
-            filters['start_timestamp'] = 0
-            filters['end_timestamp'] = 0
-
-        # 检查是否有任何有效的筛选条件
-        has_any_condition = (
-                bool(filters['keyword']) or
-                filters['category_enabled'] or
-                filters['model_enabled'] or
-                filters['apn_enabled'] or
-                filters['custom_enabled'] or
-                filters['time_enabled']
-        )
+        filters = self.current_filters()
 
         # 如果没有设置任何筛选条件，则清空结果
-        if not has_any_condition:
-            self.listWidget.clear()
+        if not has_any_condition(filters):
+            self.result_model.clear()
             self.btn_save_as.setEnabled(False)
+            self.btn_cancel_search.setEnabled(False)
             self.label_status.setText("请设置搜索条件")
             return
 
+        # 只是收窄了上次的条件（更长的关键字、新增属性筛选、更窄的时间范围）：直接在上次的结果中筛选
+        if not self.force_index_check and self.can_refine_last_search(filters):
+            self.refine_last_search(filters)
+            return
+
         # 创建并启动搜索线程
-        self.search_thread = FileSearchThread(self.current_paths, filters, self)
+        self.search_thread = FileSearchThread(self.current_paths, filters, index_db_path(),
+                                              self.force_index_check, self,
+                                              content_index_path=content_index_db_path())
+        self.force_index_check = False
         self.search_thread.found_file.connect(self.add_search_result)
         self.search_thread.progress.connect(self.update_search_progress)
         self.search_thread.finished.connect(self.on_search_finished)
@@ -1505,9 +1428,67 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         # 启动线程
         self.search_thread.start()
 
+    def current_filters(self):
+        """根据界面状态生成搜索条件（未勾选的条件传 None）"""
+        def value_if(checkbox, value):
+            return value if checkbox.isChecked() else None
+
+        # 勾选“任意值”时改为匹配Excel中该列的全部值
+        matcher = self.tag_matcher
+
+        def any_values(key, enable_checkbox, any_checkbox):
+            if matcher is None or not enable_checkbox.isChecked() or not any_checkbox.isChecked():
+                return None
+            return matcher.column_values(key)
+
+        time_enabled = self.enable_time_filter_checkbox.isChecked()
+        return make_filters(
+            keyword=self.lineEdit_search_input.text(),
+            category=value_if(self.enable_category_checkbox, self.category_combo.currentText()),
+            model=value_if(self.enable_model_checkbox, self.model_combo.currentText()),
+            apn=value_if(self.enable_apn_checkbox, self.apn_combo.currentText()),
+            custom=value_if(self.enable_custom_filter_checkbox, self.custom_filter_input.text()),
+            start_date=self.start_date.date().toPython() if time_enabled else None,
+            end_date=self.end_date.date().toPython() if time_enabled else None,
+            content=self.enable_content_search_checkbox.isChecked(),
+            category_any=any_values('category', self.enable_category_checkbox, self.category_any_checkbox),
+            model_any=any_values('model', self.enable_model_checkbox, self.model_any_checkbox),
+            apn_any=any_values('apn', self.enable_apn_checkbox, self.apn_any_checkbox),
+            tag_matcher=matcher,
+        )
+
+    def can_refine_last_search(self, filters):
+        """新条件是否只收窄了上次的条件（结果一定是上次结果的子集）"""
+        last = self.last_search
+        if last is None or last['paths'] != list(self.current_paths):
+            return False
+        return narrows(last['filters'], filters)
+
+    def refine_last_search(self, filters):
+        """在上次搜索的结果中按新条件筛选，不再遍历磁盘或查询索引"""
+        # 内容搜索的关键字已由内容索引匹配过，其余条件作用于文件名
+        predicate = compile_filters(dict(filters, keyword='') if filters['content_enabled'] else filters)
+        self.current_search_results = [file_info for file_info in self.last_search['results']
+                                       if predicate(file_info)]
+        self.search_results = list(self.current_search_results)
+        self.update_search_results_ui()
+        self.last_search = {'paths': list(self.current_paths), 'filters': filters,
+                            'results': self.current_search_results}
+
+        self.btn_cancel_search.setEnabled(False)
+        self.label_status.setText(f"搜索完成，找到 {self.result_model.rowCount()} 个结果（在上次结果中筛选）")
+        self.update_save_button_state()
+
+    def is_current_search(self):
+        """信号是否来自当前的搜索线程（已取消的线程在退出前仍可能发出信号）"""
+        return self.search_thread is not None and self.sender() is self.search_thread
+
     def add_search_result(self, file_info):
         """在搜索结果列表中添加一项（线程安全）"""
+        if not self.is_current_search():
+            return
         self.search_results.append(file_info)
+        self.current_search_results.append(file_info)
 
         # 每50个结果批量更新一次UI
         if len(self.search_results) % 50 == 0:
@@ -1515,46 +1496,93 @@ class SearchWidget(QWidget, Ui_SearchWidget):
 
     def update_search_results_ui(self):
         """批量更新搜索结果UI"""
-        # 禁用UI更新以提高性能
-        self.listWidget.setUpdatesEnabled(False)
-
-        # 添加新结果
-        for file_info in self.search_results:
-            path = file_info['path']
-            display_text = os.path.basename(path)
-
-            # 显示相对路径，使结果更清晰
-            for base_path in self.current_paths:
-                if path.startswith(base_path):
-                    rel_path = os.path.relpath(path, base_path)
-                    display_text = f"{os.path.basename(base_path)}/{rel_path}"
-                    break
-
-            item = QListWidgetItem(display_text)
-            item.setData(Qt.UserRole, path)  # 保存完整路径
-
-            # 设置文件图标
-            if file_info['is_dir']:
-                # 使用系统文件夹图标
-                item.setIcon(QApplication.style().standardIcon(QStyle.SP_DirIcon))
-            else:
-                file_icon = self.get_file_icon(path)
-                item.setIcon(file_icon)
+        # 一次性追加，显示文本和图标由模型在绘制时生成
+        with span('ui.insert', count=len(self.search_results)):
+            self.result_model.set_base_paths(self.current_paths)
+            self.result_model.append_results(self.search_results)
 
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(Qt.Unchecked)  # 初始状态为未选中
+        # 清空临时结果（PDF先显示通用图标，进入视口后再请求缩略图）
+        self.search_results = []
 
-            self.listWidget.addItem(item)
+    def eventFilter(self, watched, event):
+        if watched is self.listView_results.viewport() and event.type() == QEvent.Resize:
+            self.schedule_thumbnail_update()
+        return super().eventFilter(watched, event)
 
-        # 清空临时结果
-        self.search_results = []
+    def schedule_thumbnail_update(self, *args):
+        """在下一次计时到期时更新需要缩略图的行"""
+        self.thumbnail_timer.start()
 
-        # 启用UI更新
-        self.listWidget.setUpdatesEnabled(True)
-        self.listWidget.repaint()  # 强制重绘
+    def update_visible_thumbnails(self):
+        """为视口内（含预取行）还没有缩略图的PDF请求缩略图，移出视口的待处理任务直接丢弃"""
+        row_count = self.result_model.rowCount()
+        if not row_count:
+            self.thumbnail_worker.set_jobs([])
+            return
+
+        viewport = self.listView_results.viewport()
+        first = self.listView_results.indexAt(QPoint(0, 0)).row()
+        last = self.listView_results.indexAt(QPoint(0, viewport.height() - 1)).row()
+        first = max(first, 0)
+        last = row_count - 1 if last < 0 else last
+
+        # 可见行按从上到下的顺序优先，预取行排在其后
+        jobs = []
+        paths = set()
+        for row in range(max(first - self.THUMBNAIL_PREFETCH_ROWS, 0),
+                         min(last + 1 + self.THUMBNAIL_PREFETCH_ROWS, row_count)):
+            if self.result_model.is_dir(row) or self.result_model.has_thumbnail(row):
+                continue
+            path = self.result_model.path(row)
+            if not path.lower().endswith('.pdf') or path in paths:
+                continue
+            key = (path, self.result_model.size(row), self.result_model.mtime(row))
+            if key in self.thumbnail_failed:
+                continue
+            paths.add(path)
+            priority = (0 if first <= row <= last else 1, abs(row - first))
+            jobs.append((priority, key))
+        self.thumbnail_requested.update(paths)
+        self.thumbnail_worker.set_jobs(jobs)
+
+    def on_thumbnail_ready(self, path, thumb_path):
+        """缩略图生成后替换结果项的图标"""
+        if path in self.thumbnail_requested:
+            self.result_model.set_thumbnail(path, QIcon(thumb_path))
+
+    def on_thumbnail_failed(self, key):
+        """记住生成失败的缩略图，滚动时不再重复请求"""
+        self.thumbnail_failed.add(key)
+
+    def get_result_icon(self, path, is_dir):
+        """搜索结果的通用图标"""
+        if is_dir:
+            # 使用系统文件夹图标
+            return QApplication.style().standardIcon(QStyle.SP_DirIcon)
+        return self.get_file_icon(path)
+
+    def stop_thumbnail_worker(self):
+        """退出前结束缩略图线程"""
+        if self.thumbnail_worker.isRunning():
+            self.thumbnail_worker.stop()
+            self.thumbnail_worker.wait(2000)
+
+    def stop_background_threads(self):
+        """退出前停止搜索、内容索引和文件夹监视线程，避免线程仍在运行时被销毁"""
+        self.search_timer.stop()
+        self.stop_folder_watcher()
+        threads = [self.search_thread, self.content_index_thread, self.count_thread] + self.retired_search_threads
+        for thread in threads:
+            if thread is not None and thread.isRunning():
+                thread.cancel()
+        for thread in threads:
+            if thread is not None:
+                thread.wait(2000)
 
     def update_search_progress(self, processed, total):
         """更新搜索进度"""
+        if not self.is_current_search():
+            return
         if total > 0:
             percent = int(processed / total * 100)
             self.label_status.setText(f"搜索中... {processed}/{total} 文件 ({percent}%)")
@@ -1563,19 +1591,27 @@ class SearchWidget(QWidget, Ui_SearchWidget):
 
     def on_search_finished(self):
         """搜索完成处理"""
+        if not self.is_current_search():
+            return
         # 添加剩余结果
         if self.search_results:
             self.update_search_results_ui()
 
+        # 记录本次结果，下次只是追加关键字时直接在其中筛选
+        self.last_search = {'paths': list(self.current_paths), 'filters': self.search_thread.filters,
+                            'results': self.current_search_results}
+
         # 更新UI状态
         self.btn_cancel_search.setEnabled(False)
-        self.label_status.setText(f"搜索完成，找到 {self.listWidget.count()} 个结果")
+        self.label_status.setText(f"搜索完成，找到 {self.result_model.rowCount()} 个结果")
 
         # 更新按钮状态
         self.update_save_button_state()
 
     def on_search_canceled(self):
         """搜索取消处理"""
+        if not self.is_current_search():
+            return
         self.btn_cancel_search.setEnabled(False)
         self.label_status.setText("搜索已取消")
 
@@ -1584,79 +1620,75 @@ class SearchWidget(QWidget, Ui_SearchWidget):
 
     def select_all_in_list(self):
         """全选列表中的项"""
-        for i in range(self.listWidget.count()):
-            item = self.listWidget.item(i)
-            item.setCheckState(Qt.Checked)
+        self.set_all_checked_in_list(True)
 
     def deselect_all_in_list(self):
         """取消全选列表中的项"""
-        for i in range(self.listWidget.count()):
-            item = self.listWidget.item(i)
-            item.setCheckState(Qt.Unchecked)
+        self.set_all_checked_in_list(False)
+
+    def set_all_checked_in_list(self, checked):
+        """一次性设置所有结果的勾选状态，再同步到树视图"""
+        paths = self.result_model.set_all_checked(checked)
+        for path in paths:
+            self.selection.set_checked(path, self.result_model.is_dir_path(path), checked)
+        if self.model:
+            self.model.set_subtree_check_state([self.model.find_item(path) for path in paths], checked)
+        self.update_selection_status()
+
+    def on_content_search_toggled(self, checked):
+        """开启内容搜索时先确保内容索引已建立"""
+        if checked:
+            self.start_content_indexing()
+        self.trigger_search()
+
+    def start_content_indexing(self, force=False):
+        """在后台为已选择文件夹中的PDF建立内容索引"""
+        if not hasattr(self, 'current_paths') or not self.current_paths:
+            return
+        if self.content_index_thread and self.content_index_thread.isRunning():
+            if not force:
+                return
+            self.content_index_thread.cancel()
+            self.content_index_thread.wait(1000)
+
+        self.content_index_thread = ContentIndexThread(self.current_paths, content_index_db_path(), force, self)
+        self.content_index_thread.progress.connect(self.update_content_index_progress)
+        self.content_index_thread.finished.connect(self.on_content_index_finished)
+        self.content_index_thread.start()
+        self.btn_cancel_search.setEnabled(True)
+
+    def update_content_index_progress(self, processed, total):
+        """更新内容索引进度"""
+        if not (self.search_thread and self.search_thread.isRunning()):
+            self.label_status.setText(f"正在建立PDF内容索引... {processed}/{total}")
+
+    def on_content_index_finished(self, indexed):
+        """内容索引完成后重新搜索，显示新索引的文档"""
+        if self.content_index_thread and self.content_index_thread.is_canceled():
+            self.label_status.setText(f"PDF内容索引已取消，已处理 {indexed} 个文档")
+        else:
+            self.label_status.setText(f"PDF内容索引完成，新增 {indexed} 个文档")
+        if not (self.search_thread and self.search_thread.isRunning()):
+            self.btn_cancel_search.setEnabled(False)
+        if indexed and self.enable_content_search_checkbox.isChecked():
+            self.search_files()
 
     # ----------- 搜索功能 End -----------
 
     # 收集选中文件路径的方法
     def get_selected_files(self):
         """获取所有选中的文件路径（只包括明确勾选的文件）"""
-        selected_files = set()
+        selected_files = set(self.selection.checked_files())
 
-        # 收集树视图中选中的文件
-        if self.model:
-            # 使用栈进行非递归遍历
-            stack = []
-            for row in range(self.virtual_root.rowCount()):
-                stack.append(self.virtual_root.child(row))
-
-            while stack:
-                item = stack.pop()
-                path = item.data(Qt.UserRole)
-                state = item.checkState()
-
-                # 只处理被勾选的项
-                if state == Qt.Checked:
-                    if os.path.isfile(path):
-                        selected_files.add(path)
-                    elif os.path.isdir(path):
-                        # 递归收集文件夹中所有文件（但不包括未勾选的子项）
-                        self.collect_checked_files_from_folder(item, selected_files)
-
-                # 如果项是部分勾选（文件夹中有部分文件被取消勾选），继续检查其子项
-                elif state == Qt.PartiallyChecked or state == Qt.Unchecked:
-                    # 添加子项到栈中
-                    for row in range(item.rowCount()):
-                        stack.append(item.child(row))
-
-        # 收集列表视图中选中的文件
-        for i in range(self.listWidget.count()):
-            item = self.listWidget.item(i)
-            if item.checkState() == Qt.Checked:
-                path = item.data(Qt.UserRole)
-                if os.path.isfile(path):
-                    selected_files.add(path)
+        # 已展开的文件夹，其子项的勾选状态都已单独记录；
+        # 尚未展开的勾选文件夹，其下所有文件都视为勾选
+        for folder_path in self.selection.checked_dirs():
+            item = self.model.find_item(folder_path) if self.model else None
+            if item is None or not self.model.is_loaded(item):
+                selected_files.update(list_visible_files(folder_path))
 
         return list(selected_files)
 
-    def collect_checked_files_from_folder(self, parent_item, selected_files):
-        """递归收集文件夹中被勾选的文件"""
-        for row in range(parent_item.rowCount()):
-            child_item = parent_item.child(row)
-            child_path = child_item.data(Qt.UserRole)
-            state = child_item.checkState()
-
-            # 只处理被勾选的项
-            if state == Qt.Checked:
-                if os.path.isfile(child_path):
-                    selected_files.add(child_path)
-                elif os.path.isdir(child_path):
-                    # 递归收集子文件夹中被勾选的文件
-                    self.collect_checked_files_from_folder(child_item, selected_files)
-
-            # 如果子项是部分勾选（文件夹中有部分文件被取消勾选），继续检查其子项
-            elif state == Qt.PartiallyChecked:
-                # 递归收集子文件夹中被勾选的文件
-                self.collect_checked_files_from_folder(child_item, selected_files)
-
     def save_selected_files(self):
         selected_files = self.get_selected_files()
 
@@ -1674,74 +1706,12 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         if not save_dir:
             return  # 用户取消
 
-        # 分析文件选择模式
-        folder_selections = set()
-        individual_files = set()
-
-        # 收集所有被选中的文件夹
-        if self.model:
-            # 使用栈进行非递归遍历
-            stack = []
-            for row in range(self.virtual_root.rowCount()):
-                stack.append(self.virtual_root.child(row))
-
-            while stack:
-                item = stack.pop()
-                path = item.data(Qt.UserRole)
-                if os.path.isdir(path) and item.checkState() == Qt.Checked:
-                    folder_selections.add(path)
-
-                # 添加子项到栈中
-                for row in range(item.rowCount()):
-                    stack.append(item.child(row))
-
-        # 将文件分类：属于文件夹选择的 vs 单独选择的
-        for file_path in selected_files:
-            if os.path.isdir(file_path):
-                continue  # 跳过文件夹本身
-
-            # 检查文件是否属于某个被选中的文件夹
-            in_folder = False
-            norm_file_path = os.path.normcase(os.path.normpath(file_path))
-            for folder in folder_selections:
-                norm_folder = os.path.normcase(os.path.normpath(folder))
-                if norm_file_path.startswith(norm_folder + os.sep):
-                    in_folder = True
-                    break
-
-            if not in_folder:
-                individual_files.add(file_path)
+        # 选中文件夹下的文件保留原始结构，单独选择的文件直接保存到根目录
+        plan = plan_copy(selected_files, self.selection.checked_dirs(), save_dir)
 
         # 检查目标位置是否有同名文件
-        existing_files = []
-
-        # 处理文件夹选择 - 保留原始结构
-        for folder in folder_selections:
-            # 找出所有属于这个文件夹的文件
-            folder_files = [f for f in selected_files
-                            if os.path.commonprefix([f, folder]) == folder]
-
-            for file_path in folder_files:
-                # 计算相对于源文件夹的相对路径
-                rel_path = os.path.relpath(file_path, folder)
-                dest_path = os.path.join(save_dir, os.path.basename(folder), rel_path)
-                dest_dir = os.path.dirname(dest_path)
-
-                if os.path.exists(dest_path):
-                    existing_files.append(dest_path)
-
-        # 检查单独选择的文件
-        for file_path in individual_files:
-            # 获取文件名（不带路径）
-            file_name = os.path.basename(file_path)
-            dest_path = os.path.join(save_dir, file_name)
-
-            if os.path.exists(dest_path):
-                existing_files.append(dest_path)
-
-        # 初始化覆盖变量
-        overwrite_all = False
-        reply = QMessageBox.No  # 默认设置为不覆盖
+        existing_files = existing_targets(plan)
+        overwrite = False
 
         # 如果有重复文件，询问用户
         if existing_files:
@@ -1762,58 +1732,10 @@ class SearchWidget(QWidget, Ui_SearchWidget):
 
             if reply == QMessageBox.Cancel:
                 return  # 用户取消操作
-            elif reply == QMessageBox.YesToAll:
-                overwrite_all = True
-
-        # 复制文件，保持原始结构
-        success_count = 0
-        skipped_count = 0
-        error_files = []
-
-        # 处理文件夹选择 - 保留原始结构
-        for folder in folder_selections:
-            # 找出所有属于这个文件夹的文件
-            folder_files = [f for f in selected_files
-                            if os.path.commonprefix([f, folder]) == folder]
-
-            for file_path in folder_files:
-                # 计算相对于源文件夹的相对路径
-                rel_path = os.path.relpath(file_path, folder)
-                dest_path = os.path.join(save_dir, os.path.basename(folder), rel_path)
-                dest_dir = os.path.dirname(dest_path)
-
-                # 检查是否应该覆盖
-                if os.path.exists(dest_path) and not overwrite_all and not (reply == QMessageBox.Yes):
-                    skipped_count += 1
-                    continue
-
-                try:
-                    # 创建目标目录
-                    os.makedirs(dest_dir, exist_ok=True)
-
-                    # 复制文件
-                    shutil.copy2(file_path, dest_path)
-                    success_count += 1
-                except Exception as e:
-                    error_files.append(f"{os.path.basename(file_path)}: {str(e)}")
-
-        # 处理单独选择的文件 - 直接保存到根目录
-        for file_path in individual_files:
-            # 获取文件名（不带路径）
-            file_name = os.path.basename(file_path)
-            dest_path = os.path.join(save_dir, file_name)
+            overwrite = reply == QMessageBox.Yes
 
-            # 检查是否应该覆盖
-            if os.path.exists(dest_path) and not overwrite_all and not (reply == QMessageBox.Yes):
-                skipped_count += 1
-                continue
-
-            try:
-                # 直接复制文件（不创建子目录）
-                shutil.copy2(file_path, dest_path)
-                success_count += 1
-            except Exception as e:
-                error_files.append(f"{file_name}: {str(e)}")
+        # 复制文件
+        success_count, skipped_count, error_files = copy_selection(plan, overwrite)
 
         # 显示结果
         result_msg = f"已成功保存 {success_count} 个文件到:\n{save_dir}"
@@ -1859,23 +1781,17 @@ class SearchWidget(QWidget, Ui_SearchWidget):
 
     def show_file_preview(self, item):
         """显示文件预览"""
-        # 如果是QListWidgetItem，则从中获取完整路径；如果是字符串，则直接使用
-        if isinstance(item, QListWidgetItem):
-            path = item.data(Qt.UserRole)
+        # 如果是搜索结果的索引，则从中获取完整路径；如果是字符串，则直接使用
+        if isinstance(item, QModelIndex):
+            path = item.data(ResultListModel.PathRole)
         else:
             path = item  # 此时item应该是字符串路径
         if not path:
             return
 
-        # 在树视图中定位文件
+        # 在树视图中定位文件（依次加载途经的文件夹）
         if self.model:
-            # 递归搜索所有项
-            found = False
-            for row in range(self.virtual_root.rowCount()):
-                root_item = self.virtual_root.child(row)
-                found = self.locate_file_in_tree(root_item, path)
-                if found:
-                    break
+            self.locate_file_in_tree(path)
 
         # 预览文件
         _, ext = os.path.splitext(path)
@@ -1883,22 +1799,10 @@ class SearchWidget(QWidget, Ui_SearchWidget):
 
         try:
             if ext == ".pdf":
-                self.clear_pdf_pages()
-                doc = fitz.open(path)
+                # 只创建占位，页面随滚动按需渲染；内容搜索结果直接定位到命中的页
+                page = item.data(ResultListModel.PageRole) if isinstance(item, QModelIndex) else None
+                self.pdf_loader.load(path, self.zoom_factor, page or 0)
                 self.path_pdf = path
-
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    zoom = fitz.Matrix(self.zoom_factor, self.zoom_factor)
-                    pix = page.get_pixmap(matrix=zoom, dpi=100)
-                    image = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
-                    pixmap = QPixmap.fromImage(image)
-
-                    label = QLabel()
-                    label.setPixmap(pixmap)
-                    label.setAlignment(Qt.AlignCenter)
-                    label.setScaledContents(True)
-                    self.verticalLayout.addWidget(label)
         except Exception as e:
             print(f"预览错误: {e}")
 
@@ -1906,23 +1810,17 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         if not os.path.exists(path):
             QMessageBox.warning(self, "文件不存在", "该文件可能已被删除。")
             return
-    def locate_file_in_tree(self, parent_item, path):
+    def locate_file_in_tree(self, path):
         """在树视图中查找并定位文件"""
-        # 检查当前项
-        if parent_item.data(Qt.UserRole) == path:
-            index = parent_item.index()
-            self.treeView_folder.scrollTo(index)
-            self.treeView_folder.setCurrentIndex(index)
-            self.treeView_folder.expand(index.parent())
-            return True
-
-        # 递归检查子项
-        for row in range(parent_item.rowCount()):
-            child_item = parent_item.child(row)
-            if self.locate_file_in_tree(child_item, path):
-                return True
-
-        return False
+        item = self.model.find_item(path, load=True)
+        if item is None:
+            return False
+
+        index = item.index()
+        self.treeView_folder.scrollTo(index)
+        self.treeView_folder.setCurrentIndex(index)
+        self.treeView_folder.expand(index.parent())
+        return True
 
     def show_pdf_window(self, item):
         if getattr(self, 'path_pdf', None): #判断self.path_pdf是否定义
@@ -1933,109 +1831,116 @@ class SearchWidget(QWidget, Ui_SearchWidget):
 
     def clear_pdf_pages(self):
         """清除已有的页面"""
-        while self.verticalLayout.count():
-            child = self.verticalLayout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        self.pdf_loader.clear()
 
     # ----------- pdf预览功能 End -----------
 
     def sync_selection_between_views(self, path, checked):
         """同步树视图和列表视图的选择状态"""
-        # 同步到树视图
+        # 同步到树视图（通过路径索引直接找到项，文件夹连同已加载的子项一起设置）
         if self.model:
-            # 使用栈进行非递归遍历
-            stack = []
-            for row in range(self.virtual_root.rowCount()):
-                stack.append(self.virtual_root.child(row))
-
-            while stack:
-                item = stack.pop()
-                item_path = item.data(Qt.UserRole)
-                if item_path == path:
-                    # 更新树视图中的状态
-                    item.setCheckState(Qt.Checked if checked else Qt.Unchecked)
-                    break
-
-                # 添加子项到栈中
-                for row in range(item.rowCount()):
-                    stack.append(item.child(row))
-
-        # 同步到列表视图
-        for i in range(self.listWidget.count()):
-            item = self.listWidget.item(i)
-            if item.data(Qt.UserRole) == path:
-                item.setCheckState(Qt.Checked if checked else Qt.Unchecked)
-                break
+            self.model.set_subtree_check_state([self.model.find_item(path)], checked)
+
+        # 同步到列表视图（文件夹下尚未在树中列出的结果也一起更新）
+        self.result_model.set_checked(path, checked)
+        self.result_model.sync_checked_under([path], self.selection.is_included)
 
     # 添加新的处理方法
     def on_tree_item_changed(self, item):
         """当树视图中的项改变时（包括勾选状态）"""
         # 获取路径
         path = item.data(Qt.UserRole)
-        if path is None:
+        if path is None or not item.isCheckable():
             return
 
-        # 如果是文件夹项，则递归设置子项
-        if os.path.isdir(path) and not self.recursive_operation:
-            self.recursive_operation = True
-            try:
-                # 递归设置所有子项
-                self.set_children_checkstate(item, item.checkState())
-            finally:
-                self.recursive_operation = False
+        # 记录勾选状态
+        is_dir = self.model.is_dir_item(item)
+        checked = item.checkState() == Qt.Checked
+        self.selection.set_checked(path, is_dir, checked)
 
-        # 同步到列表视图（如果列表中有该项）
-        self.sync_selection_between_views(path, item.checkState() == Qt.Checked)
+        # 如果是文件夹项，则一次性设置所有已加载的子项
+        if is_dir:
+            self.set_children_checkstate(item, item.checkState())
 
-        # 更新保存按钮状态
-        self.update_save_button_state()
-        self.update_selected_count()
+        # 同步到列表视图（如果列表中有该项；文件夹下尚未在树中列出的结果也一起更新）
+        self.result_model.set_checked(path, checked)
+        if is_dir:
+            self.result_model.sync_checked_under([path], self.selection.is_included)
 
-    def on_list_selection_changed(self, item):
-        """列表视图选择状态变化时的处理"""
-        if item is None:
-            return
+        # 更新保存按钮状态
+        self.update_selection_status()
 
-        path = item.data(Qt.UserRole)
-        if path is None:
-            return
+    def on_tree_checks_changed(self, paths, checked):
+        """文件树批量勾选后，一次性同步到列表视图并更新统计"""
+        self.result_model.set_checked_paths(paths, checked)
+        self.result_model.sync_checked_under(paths, self.selection.is_included)
+        self.update_selection_status()
 
-        checked = item.checkState() == Qt.Checked
+    def on_list_selection_changed(self, path, checked):
+        """列表视图选择状态变化时的处理"""
+        self.selection.set_checked(path, self.result_model.is_dir_path(path), checked)
 
         # 同步到树视图
         self.sync_selection_between_views(path, checked)
 
         # 更新按钮状态
-        self.update_save_button_state()
-        self.update_selected_count()
+        self.update_selection_status()
 
     def update_selected_count(self):
-        """更新右下角状态标签显示已选择的文件夹和文件数量"""
-        folder_count = 0
-        file_count = 0
-
-        # 遍历树视图统计选择数量
-        if self.model and self.virtual_root:
-            stack = []
-            for row in range(self.virtual_root.rowCount()):
-                stack.append(self.virtual_root.child(row))
-
-            while stack:
-                item = stack.pop()
-                if item.checkState() == Qt.Checked:
-                    path = item.data(Qt.UserRole)
-                    if os.path.isdir(path):
-                        folder_count += 1
-                    else:
-                        file_count += 1
+        """更新右下角状态标签显示已选择的文件夹和文件数量
+
+        尚未展开的勾选文件夹，其下的文件在后台统计；统计完成前显示为“≥N”。
+        """
+        folders = self.unloaded_checked_folders()
+        if not folders:
+            self.label_status.setText(
+                f"已选择: {self.selection.folder_count}个文件夹, {self.selection.file_count}个文件")
+            return
+
+        # 单独记录的勾选项中，位于未展开文件夹下的已包含在该文件夹的统计中
+        prefixes = tuple(folder.rstrip(os.sep) + os.sep for folder in folders)
+        folder_count = sum(1 for path in self.selection.checked_dirs() if not path.startswith(prefixes))
+        file_count = sum(1 for path in self.selection.checked_files() if not path.startswith(prefixes))
+        missing = []
+        for folder in folders:
+            counts = self.folder_counts.get(folder)
+            if counts is None:
+                missing.append(folder)
+            else:
+                folder_count += counts[0]
+                file_count += counts[1]
 
-                # 添加子项到栈中
-                for row in range(item.rowCount()):
-                    stack.append(item.child(row))
+        if not missing:
+            self.label_status.setText(f"已选择: {folder_count}个文件夹, {file_count}个文件")
+            return
+        self.label_status.setText(f"已选择: ≥{folder_count}个文件夹, ≥{file_count}个文件（统计中...）")
+        # 同一时间只运行一个统计线程，完成后再为仍缺少的文件夹启动下一个
+        if self.count_thread is None or not self.count_thread.isRunning():
+            self.count_thread = SelectionCountThread(missing, self.folder_counts_generation, self)
+            self.count_thread.counted.connect(self.on_selection_counted)
+            self.count_thread.start()
+
+    def unloaded_checked_folders(self):
+        """勾选但尚未展开的最外层文件夹（复制时会包含其下所有文件）"""
+        unloaded = set()
+        for folder_path in self.selection.checked_dirs():
+            item = self.model.find_item(folder_path) if self.model else None
+            if item is None or not self.model.is_loaded(item):
+                unloaded.add(folder_path)
+        return [folder for folder in unloaded
+                if not any(parent in unloaded for parent in SelectionStore.ancestors(folder))]
+
+    def on_selection_counted(self, generation, counts):
+        """后台统计完成，更新数量显示"""
+        if generation != self.folder_counts_generation:
+            return  # 统计期间文件有变化
+        self.folder_counts.update(counts)
+        self.update_selected_count()
 
-        # 更新状态标签
-        self.label_status.setText(f"已选择: {folder_count}个文件夹, {file_count}个文件")
+    def reset_folder_counts(self):
+        """文件有变化时丢弃已统计的文件夹数量"""
+        self.folder_counts = {}
+        self.folder_counts_generation += 1
 
 
     # 添加Excel处理方法
@@ -2057,77 +1962,21 @@ class SearchWidget(QWidget, Ui_SearchWidget):
 
     def excel_read_multiple(self, excel_paths):
         """读取多个Excel文件并合并属性，提供详细的处理结果反馈"""
-        all_dfs = []
-        success_files = []  # 成功读取的文件
-        failed_files = []  # 读取失败的文件及其原因
-
-        for excel_path in excel_paths:
-            try:
-                # 尝试读取Excel文件
-                df = pd.read_excel(excel_path)
-
-                # 检查是否包含必要的列
-                desired_columns = ['Material Category', 'Material Model', 'APN']
-                missing_columns = [col for col in desired_columns if col not in df.columns]
-
-                if missing_columns:
-                    failed_files.append((os.path.basename(excel_path),
-                                         f"缺少必要列: {', '.join(missing_columns)}"))
-                    continue
-
-                all_dfs.append(df)
-                success_files.append(os.path.basename(excel_path))
-
-            except Exception as e:
-                failed_files.append((os.path.basename(excel_path), f"读取错误: {str(e)}"))
-                continue
+        try:
+            tags, success_files, failed_files = load_excel_tags(excel_paths)
+        except Exception as e:
+            QMessageBox.critical(self, "错误", f"合并Excel数据失败: {e}")
+            return
 
         # 如果没有成功读取任何文件，则显示错误
-        if not all_dfs:
+        if tags is None:
             error_msg = "未能成功读取任何Excel文件:\n"
             for filename, reason in failed_files:
                 error_msg += f"- {filename}: {reason}\n"
             QMessageBox.critical(self, "错误", error_msg)
             return
 
-        # 合并所有DataFrame
-        try:
-            combined_df = pd.concat(all_dfs, ignore_index=True)
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"合并Excel数据失败: {e}")
-            return
-
-        # 指定需要保留的列名
-        desired_columns = ['Material Category', 'Material Model', 'APN']
-        existing_columns = [col for col in desired_columns if col in combined_df.columns]
-
-        # 前向填充NaN
-        combined_df = combined_df[existing_columns].ffill()
-
-        # 存储数据用于搜索
-        self.excel_data = combined_df
-
-        # 将数据分组存储（用于下拉框）
-        self.grouped_unique_first_col = combined_df[existing_columns[0]].unique().tolist()
-        self.grouped_unique_second_col = []
-        self.grouped_unique_third_col = []
-
-        # 按第一列分组，获取第二列和第三列的唯一值
-        grouped = combined_df.groupby(existing_columns[0])
-        for name, group in grouped:
-            # 第二列的唯一值
-            unique_second = group[existing_columns[1]].unique().tolist()
-            self.grouped_unique_second_col.append(unique_second)
-            # 第三列的唯一值
-            unique_third = group[existing_columns[2]].unique().tolist()
-            self.grouped_unique_third_col.append(unique_third)
-
-        # 更新下拉框
-        self.category_combo.clear()
-        self.category_combo.addItems(self.grouped_unique_first_col)
-
-        # 更新后两个下拉框（根据当前选中的第一列）
-        self.update_model_apn()
+        self.apply_excel_tags(tags)
 
         # 显示处理结果摘要
         result_msg = f"成功读取 {len(success_files)} 个文件:\n"
@@ -2142,47 +1991,34 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         QMessageBox.information(self, "Excel文件处理结果", result_msg)
 
         # 在更新下拉框后触发搜索
-        self.search_files()
+        self.trigger_search()
 
     def excel_read(self, excel_path):
         """读取Excel文件并更新下拉框选项"""
         try:
-            # 尝试读取Excel文件
-            df = pd.read_excel(excel_path)
+            tags, _, failed_files = load_excel_tags([excel_path])
         except Exception as e:
             QMessageBox.critical(self, "错误", f"读取Excel文件失败: {e}")
             return
 
-        # 指定需要保留的列名
-        desired_columns = ['Material Category', 'Material Model', 'APN']
-        # 筛选出存在的列
-        existing_columns = [col for col in desired_columns if col in df.columns]
-
-        # 如果不存在这三列，则提示错误
-        if len(existing_columns) < 3:
-            QMessageBox.critical(self, "错误", "Excel文件中缺少必要的列")
+        if tags is None:
+            QMessageBox.critical(self, "错误", f"读取Excel文件失败: {failed_files[0][1]}")
             return
 
-        # 前向填充NaN
-        df = df[existing_columns].ffill()
+        self.apply_excel_tags(tags)
+        # 在更新下拉框后触发搜索
+        self.trigger_search()
 
+    def apply_excel_tags(self, tags):
+        """保存读取的属性表并更新下拉框"""
         # 存储数据用于搜索
-        self.excel_data = df
+        self.excel_data = tags.data
+        self.tag_matcher = tags.matcher
 
         # 将数据分组存储（用于下拉框）
-        self.grouped_unique_first_col = df[existing_columns[0]].unique().tolist()
-        self.grouped_unique_second_col = []
-        self.grouped_unique_third_col = []
-
-        # 按第一列分组，获取第二列和第三列的唯一值
-        grouped = df.groupby(existing_columns[0])
-        for name, group in grouped:
-            # 第二列的唯一值
-            unique_second = group[existing_columns[1]].unique().tolist()
-            self.grouped_unique_second_col.append(unique_second)
-            # 第三列的唯一值
-            unique_third = group[existing_columns[2]].unique().tolist()
-            self.grouped_unique_third_col.append(unique_third)
+        self.grouped_unique_first_col = tags.categories
+        self.grouped_unique_second_col = tags.models
+        self.grouped_unique_third_col = tags.apns
 
         # 更新下拉框
         self.category_combo.clear()
@@ -2190,8 +2026,6 @@ class SearchWidget(QWidget, Ui_SearchWidget):
 
         # 更新后两个下拉框（根据当前选中的第一列）
         self.update_model_apn()
-        # 在更新下拉框后触发搜索
-        self.search_files()
 
     # 添加打开Excel位置的方法
     def open_excel_location(self):
@@ -2229,11 +2063,23 @@ class SearchWidget(QWidget, Ui_SearchWidget):
         self.apn_combo.setEnabled(self.enable_apn_checkbox.isChecked())
 
         # 更新后触发搜索
-        self.search_files()
+        self.trigger_search()
 
     # 修改 refresh_selected_folders 方法
     def refresh_selected_folders(self):
         """刷新已选择的文件夹树"""
+        if self.folder_watcher and self.folder_watcher.isRunning():
+            # 监视线程已在增量维护索引和文件树，只需立即检查一次变化
+            self.folder_watcher.poll_now()
+            self.label_status.setText(f"已刷新 {len(self.current_paths)} 个文件夹")
+            if self.enable_content_search_checkbox.isChecked():
+                self.start_content_indexing()
+            # 条件未变，必须丢弃上次结果并强制检查索引，否则只会在旧结果中重新筛选
+            self.force_index_check = True
+            self.last_search = None
+            self.search_files()
+            return
+
         if hasattr(self, 'current_paths') and self.current_paths:
             # 保存当前路径
             current_paths = self.current_paths.copy()
@@ -2244,22 +2090,7 @@ class SearchWidget(QWidget, Ui_SearchWidget):
             self.label_status.setText(f"已刷新 {len(current_paths)} 个文件夹")
 
             # 重新构建文件树
-            self.model = QStandardItemModel()
-            self.model.setHorizontalHeaderLabels(["文件夹"])
-            self.virtual_root = self.model.invisibleRootItem()
-
-            for folder in current_paths:
-                root_item = QStandardItem(QApplication.style().standardIcon(QStyle.SP_DirIcon),
-                                          os.path.basename(folder))
-                root_item.setData(folder, Qt.UserRole)
-                root_item.setEditable(False)
-                self.virtual_root.appendRow(root_item)
-                self.populate_folder_tree(root_item, folder)
-
-            self.treeView_folder.setModel(self.model)
-            self.treeView_folder.setHeaderHidden(True)
-            self.treeView_folder.expandAll()
-            self.treeView_folder.setEnabled(True)
+            self.build_folder_tree(current_paths)
 
             # 重新绑定事件
             try:
@@ -2268,11 +2099,15 @@ class SearchWidget(QWidget, Ui_SearchWidget):
                 pass  # 忽略没有连接的错误
             self.treeView_folder.clicked.connect(self.treeView_folder_clicked)
 
-            # 使用正确的信号连接方式
-            # 正确的信号连接方式
-            self.model.itemChanged.connect(self.on_tree_item_changed)  # 修改为新的处理方法
-            self.model.itemChanged.connect(self.update_save_button_state)
-
             # 初始更新一次按钮状态
-            self.update_save_button_state()
-            self.update_selected_count()
+            self.update_selection_status()
+
+            # 重新启动文件夹监视
+            self.start_folder_watcher(current_paths)
+            if self.enable_content_search_checkbox.isChecked():
+                self.start_content_indexing()
+
+            # 刷新后强制检查文件名索引并重新搜索
+            self.force_index_check = True
+            self.last_search = None
+            self.search_files()
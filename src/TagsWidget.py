@@ -1,9 +1,7 @@
 import sys
 
-import pandas as pd
 from PySide6.QtCore import QStandardPaths
 from PySide6.QtWidgets import QWidget, QApplication, QFileDialog, QComboBox, QHBoxLayout, QLabel
-from openpyxl import load_workbook
 
 from model.ExcelModel import ExcelModel
 from ui.TagsWidgetUI import Ui_TagsWidget
@@ -77,6 +75,8 @@ class TagsWidget(QWidget, Ui_TagsWidget):
         #     for cell in row:
         #         print(cell.value)
 
+        import pandas as pd  # 只在读取 Excel 时才需要，避免拖慢启动
+
         try:
             df = pd.read_excel(excel_path)
         except Exception as e:
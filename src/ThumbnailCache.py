@@ -0,0 +1,86 @@
+import hashlib
+import os
+import threading
+
+
+def default_budget():
+    """默认磁盘上限（字节）：环境变量 PDFSEARCH_THUMBNAIL_CACHE_MB，否则 200MB"""
+    try:
+        megabytes = float(os.environ.get('PDFSEARCH_THUMBNAIL_CACHE_MB', 200))
+    except ValueError:
+        megabytes = 200
+    return int(megabytes * 1024 * 1024)
+
+
+class ThumbnailCache:
+    """首页缩略图的磁盘缓存
+
+    每个缩略图是一个 PNG 文件，文件名由 (路径, 大小, 修改时间) 哈希得到，
+    文件变化后自然对应新的缓存项；命中时更新缓存文件的修改时间作为最近使用时间，
+    总大小超过上限时按最近使用时间淘汰。
+    """
+
+    def __init__(self, cache_dir, max_bytes=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes or default_budget()
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.total_bytes = sum(size for _, _, size in self.cached_files())
+
+    def thumbnail_path(self, path, size, mtime):
+        """缩略图文件路径"""
+        key = f"{path}\0{size}\0{mtime}".encode('utf-8', 'surrogatepass')
+        return os.path.join(self.cache_dir, hashlib.blake2b(key, digest_size=16).hexdigest() + '.png')
+
+    def lookup(self, path, size, mtime):
+        """查找缩略图，命中时返回缓存文件路径"""
+        thumb_path = self.thumbnail_path(path, size, mtime)
+        try:
+            os.utime(thumb_path)
+        except OSError:
+            return None
+        return thumb_path
+
+    def store(self, path, size, mtime, data):
+        """写入缩略图（PNG 数据），返回缓存文件路径"""
+        thumb_path = self.thumbnail_path(path, size, mtime)
+        temp_path = f"{thumb_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, thumb_path)
+
+        with self.lock:
+            self.total_bytes += len(data)
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+        return thumb_path
+
+    def cached_files(self):
+        """列出缓存文件 [(路径, 最近使用时间, 大小), ...]"""
+        files = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.png'):
+                        try:
+                            stat_info = entry.stat()
+                        except OSError:
+                            continue
+                        files.append((entry.path, stat_info.st_mtime, stat_info.st_size))
+        except OSError:
+            pass
+        return files
+
+    def evict(self):
+        """按最近使用时间淘汰，直到总大小降到上限的 80%"""
+        files = sorted(self.cached_files(), key=lambda item: item[1])
+        self.total_bytes = sum(size for _, _, size in files)
+        target = self.max_bytes * 0.8
+        for thumb_path, _, size in files:
+            if self.total_bytes <= target:
+                break
+            try:
+                os.remove(thumb_path)
+            except OSError:
+                continue
+            self.total_bytes -= size
@@ -0,0 +1,16 @@
+from core.ContentIndex import ContentIndex
+
+
+def test_change_within_float_precision_is_detected(tmp_path):
+    path = str(tmp_path / 'a.pdf')
+    mtime_ns = 1700000000 * 10 ** 9
+    index = ContentIndex(str(tmp_path / 'content.sqlite3'))
+    try:
+        index.add_document_tokens(path, [{'abc'}], (100, mtime_ns, None))
+        index.commit()
+        assert index.plan_update([str(tmp_path)], {path: (100, mtime_ns)}) == []
+        # 相差 1 纳秒时浮点秒数相同，大小也相同
+        assert float(mtime_ns + 1) / 1e9 == float(mtime_ns) / 1e9
+        assert index.plan_update([str(tmp_path)], {path: (100, mtime_ns + 1)}) == [path]
+    finally:
+        index.close()
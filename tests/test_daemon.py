@@ -0,0 +1,59 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from core.Daemon import SearchService, make_server, remote_search
+from core.Search import make_filters
+
+
+@pytest.fixture
+def server(tmp_path):
+    root = tmp_path / 'r'
+    root.mkdir()
+    (root / 'datasheet.pdf').write_text('')
+    server = make_server(SearchService(str(tmp_path / 'index.sqlite3')), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.root = str(root)
+    server.address = f'http://127.0.0.1:{server.server_port}'
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def post(server, request):
+    """发送 POST /search，返回 (状态码, JSON 内容)"""
+    data = json.dumps(request).encode('utf-8')
+    try:
+        with urllib.request.urlopen(server.address + '/search', data=data, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_empty_filters_are_rejected(server):
+    status, body = post(server, {'roots': [server.root], 'filters': {}})
+    assert status == 400
+    assert 'error' in body
+
+
+def test_roots_must_be_a_list_of_absolute_paths(server):
+    for roots in (server.root, ['relative/path'], [1], []):
+        status, body = post(server, {'roots': roots, 'filters': {'keyword': 'datasheet'}})
+        assert status == 400, roots
+        assert 'error' in body
+
+
+def test_unknown_or_mistyped_filters_are_rejected(server):
+    for filters in ({'keyword': 1}, {'keyword': 'x', 'apn_any': 'abc'}, {'no_such_key': True}):
+        status, body = post(server, {'roots': [server.root], 'filters': filters})
+        assert status == 400, filters
+
+
+def test_remote_search_waits_for_cold_build(server):
+    results = remote_search(server.address, [server.root], make_filters(keyword='datasheet'))
+    assert [info['name'] for info in results] == ['datasheet.pdf']
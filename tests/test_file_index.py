@@ -0,0 +1,56 @@
+import os
+
+from core.FileIndex import FileIndex
+
+
+def make_tree(base):
+    """/r 下共 5 个文件，其中 2 个在子目录 a 中"""
+    (base / 'a').mkdir()
+    for name in ('x.pdf', 'y.pdf', 'z.pdf'):
+        (base / name).write_text('')
+    for name in ('a1.pdf', 'a2.pdf'):
+        (base / 'a' / name).write_text('')
+
+
+def file_names(index, root):
+    return sorted(info['name'] for info in index.query(root, {}) if not info['is_dir'])
+
+
+def test_nested_roots_do_not_overwrite_each_other(tmp_path):
+    root = tmp_path / 'r'
+    root.mkdir()
+    make_tree(root)
+    index = FileIndex(str(tmp_path / 'index.sqlite3'))
+    try:
+        index.ensure_fresh(str(root))
+        index.ensure_fresh(str(root / 'a'))
+        assert file_names(index, str(root)) == ['a1.pdf', 'a2.pdf', 'x.pdf', 'y.pdf', 'z.pdf']
+        assert file_names(index, str(root / 'a')) == ['a1.pdf', 'a2.pdf']
+
+        # 末尾带分隔符的写法指向同一份索引
+        assert file_names(index, str(root) + os.sep) == file_names(index, str(root))
+    finally:
+        index.close()
+
+
+def test_changes_apply_to_every_containing_root(tmp_path):
+    root = tmp_path / 'r'
+    root.mkdir()
+    make_tree(root)
+    index = FileIndex(str(tmp_path / 'index.sqlite3'))
+    try:
+        index.ensure_fresh(str(root))
+        index.ensure_fresh(str(root / 'a'))
+
+        new_file = root / 'a' / 'a3.pdf'
+        new_file.write_text('')
+        os.remove(root / 'a' / 'a1.pdf')
+        index.apply_changes([
+            {'type': 'created', 'path': str(new_file), 'old_path': None, 'is_dir': False, 'root': str(root)},
+            {'type': 'deleted', 'path': str(root / 'a' / 'a1.pdf'), 'old_path': None, 'is_dir': False,
+             'root': str(root)},
+        ])
+        assert file_names(index, str(root)) == ['a2.pdf', 'a3.pdf', 'x.pdf', 'y.pdf', 'z.pdf']
+        assert file_names(index, str(root / 'a')) == ['a2.pdf', 'a3.pdf']
+    finally:
+        index.close()
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+pytest.importorskip('PySide6')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from model.FolderTreeModel import FolderTreeModel  # noqa: E402
+from model.SelectionStore import SelectionStore  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def child_names(item):
+    return [item.child(row).text() for row in range(item.rowCount())]
+
+
+def touch(path):
+    open(path, 'w').close()
+
+
+def test_two_created_files_in_same_folder(app, tmp_path):
+    (tmp_path / 'sub').mkdir()
+    touch(tmp_path / 'c.pdf')
+    model = FolderTreeModel(selection=SelectionStore())
+    root_item = model.add_root(str(tmp_path))
+
+    for name in ('b.pdf', 'a.pdf'):
+        touch(tmp_path / name)
+        assert model.insert_path(str(tmp_path / name), False) is not None
+
+    assert all(root_item.child(row) is not None for row in range(root_item.rowCount()))
+    assert child_names(root_item) == ['sub', 'a.pdf', 'b.pdf', 'c.pdf']
+    assert model.find_item(str(tmp_path / 'a.pdf')).text() == 'a.pdf'
+
+
+def test_created_file_in_unloaded_folder_is_listed_once(app, tmp_path):
+    sub = tmp_path / 'sub'
+    sub.mkdir()
+    touch(sub / 'b.pdf')
+    model = FolderTreeModel(selection=SelectionStore())
+    model.add_root(str(tmp_path))
+    sub_item = model.find_item(str(sub))
+    assert not model.is_loaded(sub_item)
+
+    touch(sub / 'a.pdf')
+    assert model.insert_path(str(sub / 'a.pdf'), False) is None
+
+    model.fetchMore(sub_item.index())
+    assert child_names(sub_item) == ['a.pdf', 'b.pdf']
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+pytest.importorskip('PySide6')
+
+from model.ResultListModel import ResultListModel  # noqa: E402
+from model.SelectionStore import SelectionStore  # noqa: E402
+
+
+def file_info(path, is_dir=False):
+    return {'path': path, 'is_dir': is_dir, 'mtime': 0, 'size': 0}
+
+
+def test_results_under_checked_unloaded_folder_are_checked():
+    folder = os.path.join(os.sep, 'data', 'a')
+    inside = os.path.join(folder, 'deep', 'x.pdf')
+    outside = os.path.join(os.sep, 'data', 'b', 'y.pdf')
+    selection = SelectionStore()
+    model = ResultListModel(selection=selection)
+
+    # 搜索时文件夹已经勾选
+    selection.set_checked(folder, True, True)
+    model.append_results([file_info(inside), file_info(outside)])
+    assert [model.is_checked(row) for row in range(2)] == [True, False]
+
+    # 之后取消、再勾选该文件夹
+    selection.set_checked(folder, True, False)
+    model.sync_checked_under([folder], selection.is_included)
+    assert [model.is_checked(row) for row in range(2)] == [False, False]
+    selection.set_checked(folder, True, True)
+    model.sync_checked_under([folder], selection.is_included)
+    assert [model.is_checked(row) for row in range(2)] == [True, False]
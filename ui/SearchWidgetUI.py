@@ -16,9 +16,9 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
 from PySide6.QtWidgets import (QApplication, QGridLayout, QHBoxLayout, QHeaderView,
-    QLabel, QLineEdit, QListWidget, QListWidgetItem,
-    QPushButton, QScrollArea, QSizePolicy, QSpacerItem,
-    QTreeView, QVBoxLayout, QWidget)
+    QLabel, QLineEdit, QListView, QPushButton,
+    QScrollArea, QSizePolicy, QSpacerItem, QTreeView,
+    QVBoxLayout, QWidget)
 
 class Ui_SearchWidget(object):
     def setupUi(self, SearchWidget):
@@ -75,10 +75,10 @@ class Ui_SearchWidget(object):
 
         self.verticalLayout_4.addWidget(self.lineEdit_search_input)
 
-        self.listWidget = QListWidget(SearchWidget)
-        self.listWidget.setObjectName(u"listWidget")
+        self.listView_results = QListView(SearchWidget)
+        self.listView_results.setObjectName(u"listView_results")
 
-        self.verticalLayout_4.addWidget(self.listWidget)
+        self.verticalLayout_4.addWidget(self.listView_results)
 
         self.horizontalLayout_3 = QHBoxLayout()
         self.horizontalLayout_3.setObjectName(u"horizontalLayout_3")